@@ -0,0 +1,68 @@
+"""
+Compares the frame time of `Screen.render` with the pure Python cell buffer and the NumPy cell buffer, on screens of different sizes, where about 1% of the cells change between frames.\n
+Usage: `python benchmarks/bench_cell_buffer.py [frames]`
+"""
+import io
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# local imports
+from screen_display import Screen, Text, Text_style, Colors
+from screen_display.buffer import get_buffer_class
+
+
+SIZES = [(80, 24), (200, 60), (300, 100), (500, 150)]
+COLORS = [Colors.RED, Colors.GREEN, Colors.BLUE, Colors.YELLOW]
+WORD = "value"
+
+
+def make_screen(engine:str, width:int, height:int):
+    """
+    Returns a screen filled with short texts, and the texts.
+    """
+    screen = Screen(width, height, output=io.StringIO(), cell_engine=engine)
+    texts = [
+        Text(WORD, x, y, Text_style(COLORS[(x + y) % 4]))
+        for y in range(height)
+        for x in range(0, width - len(WORD), len(WORD) + 1)
+    ]
+    screen.add_texts(texts)
+    screen.render()
+    return screen, texts
+
+
+def run(engine:str, width:int, height:int, frames:int):
+    """
+    Returns the average time of a frame in seconds.
+    """
+    screen, texts = make_screen(engine, width, height)
+    rng = random.Random(0)
+    changed = max(1, width * height // 100 // len(WORD))
+    elapsed = 0.0
+    for frame in range(frames):
+        for text in rng.sample(texts, changed):
+            text.text = f"{frame % 100000:05}"
+            screen.update_text(text)
+        start = time.perf_counter()
+        screen.render()
+        elapsed += time.perf_counter() - start
+    screen.deinit()
+    return elapsed / frames
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    if get_buffer_class("numpy").__name__ != "Numpy_cell_buffer":
+        print("NumPy is not installed")
+        return
+    print(f"{frames} frames, ~1% of the cells change per frame")
+    for width, height in SIZES:
+        python_time = run("python", width, height, frames)
+        numpy_time = run("numpy", width, height, frames)
+        print(f"  {width:>3}x{height:<3}  python: {python_time * 1000:7.2f} ms/frame  numpy: {numpy_time * 1000:7.2f} ms/frame  ({python_time / numpy_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares how many bytes `Screen` writes with the cursor movement optimizer, and with only absolute cursor moves, on a dashboard-like layout.\n
+Usage: `python benchmarks/bench_cursor.py`
+"""
+import io
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# local imports
+from screen_display import Screen, Text, Text_style, Colors
+
+
+class Absolute_screen(Screen):
+    """
+    A `Screen` that always moves the cursor with an absolute `CSI row;col H` sequence.
+    """
+    def _cursor_move(self, x:int, y:int):
+        return f"\x1b[{self.offset[1] + y + 1};{self.offset[0] + x + 1}H"
+
+
+def make_layout(width:int, height:int):
+    """
+    Returns a list of label and value `Text`s, in columns, like on a status board.
+    """
+    label_style = Text_style(Colors.CYAN)
+    value_style = Text_style(Colors.LIGHTWHITE)
+    labels:list[Text] = []
+    values:list[Text] = []
+    for column in range(0, width - 20, 26):
+        for row in range(1, height - 1):
+            labels.append(Text(f"metric {column // 26}.{row}:", column + 1, row, label_style))
+            values.append(Text(f"{row * 7 % 100:>5}", column + 15, row, value_style))
+    return labels, values
+
+
+def measure(screen_class:type[Screen], width:int, height:int, frames:int):
+    """
+    Returns the bytes written by the first render, and by the following frames, where every third value changes.
+    """
+    output = io.BytesIO()
+    screen = screen_class(width, height, output=output)
+    labels, values = make_layout(width, height)
+    screen.add_texts(labels + values)
+    output.seek(0)
+    output.truncate()
+    screen.render()
+    first = len(output.getvalue())
+    output.seek(0)
+    output.truncate()
+    for frame in range(frames):
+        for index in range(frame % 3, len(values), 3):
+            values[index].text = f"{(index * 13 + frame) % 1000:>5}"
+            screen.update_text(values[index])
+        screen.render()
+    updates = len(output.getvalue())
+    screen.deinit()
+    return first, updates
+
+
+def main():
+    frames = 50
+    print(f"{'size':>9} | {'frame':<7} | {'absolute':>10} | {'optimized':>10} | saved")
+    for width, height in [(80, 24), (120, 40), (200, 60)]:
+        abs_first, abs_updates = measure(Absolute_screen, width, height, frames)
+        opt_first, opt_updates = measure(Screen, width, height, frames)
+        for name, absolute, optimized in [("first", abs_first, opt_first), ("updates", abs_updates // frames, opt_updates // frames)]:
+            saved = (absolute - optimized) / absolute * 100 if absolute else 0
+            print(f"{f'{width}x{height}':>9} | {name:<7} | {absolute:>10} | {optimized:>10} | {saved:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
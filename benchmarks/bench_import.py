@@ -0,0 +1,47 @@
+"""
+Measures the import time of the package with `python -X importtime`, in fresh interpreters.\n
+Usage: `python benchmarks/bench_import.py [runs]`
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module:str):
+    """
+    Imports the module in a new interpreter, and returns the cumulative import time of every imported module in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times:dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    totals:list[int] = []
+    slowest:dict[str, list[int]] = {}
+    for _ in range(runs):
+        times = import_times("screen_display")
+        totals.append(times["screen_display"])
+        for name, cumulative in times.items():
+            slowest.setdefault(name, []).append(cumulative)
+    print(f"import screen_display: median {statistics.median(totals) / 1000:.2f} ms, min {min(totals) / 1000:.2f} ms ({runs} runs)")
+    print("slowest modules (median cumulative):")
+    medians = sorted(((statistics.median(values), name) for name, values in slowest.items()), reverse=True)
+    for median, name in medians[1:11]:
+        print(f"  {median / 1000:8.2f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
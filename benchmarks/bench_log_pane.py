@@ -0,0 +1,88 @@
+"""
+Compares streaming log lines into a `Log_pane` (right away, and with a `Frame_scheduler` at 30 FPS), with adding a `Text` for every line and rendering, with different amounts of history.\n
+Usage: `python benchmarks/bench_log_pane.py [seconds]`
+"""
+import io
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# local imports
+from screen_display import Screen, Text, Log_pane, Frame_scheduler
+
+
+WIDTH = 80
+HEIGHT = 24
+
+
+def run_texts(seconds:float, history:int):
+    """
+    Adds a `Text` for every line (moving the old ones up) and renders, for the duration.\n
+    Returns the number of lines and bytes written.
+    """
+    output = io.StringIO()
+    screen = Screen(WIDTH, HEIGHT, output=output)
+    texts = [Text(f"old line {index}", 0, HEIGHT - history + index) for index in range(history)]
+    screen.add_texts(texts)
+    screen.render()
+    start_bytes = output.tell()
+    lines = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        for text in texts:
+            text.y -= 1
+        text = Text(f"{lines} some log line with a few words in it", 0, HEIGHT - 1)
+        texts.append(text)
+        screen.add_texts(text)
+        screen.update_texts()
+        screen.render()
+        lines += 1
+    written = output.tell() - start_bytes
+    screen.deinit()
+    return lines, written
+
+
+def run_pane(seconds:float, history:int, scheduled:bool):
+    """
+    Appends lines to a `Log_pane` as fast as possible for the duration.\n
+    Returns the number of lines and bytes written.
+    """
+    output = io.StringIO()
+    screen = Screen(WIDTH, HEIGHT, output=output)
+    pane = Log_pane(screen, 0, 1, history=history)
+    pane.extend(f"old line {index}" for index in range(history))
+    screen.render()
+    scheduler = Frame_scheduler(screen, 30) if scheduled else None
+    if scheduler != None:
+        scheduler.start()
+    start_bytes = output.tell()
+    lines = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pane.append(f"{lines} some log line with a few words in it")
+        lines += 1
+    if scheduler != None:
+        scheduler.detach()
+    written = output.tell() - start_bytes
+    screen.deinit()
+    return lines, written
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    print(f"{WIDTH}x{HEIGHT} screen, lines added for {seconds} s")
+    for history in (1000, 100000):
+        print(f"  {history} lines of history")
+        runs = [
+            ("log pane", lambda: run_pane(seconds, history, False)),
+            ("log pane, 30 FPS", lambda: run_pane(seconds, history, True)),
+        ]
+        if history <= 1000:
+            runs.insert(0, ("text per line", lambda: run_texts(seconds, history)))
+        for name, run in runs:
+            lines, written = run()
+            print(f"    {name:<18} {lines / seconds:10.0f} lines/s  {written / seconds / 1024:9.1f} KiB/s")
+
+
+if __name__ == "__main__":
+    main()
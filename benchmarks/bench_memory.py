@@ -0,0 +1,81 @@
+"""
+Measures the memory used by 100k texts on a screen, with `tracemalloc`.\n
+The slotted classes with interned styles are compared to equivalent classes that store their attributes in a `__dict__`, and create a new style object for every text.\n
+Usage: `python benchmarks/bench_memory.py [texts]`
+"""
+import gc
+import io
+import os
+import sys
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# local imports
+from screen_display import Screen, Text, Text_style, Colors, Styles, Wrap_styles
+
+
+class Dict_style:
+    """
+    A `Text_style` without slots or interning.
+    """
+    def __init__(self, fore_color=Colors.DEFAULT, back_color=Colors.DEFAULT, text_type=Styles.DEFAULT):
+        self.fore_color = Colors(fore_color)
+        self.back_color = Colors(back_color)
+        self.text_type = Styles(text_type)
+
+
+class Dict_text:
+    """
+    A `Text` without slots.
+    """
+    def __init__(self, text:str, x:int, y:int, style, wrap=False, wrap_style=Wrap_styles.LEFT, cutoff=False, cutoff_str="...", tag=None):
+        self.text = str(text)
+        self.x = int(x)
+        self.y = int(y)
+        self.wrap = bool(wrap)
+        self.style = style
+        self.wrap_style = Wrap_styles(wrap_style)
+        self.cutoff = bool(cutoff)
+        self.cutoff_str = str(cutoff_str)
+        self.tag = tag
+
+
+COLORS = [Colors.RED, Colors.GREEN, Colors.BLUE, Colors.YELLOW]
+
+
+def measure(function, *args):
+    """
+    Returns the result of the function, the memory it allocated (that is still in use), and its peak memory use in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = function(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def make_texts(text_class, style_class, count:int):
+    return [text_class(f"label {index}", index % 150, index // 150 % 50, style_class(COLORS[index % 4], COLORS[index // 4 % 4])) for index in range(count)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{count} texts")
+    dict_texts, dict_memory, _ = measure(make_texts, Dict_text, Dict_style, count)
+    texts, memory, _ = measure(make_texts, Text, Text_style, count)
+    print(f"  Text + style, __dict__, no interning: {dict_memory / 2**20:8.2f} MiB ({dict_memory / count:.0f} B/text)")
+    print(f"  Text + style, slots, interned:        {memory / 2**20:8.2f} MiB ({memory / count:.0f} B/text)")
+    del dict_texts
+
+    screen = Screen(160, 50, output=io.StringIO())
+    _, memory, _ = measure(screen.add_texts, texts)
+    print(f"  add_texts (Screen_text + segments):   {memory / 2**20:8.2f} MiB ({memory / count:.0f} B/text)")
+    for text in texts:
+        text.x = (text.x + 1) % 150
+    _, memory, peak = measure(screen.update_texts)
+    print(f"  update_texts after moving every text: {memory / 2**20:8.2f} MiB retained, {peak / 2**20:.2f} MiB peak")
+    screen.deinit()
+
+
+if __name__ == "__main__":
+    main()
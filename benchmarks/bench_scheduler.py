@@ -0,0 +1,57 @@
+"""
+Compares redrawing counters right away after every update, with marking them dirty, and drawing them with a `Frame_scheduler` at 30 FPS.\n
+Usage: `python benchmarks/bench_scheduler.py [seconds]`
+"""
+import io
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# local imports
+from screen_display import Screen, Text, Text_style, Colors, Frame_scheduler
+
+
+COUNTERS = 20
+
+
+def run(seconds:float, scheduled:bool):
+    """
+    Updates the counters as fast as possible for the duration, and returns the number of updates, frames and bytes written.
+    """
+    output = io.StringIO()
+    screen = Screen(80, 24, output=output)
+    counters = [Text("0", 10, row + 1, Text_style(Colors.LIGHTWHITE)) for row in range(COUNTERS)]
+    handles = screen.add_texts(counters)
+    screen.render()
+    scheduler = Frame_scheduler(screen, 30) if scheduled else None
+    if scheduler != None:
+        scheduler.start()
+    start_bytes = len(output.getvalue())
+    updates = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        counter = counters[updates % COUNTERS]
+        counter.text = str(updates)
+        screen.update_text(counter)
+        if scheduler == None:
+            handles[updates % COUNTERS].display()
+        updates += 1
+    frames = updates
+    if scheduler != None:
+        scheduler.detach()
+        frames = scheduler.frames
+    written = len(output.getvalue()) - start_bytes
+    screen.deinit()
+    return updates, frames, written
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    print(f"{COUNTERS} counters, updated for {seconds} s")
+    for name, scheduled in (("right away", False), ("scheduler, 30 FPS", True)):
+        updates, frames, written = run(seconds, scheduled)
+        print(f"  {name:<18} {updates / seconds:10.0f} updates/s  {frames / seconds:8.1f} frames/s  {written / seconds / 1024:9.1f} KiB/s")
+
+
+if __name__ == "__main__":
+    main()
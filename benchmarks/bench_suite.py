@@ -0,0 +1,300 @@
+"""
+Headless benchmark suite for `Screen.render`, `erase_all`, `update_texts`, `update_text`, displaying and erasing a text, and `add_texts`, at several screen sizes and text counts.\n
+Everything gets written into a fake output stream, that counts the bytes and escape sequences, so it runs without a terminal. With `--sink virtual`, the output also gets parsed by a `Virtual_terminal`, like a real terminal would.\n
+For every case it reports the operations (frames) per second, the bytes and escape sequences per frame, and the memory allocated per frame (with `tracemalloc`, in a separate run), and saves the results as JSON.\n
+Usage: `python benchmarks/bench_suite.py [--quick] [--sink null|virtual] [--json results.json] [--compare baseline.json] [--threshold 0.2]`\n
+With `--compare`, the cases that got slower (or write more bytes) by more than the threshold are listed, and the exit code is 1.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# local imports
+import screen_display
+from screen_display import Screen, Text, Text_style, Colors, Backend, Virtual_terminal, Virtual_backend
+
+
+SIZES = [(80, 24), (160, 50), (300, 100)]
+TEXT_COUNTS = [50, 500, 5000]
+QUICK_SIZES = [(80, 24), (160, 50)]
+QUICK_TEXT_COUNTS = [50, 500]
+COLORS = [Colors.RED, Colors.GREEN, Colors.BLUE, Colors.YELLOW, Colors.DEFAULT]
+# the part of the texts that change between frames
+CHANGED = 0.05
+
+
+class Counting_output(io.TextIOBase):
+    """
+    A text stream that throws away everything written to it, but counts the writes, bytes and escape sequences.
+    """
+    def __init__(self):
+        self.writes = 0
+        self.bytes = 0
+        self.escapes = 0
+
+
+    def writable(self):
+        return True
+
+
+    def write(self, data:str):
+        self.writes += 1
+        self.bytes += len(data.encode("utf-8"))
+        self.escapes += data.count("\x1b")
+        return len(data)
+
+
+    def reset(self):
+        self.writes = 0
+        self.bytes = 0
+        self.escapes = 0
+
+
+class Counting_terminal(Virtual_terminal):
+    """
+    A `Virtual_terminal` that also counts the writes, bytes and escape sequences.
+    """
+    def __init__(self, width:int, height:int):
+        super().__init__(width, height)
+        self.writes = 0
+        self.bytes = 0
+        self.escapes = 0
+
+
+    def feed(self, data:str):
+        self.writes += 1
+        self.bytes += len(data.encode("utf-8"))
+        self.escapes += data.count("\x1b")
+        super().feed(data)
+
+
+    def reset(self):
+        self.writes = 0
+        self.bytes = 0
+        self.escapes = 0
+
+
+# "null" or "virtual" (set by `--sink`)
+SINK = "null"
+
+
+def make_output(width:int, height:int):
+    """
+    Returns the output (that counts what gets written), and the backend for a screen.
+    """
+    if SINK == "virtual":
+        output = Counting_terminal(width, height)
+        return output, Virtual_backend(output)
+    return Counting_output(), Backend()
+
+
+def make_texts(width:int, height:int, count:int, rng:random.Random):
+    """
+    Returns `Text`s at random positions on the screen.
+    """
+    return [
+        Text(f"text {index}", rng.randrange(width - 4), rng.randrange(height - 1), Text_style(rng.choice(COLORS), rng.choice(COLORS)))
+        for index in range(count)
+    ]
+
+
+def make_screen(width:int, height:int, count:int, rng:random.Random):
+    output, backend = make_output(width, height)
+    screen = Screen(width, height, output=output, backend=backend)
+    texts = make_texts(width, height, count, rng)
+    handles = screen.add_texts(texts)
+    screen.render()
+    return screen, output, texts, handles
+
+
+def change_texts(screen:Screen, texts:list[Text], rng:random.Random):
+    for text in rng.sample(texts, max(1, int(len(texts) * CHANGED))):
+        text.text = f"value {rng.randrange(100000)}"
+        screen.update_text(text)
+
+
+# Every case returns a `prepare` function (not measured) and an `operation` function (measured) for a frame.
+
+def case_render_full(width:int, height:int, count:int, rng:random.Random):
+    screen, output, texts, _ = make_screen(width, height, count, rng)
+    return screen, output, screen.clear, screen.render
+
+
+def case_render_changed(width:int, height:int, count:int, rng:random.Random):
+    screen, output, texts, _ = make_screen(width, height, count, rng)
+    return screen, output, lambda: change_texts(screen, texts, rng), screen.render
+
+
+def case_erase_all(width:int, height:int, count:int, rng:random.Random):
+    screen, output, texts, _ = make_screen(width, height, count, rng)
+    return screen, output, screen.render, screen.erase_all
+
+
+def case_update_texts(width:int, height:int, count:int, rng:random.Random):
+    screen, output, texts, _ = make_screen(width, height, count, rng)
+    def prepare():
+        for text in texts:
+            text.x = (text.x + 1) % (width - 4)
+    return screen, output, prepare, screen.update_texts
+
+
+def case_update_text(width:int, height:int, count:int, rng:random.Random):
+    screen, output, texts, handles = make_screen(width, height, count, rng)
+    current:list[int] = [0]
+    def prepare():
+        current[0] = rng.randrange(count)
+        texts[current[0]].text = f"value {rng.randrange(100000)}"
+    def operation():
+        screen.update_text(texts[current[0]])
+        handles[current[0]].display()
+    return screen, output, prepare, operation
+
+
+def case_toggle_text(width:int, height:int, count:int, rng:random.Random):
+    screen, output, texts, handles = make_screen(width, height, count, rng)
+    current:list[int] = [0]
+    def prepare():
+        current[0] = rng.randrange(count)
+    def operation():
+        handles[current[0]].erase()
+        handles[current[0]].display()
+    return screen, output, prepare, operation
+
+
+def case_add_texts(width:int, height:int, count:int, rng:random.Random):
+    output, backend = make_output(width, height)
+    screen = Screen(width, height, output=output, backend=backend)
+    batch:list[list[Text]] = [[]]
+    def prepare():
+        screen.remove_texts(screen.texts)
+        batch[0] = make_texts(width, height, count, rng)
+    def operation():
+        screen.add_texts(batch[0])
+    return screen, output, prepare, operation
+
+
+CASES = {
+    "render_full": case_render_full,
+    "render_changed": case_render_changed,
+    "erase_all": case_erase_all,
+    "update_texts": case_update_texts,
+    "update_text": case_update_text,
+    "toggle_text": case_toggle_text,
+    "add_texts": case_add_texts,
+}
+
+
+def run_case(case, width:int, height:int, count:int, min_time:float, max_frames:int):
+    """
+    Returns the measurements of a case.
+    """
+    screen, output, prepare, operation = case(width, height, count, random.Random(0))
+    elapsed = 0.0
+    frames = 0
+    total_bytes = 0
+    total_escapes = 0
+    while frames < max_frames and (elapsed < min_time or frames < 3):
+        prepare()
+        output.reset()
+        start = time.perf_counter()
+        operation()
+        elapsed += time.perf_counter() - start
+        total_bytes += output.bytes
+        total_escapes += output.escapes
+        frames += 1
+    # allocations, in a separate run, because tracing slows everything down
+    alloc_frames = min(frames, 5)
+    allocated = 0
+    peak = 0
+    for _ in range(alloc_frames):
+        prepare()
+        tracemalloc.start()
+        operation()
+        current, frame_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        allocated += current
+        peak = max(peak, frame_peak)
+    screen.deinit()
+    return {
+        "frames": frames,
+        "fps": frames / elapsed if elapsed else 0.0,
+        "ms_per_frame": elapsed / frames * 1000,
+        "bytes_per_frame": total_bytes / frames,
+        "escapes_per_frame": total_escapes / frames,
+        "retained_bytes_per_frame": allocated / alloc_frames,
+        "peak_alloc_bytes": peak,
+    }
+
+
+def compare(results:dict, baseline:dict, threshold:float):
+    """
+    Returns the descriptions of the cases that got slower, or write more, than the baseline by more than the threshold.
+    """
+    regressions:list[str] = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old == None:
+            continue
+        if old["fps"] and result["fps"] < old["fps"] * (1 - threshold):
+            regressions.append(f"{name}: {old['fps']:.1f} -> {result['fps']:.1f} frames/s")
+        if result["bytes_per_frame"] > old["bytes_per_frame"] * (1 + threshold):
+            regressions.append(f"{name}: {old['bytes_per_frame']:.0f} -> {result['bytes_per_frame']:.0f} bytes/frame")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="screen_display benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="fewer sizes and text counts, shorter runs")
+    parser.add_argument("--json", default="bench_results.json", help="where to save the results")
+    parser.add_argument("--compare", help="results of an earlier run, to compare to")
+    parser.add_argument("--threshold", type=float, default=0.2, help="the relative change that counts as a regression")
+    parser.add_argument("--case", action="append", choices=list(CASES), help="only run these cases")
+    parser.add_argument("--sink", choices=["null", "virtual"], default="null", help="throw the output away, or parse it with a virtual terminal")
+    args = parser.parse_args()
+    global SINK
+    SINK = args.sink
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    counts = QUICK_TEXT_COUNTS if args.quick else TEXT_COUNTS
+    min_time = 0.1 if args.quick else 0.5
+    max_frames = 200 if args.quick else 2000
+    results:dict[str, dict] = {}
+    print(f"{'case':<36} {'frames/s':>10} {'ms/frame':>9} {'bytes/frame':>12} {'esc/frame':>10} {'peak KiB':>9}")
+    for case_name in args.case or CASES:
+        for width, height in sizes:
+            for count in counts:
+                name = f"{case_name}[{width}x{height},{count}]"
+                result = run_case(CASES[case_name], width, height, count, min_time, max_frames)
+                results[name] = result
+                print(f"{name:<36} {result['fps']:>10.1f} {result['ms_per_frame']:>9.3f} {result['bytes_per_frame']:>12.0f} {result['escapes_per_frame']:>10.1f} {result['peak_alloc_bytes'] / 1024:>9.1f}")
+
+    report = {
+        "version": screen_display.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sink": args.sink,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    with open(args.json, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"saved to {args.json}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
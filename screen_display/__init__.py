@@ -3,19 +3,55 @@ This package provides utility for writing to the terminal as if it were a screen
 """
 
 __version__ = '1.4.1.2'
-from msvcrt import getch
-from time import sleep
 # local imports
 if __name__ == "__main__":
     from enums import Colors, Styles, Wrap_styles
     from text import Text_style
     from screen import Text, Simple_text, Screen_text, Screen
-    from acc_console_font import get_size
+    from backends import Backend, Windows_backend, Posix_backend, get_backend
 else:
     from screen_display.enums import Colors, Styles, Wrap_styles
     from screen_display.text import Text_style
     from screen_display.screen import Text, Simple_text, Screen_text, Screen
-    from screen_display.acc_console_font import get_size
+    from screen_display.backends import Backend, Windows_backend, Posix_backend, get_backend
+
+
+# the modules of the names that only get imported when they are first used
+_lazy_names = {
+    "get_size": "acc_console_font",
+    "Frame_scheduler": "scheduler",
+    "Log_pane": "log_pane",
+    "Input_reader": "input_events",
+    "Key_parser": "input_events",
+    "Key_event": "input_events",
+    "Mouse_event": "input_events",
+    "Paste_event": "input_events",
+    "Frame_record": "metrics",
+    "Screen_metrics": "metrics",
+    "Virtual_terminal": "virtual_terminal",
+    "Virtual_backend": "virtual_terminal",
+    "Frame_recorder": "recorder",
+    "Recording": "recorder",
+    "Screen_server": "server",
+    "Screen_client": "server",
+}
+
+__all__ = [
+    "Colors", "Styles", "Wrap_styles", "Text_style", "Text", "Simple_text", "Screen_text", "Screen",
+    "Backend", "Windows_backend", "Posix_backend", "get_backend", "color_test", "render_loop",
+    *_lazy_names,
+]
+
+
+def __getattr__(name:str):
+    # only loads kernel32.dll (and sockets, profilers...) if it's needed
+    module = _lazy_names.get(name)
+    if module == None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f"screen_display.{module}"), name)
+    globals()[name] = value
+    return value
 
 def color_test():
     """
@@ -45,6 +81,8 @@ def color_test():
             sc_test.change_style_exp(Colors.DEFAULT, Colors.DEFAULT, Styles.NORMAL)
             print("#")
     # 5. line
+    # print() moved the cursor
+    sc_test.forget_terminal_state()
     sc_test.write_to("#", 1, 6)
     for _ in range(len(Colors._member_names_)):
         print(end="#")
@@ -54,17 +92,19 @@ def color_test():
 
 
 def render_loop(sc:Screen):
+    from screen_display.scheduler import Frame_scheduler
+    scheduler = Frame_scheduler(sc, 20)
     while True:
         # off
         for text in sc.texts:
             text.erase()
+            scheduler.step()
             sc.reset_cursor()
-            sleep(0.05)
         # on
         for text in sc.texts:
             text.display()
+            scheduler.step()
             sc.reset_cursor()
-            sleep(0.05)
 
 
 def _test_run():
@@ -85,7 +125,7 @@ def _test_run():
     # getch()
     # sc.clear()
     sc.deinit()
-    getch()
+    get_backend().getch()
 
 
 if __name__ == "__main__":
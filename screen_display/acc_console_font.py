@@ -1,10 +1,10 @@
-
 """
 MAGIC!!!\n
-https://stackoverflow.com/a/52340670
+https://stackoverflow.com/a/52340670\n
+`kernel32.dll` only gets loaded on the first `get_size` call.
 """
 
-from ctypes import POINTER, WinDLL, Structure, sizeof, byref
+from ctypes import POINTER, Structure, sizeof, byref
 from ctypes.wintypes import BOOL, SHORT, WCHAR, UINT, ULONG, DWORD, HANDLE
 
 
@@ -30,18 +30,28 @@ class CONSOLE_FONT_INFOEX(Structure):
     ]
 
 
-kernel32_dll = WinDLL("kernel32.dll")
+get_std_handle_func = None
+get_current_console_font_ex_func = None
+
+
+def _load_kernel32():
+    global get_std_handle_func, get_current_console_font_ex_func
+    from ctypes import WinDLL
+
+    kernel32_dll = WinDLL("kernel32.dll")
 
-get_std_handle_func = kernel32_dll.GetStdHandle
-get_std_handle_func.argtypes = [DWORD]
-get_std_handle_func.restype = HANDLE
+    get_std_handle_func = kernel32_dll.GetStdHandle
+    get_std_handle_func.argtypes = [DWORD]
+    get_std_handle_func.restype = HANDLE
 
-get_current_console_font_ex_func = kernel32_dll.GetCurrentConsoleFontEx
-get_current_console_font_ex_func.argtypes = [HANDLE, BOOL, POINTER(CONSOLE_FONT_INFOEX)]
-get_current_console_font_ex_func.restype = BOOL
+    get_current_console_font_ex_func = kernel32_dll.GetCurrentConsoleFontEx
+    get_current_console_font_ex_func.argtypes = [HANDLE, BOOL, POINTER(CONSOLE_FONT_INFOEX)]
+    get_current_console_font_ex_func.restype = BOOL
 
 
 def get_size():
+    if get_current_console_font_ex_func == None:
+        _load_kernel32()
     # Get stdout handle
     stdout = get_std_handle_func(STD_OUTPUT_HANDLE)
     # Get current font characteristics
@@ -0,0 +1,319 @@
+"""
+`asyncio` support: a non-blocking output with backpressure, and an awaitable `Screen` with an async frame loop.
+"""
+
+import asyncio
+import os
+import sys
+from typing import Callable
+# local imports
+# from screen import Screen, Text, Screen_text
+# from scheduler import Frame_scheduler
+# from input_events import Input_reader, Input_event
+from screen_display.screen import Screen, Text, Screen_text
+from screen_display.scheduler import Frame_scheduler
+from screen_display.input_events import Input_reader, Input_event
+
+
+class Async_output:
+    """
+    Non-blocking output for a `Screen` (as its `output`), that writes the frames into an `asyncio.StreamWriter`.\n
+    Writing never blocks: the frames get buffered by the transport, and `drain` waits until the buffer gets below its high-water mark (backpressure).
+    """
+    def __init__(self, stream:asyncio.StreamWriter, encoding="utf-8"):
+        self.stream = stream
+        self.encoding = str(encoding)
+        # the file descriptor of the output, and if it was blocking before it got opened (see `open` and `close`)
+        self._fd_blocking:tuple[int, bool]|None = None
+
+
+    @classmethod
+    async def open(cls, file=None, encoding="utf-8", high_water:int|None=None):
+        """
+        Opens a non-blocking output on a pipe, terminal or socket (file object or file descriptor), or on stdout, if it's `None`.\n
+        `high_water` is the size of the write buffer in bytes, above which `drain` waits.\n
+        Stdout (or a file descriptor) doesn't get closed by `close`, and it gets blocking again, if it was before.
+        """
+        loop = asyncio.get_running_loop()
+        if file == None:
+            # the text written before the output got opened
+            sys.stdout.flush()
+            file = sys.stdout.fileno()
+        if isinstance(file, int):
+            file = os.fdopen(file, "wb", buffering=0, closefd=False)
+        elif hasattr(file, "flush"):
+            # the text written before the output got opened
+            file.flush()
+        fd_blocking = (file.fileno(), os.get_blocking(file.fileno()))
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, file)
+        if high_water != None:
+            transport.set_write_buffer_limits(high=high_water)
+        output = cls(asyncio.StreamWriter(transport, protocol, None, loop), encoding)
+        output._fd_blocking = fd_blocking
+        return output
+
+
+    def __call__(self, data:str):
+        self.stream.write(data.encode(self.encoding))
+
+
+    def buffered(self):
+        """
+        Returns how many bytes are waiting to be written.
+        """
+        return self.stream.transport.get_write_buffer_size()
+
+
+    async def drain(self):
+        """
+        Waits until the buffered frames get written out, if there are too many of them.
+        """
+        await self.stream.drain()
+
+
+    async def close(self):
+        """
+        Writes out everything, and closes the output (and makes its file descriptor blocking again, if it was before `open`).
+        """
+        # waits until the buffer is empty
+        self.stream.transport.set_write_buffer_limits(high=0)
+        await self.stream.drain()
+        self.stream.close()
+        if self._fd_blocking != None:
+            os.set_blocking(*self._fd_blocking)
+            self._fd_blocking = None
+
+
+class Async_scheduler(Frame_scheduler):
+    """
+    A `Frame_scheduler`, that draws the frames from an `asyncio` task, instead of a thread.\n
+    All changes should be made from the event loop's thread.\n
+    The input of `attach_input` is read by the event loop (`loop.add_reader`, so it needs a selector based event loop), while the frame loop task runs.
+    """
+    def __init__(self, screen:Screen, fps:float=30, output:Async_output|None=None):
+        """
+        `output` is drained after every frame, so the frame loop slows down if the output can't keep up.
+        """
+        super().__init__(screen, fps)
+        self.output = output
+        self._async_wake = asyncio.Event()
+        self._task:asyncio.Task|None = None
+        self._reading_fd:int|None = None
+        self._escape_timer:asyncio.TimerHandle|None = None
+
+
+    def _notify(self):
+        """
+        Wakes up the frame loop task (after a text or a `Log_pane` got marked dirty).
+        """
+        super()._notify()
+        self._async_wake.set()
+
+
+    def attach_input(self, reader:Input_reader, handler:Callable[[Input_event], None]):
+        """
+        Makes the events of the reader get passed to the handler, as they arrive, while the frame loop task runs.\n
+        The reader should be open (see `Input_reader.open`).
+        """
+        self.detach_input()
+        self.input = reader
+        self._input_handler = handler
+        if self._task != None and not self._task.done():
+            self._start_reading()
+
+
+    def detach_input(self):
+        self._stop_reading()
+        self.input = None
+        self._input_handler = None
+
+
+    def _start_reading(self):
+        if self.input == None or self._reading_fd != None:
+            return
+        self._reading_fd = self.input.fileno()
+        asyncio.get_running_loop().add_reader(self._reading_fd, self._input_ready)
+
+
+    def _stop_reading(self):
+        if self._escape_timer != None:
+            self._escape_timer.cancel()
+            self._escape_timer = None
+        if self._reading_fd != None:
+            asyncio.get_running_loop().remove_reader(self._reading_fd)
+            self._reading_fd = None
+
+
+    def _input_ready(self):
+        self.handle_input(self.input.read())
+        self._schedule_escape()
+
+
+    def _schedule_escape(self):
+        """
+        Makes an unfinished escape sequence become an escape key press, if no more input arrives in time.
+        """
+        if self._escape_timer != None:
+            self._escape_timer.cancel()
+            self._escape_timer = None
+        timeout = self.input.timeout() if self.input != None else None
+        if timeout != None:
+            self._escape_timer = asyncio.get_running_loop().call_later(timeout, self._escape_expired)
+
+
+    def _escape_expired(self):
+        self._escape_timer = None
+        if self.input != None:
+            self.handle_input(self.input.expire())
+            self._schedule_escape()
+
+
+    async def drain(self):
+        """
+        Waits for the output (if there is one) to catch up.
+        """
+        if self.output != None:
+            await self.output.drain()
+
+
+    async def step_async(self):
+        """
+        Waits (without blocking the event loop) until the next frame is due, and draws all changes since the last frame.\n
+        Returns if anything was drawn.
+        """
+        delay = self._reserve_frame()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._async_wake.clear()
+        drawn = self.tick()
+        if drawn:
+            await self.drain()
+        return drawn
+
+
+    async def run_async(self):
+        """
+        Keeps drawing frames, until the task gets cancelled, or `stop_async` is called.\n
+        Waits without drawing anything, while nothing changes (but checks if the terminal got resized every `Backend.POLL_INTERVAL` seconds).
+        """
+        self._start_reading()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._async_wake.wait(), self.screen.backend.POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                await self.step_async()
+        finally:
+            self._stop_reading()
+            # draw the last changes
+            self.tick()
+
+
+    def start(self):
+        """
+        Starts `run_async` as a task, in the running event loop, and returns the task.
+        """
+        if self._task == None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run_async())
+        return self._task
+
+
+    async def stop_async(self):
+        """
+        Stops the frame loop task, and draws the remaining changes.
+        """
+        task = self._task
+        self._task = None
+        if task != None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.tick()
+        await self.drain()
+
+
+class Async_screen:
+    """
+    Awaitable wrapper of a `Screen`, for `asyncio` programs.\n
+    The screen writes into an `Async_output`, so writing never blocks the event loop, and the methods wait for the output to catch up (backpressure).\n
+    The changed texts get drawn by an `Async_scheduler` frame loop task (`start`), while other coroutines change the `Text` objects, and call `update_text`.\n
+    Use `create` to make one.
+    """
+    def __init__(self, screen:Screen, output:Async_output, fps:float=30):
+        self.screen = screen
+        self.output = output
+        self.scheduler = Async_scheduler(screen, fps, output)
+
+
+    @classmethod
+    async def create(cls, *args, file=None, fps:float=30, **kwargs):
+        """
+        Creates a `Screen` (with the arguments) that writes into a non-blocking output on the file (or stdout), and returns it wrapped.
+        """
+        output = await Async_output.open(file)
+        screen = Screen(*args, output=output, **kwargs)
+        async_screen = cls(screen, output, fps)
+        await output.drain()
+        return async_screen
+
+
+    async def render(self):
+        """
+        Awaitable `Screen.render`.
+        """
+        self.screen.render()
+        await self.output.drain()
+
+
+    async def update_text(self, text:Text|Screen_text):
+        """
+        Marks the text (or handle) dirty, so it gets updated and redrawn in the next frame, and waits for the output to catch up.\n
+        Returns if the text is on the screen.
+        """
+        updated = self.screen.update_text(text)
+        await self.output.drain()
+        return updated
+
+
+    async def add_texts(self, texts:list[Text]):
+        """
+        Adds the texts to the screen, and returns their handles (see `Screen.add_texts`).
+        """
+        handles = self.screen.add_texts(texts)
+        await self.output.drain()
+        return handles
+
+
+    async def remove_text(self, text:Text|Screen_text):
+        """
+        Awaitable `Screen.remove_text`.
+        """
+        removed = self.screen.remove_text(text)
+        await self.output.drain()
+        return removed
+
+
+    def start(self):
+        """
+        Starts the frame loop task, and returns it.
+        """
+        return self.scheduler.start()
+
+
+    async def stop(self):
+        """
+        Stops the frame loop task, and draws the remaining changes.
+        """
+        await self.scheduler.stop_async()
+
+
+    async def close(self):
+        """
+        Stops the frame loop, deinitializes the screen, and closes the output.
+        """
+        await self.stop()
+        self.screen.deinit()
+        await self.output.close()
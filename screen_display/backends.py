@@ -0,0 +1,238 @@
+"""
+Platform specific terminal functions.\n
+The modules these need (`colorama`, `msvcrt`, `kernel32.dll`, `termios`...) only get imported when a function first needs them.
+"""
+
+import os
+import sys
+import time
+
+
+class Backend:
+    """
+    Terminal functions that work everywhere, or do nothing.\n
+    The size of the terminal is cached. It only gets queried again by `poll_size`, after the terminal got resized (if `watch_resize` could start listening for resize signals), or every `POLL_INTERVAL` seconds otherwise.
+    """
+    DEFAULT_SIZE = (80, 24)
+    POLL_INTERVAL = 0.25
+
+
+    def __init__(self):
+        self._size:tuple[int, int]|None = None
+        # increases every time the cached size changes
+        self.size_version = 0
+        self._size_stale = False
+        self._last_poll = 0.0
+        self._watching = False
+
+
+    def _query_terminal_size(self):
+        """
+        Returns the (columns, lines) of the terminal, or `DEFAULT_SIZE` if there is no terminal.
+        """
+        try:
+            size = os.get_terminal_size()
+        except (OSError, ValueError):
+            return self.DEFAULT_SIZE
+        return size.columns, size.lines
+
+
+    def get_terminal_size(self):
+        """
+        Returns the (columns, lines) of the terminal (cached), or `DEFAULT_SIZE` if there is no terminal.
+        """
+        if self._size == None:
+            self._size = self._query_terminal_size()
+            self._last_poll = time.monotonic()
+        return self._size
+
+
+    def watch_resize(self):
+        """
+        Starts listening for the terminal getting resized, if the platform can tell (otherwise `poll_size` polls).\n
+        Returns if it's listening.
+        """
+        return False
+
+
+    def _resized(self):
+        """
+        Marks the cached size outdated (safe to call from a signal handler).
+        """
+        self._size_stale = True
+
+
+    def poll_size(self):
+        """
+        Queries the size of the terminal again, if it might have changed, and returns `size_version`.
+        """
+        if self._size == None:
+            self.get_terminal_size()
+            return self.size_version
+        if self._watching:
+            if not self._size_stale:
+                return self.size_version
+        elif time.monotonic() - self._last_poll < self.POLL_INTERVAL:
+            return self.size_version
+        self._size_stale = False
+        self._last_poll = time.monotonic()
+        size = self._query_terminal_size()
+        if size != self._size:
+            self._size = size
+            self.size_version += 1
+        return self.size_version
+
+
+    def get_font_size(self):
+        """
+        Returns the (width, height) of a character in pixels, or (0, 0) if it is unknown.
+        """
+        return 0, 0
+
+
+    def enable_ansi(self):
+        """
+        Makes the terminal understand escape sequences, if it needs to.
+        """
+        pass
+
+
+    def disable_ansi(self):
+        """
+        Undoes `enable_ansi`.
+        """
+        pass
+
+
+    def getch(self):
+        """
+        Waits for a key press, and returns the first byte of it.
+        """
+        return sys.stdin.buffer.read(1)
+
+
+class Windows_backend(Backend):
+    """
+    Terminal functions for the Windows console.
+    """
+    def get_font_size(self):
+        from screen_display.acc_console_font import get_size
+        return get_size()
+
+
+    def enable_ansi(self):
+        import colorama
+        colorama.init()
+
+
+    def disable_ansi(self):
+        import colorama
+        colorama.deinit()
+
+
+    def getch(self):
+        from msvcrt import getch
+        return getch()
+
+
+class Posix_backend(Backend):
+    """
+    Terminal functions for POSIX terminals, with `termios` and `ioctl`.
+    """
+    def __init__(self, fd:int|None=None):
+        """
+        `fd` is the file descriptor of the terminal, or `None` for stdout.
+        """
+        super().__init__()
+        self.fd = fd
+
+
+    def _fileno(self):
+        if self.fd != None:
+            return self.fd
+        try:
+            return sys.stdout.fileno()
+        except (AttributeError, OSError, ValueError):
+            return -1
+
+
+    def _get_winsize(self):
+        """
+        Returns the (lines, columns, width in pixels, height in pixels) of the terminal, or None.
+        """
+        import fcntl
+        import struct
+        import termios
+        fd = self._fileno()
+        if fd < 0:
+            return None
+        try:
+            data = fcntl.ioctl(fd, termios.TIOCGWINSZ, b"\0" * 8)
+        except OSError:
+            return None
+        return struct.unpack("HHHH", data)
+
+
+    def _query_terminal_size(self):
+        winsize = self._get_winsize()
+        if winsize == None or winsize[0] == 0 or winsize[1] == 0:
+            return super()._query_terminal_size()
+        return winsize[1], winsize[0]
+
+
+    def watch_resize(self):
+        """
+        Starts listening for `SIGWINCH`, if it's called from the main thread (the previous handler still gets called).\n
+        Returns if it's listening.
+        """
+        if self._watching:
+            return True
+        import signal
+        import threading
+        if not hasattr(signal, "SIGWINCH") or threading.current_thread() is not threading.main_thread():
+            return False
+        previous = signal.getsignal(signal.SIGWINCH)
+        def handler(signum, frame):
+            self._resized()
+            if callable(previous):
+                previous(signum, frame)
+        signal.signal(signal.SIGWINCH, handler)
+        self._watching = True
+        return True
+
+
+    def get_font_size(self):
+        winsize = self._get_winsize()
+        if winsize == None or winsize[0] == 0 or winsize[1] == 0:
+            return 0, 0
+        return winsize[2] // winsize[1], winsize[3] // winsize[0]
+
+
+    def getch(self):
+        import termios
+        import tty
+        fd = sys.stdin.fileno()
+        old_settings = termios.tcgetattr(fd)
+        try:
+            tty.setraw(fd)
+            return os.read(fd, 1)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+
+
+_backend:Backend|None = None
+
+
+def get_backend():
+    """
+    Returns the backend for the current platform (created on the first call).
+    """
+    global _backend
+    if _backend == None:
+        if os.name == "nt":
+            _backend = Windows_backend()
+        elif os.name == "posix":
+            _backend = Posix_backend()
+        else:
+            _backend = Backend()
+    return _backend
@@ -0,0 +1,169 @@
+from collections.abc import Iterable
+# local imports
+# from text import Text_style
+# from width import split_cells
+from screen_display.text import Text_style
+from screen_display.width import split_cells
+
+
+AUTO_NUMPY_CELLS = 20000
+
+
+def get_buffer_class(engine="python", cells=0):
+    """
+    Returns the cell buffer class for the engine:\n
+    - "python": `Cell_buffer`
+    - "numpy": `Numpy_cell_buffer`
+    - "auto": `Numpy_cell_buffer` for screens with at least `AUTO_NUMPY_CELLS` cells, otherwise `Cell_buffer`\n
+    If NumPy isn't installed, `Cell_buffer` is used.
+    """
+    if engine == "numpy" or (engine == "auto" and cells >= AUTO_NUMPY_CELLS):
+        try:
+            from screen_display.numpy_buffer import Numpy_cell_buffer
+        except ImportError:
+            return Cell_buffer
+        return Numpy_cell_buffer
+    if engine not in ("python", "auto"):
+        raise ValueError(f"unknown cell engine: {engine!r}")
+    return Cell_buffer
+
+
+class Cell_buffer:
+    """
+    A grid of cells, each one holding a character and the `Text_style` it is drawn with.\n
+    Used by a `Screen` object to remember what is on the terminal (front buffer), and to compose the next frame (back buffer).\n
+    A cell style of `None` means that the contents of the cell are unknown, so it will never match a cell from a composed frame.\n
+    A wide character is stored in its first cell, and its second cell contains an empty string.
+    """
+    def __init__(self, width:int, height:int, style:Text_style=None):
+        self.width = int(width)
+        self.height = int(height)
+        self.chars:list[list[str]] = []
+        self.styles:list[list[Text_style|None]] = []
+        self.fill(style)
+
+
+    def fill(self, style:Text_style=None):
+        """
+        Fills the whole buffer with spaces with the specified style.
+        """
+        self.chars = [[" "] * self.width for _ in range(self.height)]
+        self.styles = [[style] * self.width for _ in range(self.height)]
+
+
+    def put(self, text:str, x:int, y:int, style:Text_style|None):
+        """
+        Writes the text into the buffer, starting from the specified coordinates.\n
+        Everything that doesn't fit into the row gets cut off.\n
+        Wide characters that only get partly overwritten (or cut off) are replaced with a space, like in a terminal.
+        """
+        if y < 0 or y >= self.height or x >= self.width:
+            return
+        if text.isascii() and text.isprintable():
+            cells = text
+        else:
+            cells = split_cells(text)
+        if x < 0:
+            cells = cells[-x:]
+            x = 0
+        end = min(x + len(cells), self.width)
+        if end <= x:
+            return
+        chars = self.chars[y]
+        # the other halves of the wide characters that get overwritten
+        if chars[x] == "" and x > 0:
+            chars[x - 1] = " "
+        if end < self.width and chars[end] == "":
+            chars[end] = " "
+        chars[x:end] = cells[:end - x]
+        self.styles[y][x:end] = [style] * (end - x)
+        # wide characters that got cut in half
+        if chars[x] == "":
+            chars[x] = " "
+        if end - x < len(cells) and cells[end - x] == "":
+            chars[end - 1] = " "
+
+
+    def scroll(self, top:int, bottom:int, count:int, style:Text_style=None):
+        """
+        Moves the rows between the two y coordinates up by `count` rows (down, if it's negative), like a terminal scrolls its scroll region.\n
+        The rows that get uncovered are filled with spaces with the specified style.
+        """
+        count = max(min(count, bottom - top), top - bottom)
+        if count == 0:
+            return
+        chars = [[" "] * self.width for _ in range(abs(count))]
+        styles = [[style] * self.width for _ in range(abs(count))]
+        if count > 0:
+            self.chars[top:bottom] = self.chars[top + count:bottom] + chars
+            self.styles[top:bottom] = self.styles[top + count:bottom] + styles
+        else:
+            self.chars[top:bottom] = chars + self.chars[top:bottom + count]
+            self.styles[top:bottom] = styles + self.styles[top:bottom + count]
+
+
+    def put_many(self, items:Iterable[tuple[str, int, int, Text_style|None]]):
+        """
+        Writes all (text, x, y, style) items into the buffer with `put`, in order.
+        """
+        put = self.put
+        for text, x, y, style in items:
+            put(text, x, y, style)
+
+
+    def cells(self, y:int, start:int, end:int):
+        """
+        Returns the characters and the styles of the cells in the row, between the two x coordinates.
+        """
+        return self.chars[y][start:end], self.styles[y][start:end]
+
+
+    def _diff_row(self, other:'Cell_buffer', y:int, start:int, end:int, runs:list[tuple[int, int, int]]):
+        """
+        Adds the runs of cells in the row, between the two x coordinates, that are different from the `other` buffer to `runs`.
+        """
+        chars = self.chars[y]
+        styles = self.styles[y]
+        o_chars = other.chars[y]
+        o_styles = other.styles[y]
+        width = self.width
+        x = start
+        while x < end:
+            if chars[x] != o_chars[x] or styles[x] != o_styles[x]:
+                run_start = x
+                x += 1
+                while x < end and (chars[x] != o_chars[x] or styles[x] != o_styles[x]):
+                    x += 1
+                # runs can't start or end in the middle of a wide character
+                if chars[run_start] == "" and run_start > 0:
+                    run_start -= 1
+                if x < width and chars[x] == "":
+                    x += 1
+                if runs and runs[-1][0] == y and runs[-1][2] >= run_start:
+                    run_start = runs.pop()[1]
+                runs.append((y, run_start, x))
+            else:
+                x += 1
+
+
+    def diff(self, other:'Cell_buffer'):
+        """
+        Returns the list of cell runs that are different from the `other` buffer, as (y, start x, end x) tuples.
+        """
+        runs:list[tuple[int, int, int]] = []
+        for y in range(self.height):
+            if self.chars[y] == other.chars[y] and self.styles[y] == other.styles[y]:
+                continue
+            self._diff_row(other, y, 0, self.width, runs)
+        return runs
+
+
+    def diff_spans(self, other:'Cell_buffer', spans:list[tuple[int, int, int]]):
+        """
+        Returns the list of cell runs that are different from the `other` buffer, as (y, start x, end x) tuples, but only checks the cells in the (y, start x, end x) spans.\n
+        The spans must be sorted, and must not overlap.
+        """
+        runs:list[tuple[int, int, int]] = []
+        for y, start, end in spans:
+            self._diff_row(other, y, max(start, 0), min(end, self.width), runs)
+        return runs
@@ -1,5 +1,4 @@
 from enum import Enum, auto
-from tkinter import CENTER
 
 class Colors(Enum):
     BLACK       = 0
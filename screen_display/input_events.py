@@ -0,0 +1,559 @@
+"""
+Non-blocking keyboard, mouse and paste input, that can be read in the same loop that draws the frames (see `Frame_scheduler.attach_input`).
+"""
+
+import codecs
+import os
+import queue
+import re
+import selectors
+import socket
+import sys
+import threading
+import time
+# local imports
+# from output import Frame_writer
+from screen_display.output import Frame_writer
+
+
+class Key_event:
+    """
+    A key press.\n
+    `key` is the character, or the name of a special key: "up", "down", "left", "right", "home", "end", "insert", "delete", "page_up", "page_down", "f1"-"f12", "enter", "tab", "backspace" or "escape".\n
+    Letters pressed with ctrl are lowercase, with `ctrl` true.
+    """
+    __slots__ = ("key", "ctrl", "alt", "shift")
+
+
+    def __init__(self, key:str, ctrl=False, alt=False, shift=False):
+        self.key = key
+        self.ctrl = ctrl
+        self.alt = alt
+        self.shift = shift
+
+
+    def __eq__(self, other):
+        if not isinstance(other, Key_event):
+            return NotImplemented
+        return (self.key, self.ctrl, self.alt, self.shift) == (other.key, other.ctrl, other.alt, other.shift)
+
+
+    def __hash__(self):
+        return hash((self.key, self.ctrl, self.alt, self.shift))
+
+
+    def __repr__(self):
+        modifiers = "".join(name + "+" for name, on in (("ctrl", self.ctrl), ("alt", self.alt), ("shift", self.shift)) if on)
+        return f"Key_event({modifiers}{self.key!r})"
+
+
+class Mouse_event:
+    """
+    A mouse button press or release, a mouse movement (while a button is held down, or always with `mouse="all"`), or a scroll.\n
+    `x` and `y` are the cell on the terminal (from 0). `button` is "left", "middle", "right", "scroll_up", "scroll_down" or `None` (unknown, for releases and movements without a button), `action` is "press", "release" or "move".
+    """
+    __slots__ = ("x", "y", "button", "action", "ctrl", "alt", "shift")
+
+
+    def __init__(self, x:int, y:int, button:str|None, action:str, ctrl=False, alt=False, shift=False):
+        self.x = x
+        self.y = y
+        self.button = button
+        self.action = action
+        self.ctrl = ctrl
+        self.alt = alt
+        self.shift = shift
+
+
+    def __eq__(self, other):
+        if not isinstance(other, Mouse_event):
+            return NotImplemented
+        return (self.x, self.y, self.button, self.action, self.ctrl, self.alt, self.shift) == (other.x, other.y, other.button, other.action, other.ctrl, other.alt, other.shift)
+
+
+    def __hash__(self):
+        return hash((self.x, self.y, self.button, self.action))
+
+
+    def __repr__(self):
+        return f"Mouse_event({self.action} {self.button} at {self.x}, {self.y})"
+
+
+class Paste_event:
+    """
+    Text pasted into the terminal (with bracketed paste).
+    """
+    __slots__ = ("text",)
+
+
+    def __init__(self, text:str):
+        self.text = text
+
+
+    def __eq__(self, other):
+        if not isinstance(other, Paste_event):
+            return NotImplemented
+        return self.text == other.text
+
+
+    def __hash__(self):
+        return hash(self.text)
+
+
+    def __repr__(self):
+        return f"Paste_event({self.text!r})"
+
+
+Input_event = Key_event|Mouse_event|Paste_event
+
+
+# values of the trie nodes, where the rest of the sequence has to be parsed differently
+_MOUSE_SGR = "mouse_sgr"
+_MOUSE_X10 = "mouse_x10"
+_PASTE = "paste"
+_PASTE_END = "\x1b[201~"
+_SGR_MOUSE = re.compile(r"(\d+);(\d+);(\d+)([Mm])")
+_SGR_MOUSE_PREFIX = re.compile(r"[\d;]*")
+_CSI_END = re.compile(r"[0-?]*[ -/]*[@-~]")
+
+_CSI_LETTER_KEYS = {"A": "up", "B": "down", "C": "right", "D": "left", "H": "home", "F": "end", "P": "f1", "Q": "f2", "R": "f3", "S": "f4"}
+_CSI_TILDE_KEYS = {
+    1: "home", 2: "insert", 3: "delete", 4: "end", 5: "page_up", 6: "page_down", 7: "home", 8: "end",
+    11: "f1", 12: "f2", 13: "f3", 14: "f4", 15: "f5", 17: "f6", 18: "f7", 19: "f8", 20: "f9", 21: "f10", 23: "f11", 24: "f12",
+}
+
+
+def _modifiers(code:int):
+    """
+    Returns the (ctrl, alt, shift) from an xterm modifier parameter (1 + bits of shift, alt, ctrl).
+    """
+    bits = max(code - 1, 0)
+    return bool(bits & 4), bool(bits & 2), bool(bits & 1)
+
+
+def _escape_sequences():
+    """
+    Returns the escape sequences of the keys (with their modifiers), and the starts of the sequences that need special parsing.
+    """
+    sequences:dict[str, object] = {}
+    for letter, name in _CSI_LETTER_KEYS.items():
+        sequences[f"\x1bO{letter}"] = Key_event(name)
+        sequences[f"\x1b[{letter}"] = Key_event(name)
+        for code in range(2, 9):
+            sequences[f"\x1b[1;{code}{letter}"] = Key_event(name, *_modifiers(code))
+    for number, name in _CSI_TILDE_KEYS.items():
+        sequences[f"\x1b[{number}~"] = Key_event(name)
+        for code in range(2, 9):
+            sequences[f"\x1b[{number};{code}~"] = Key_event(name, *_modifiers(code))
+    sequences["\x1b[Z"] = Key_event("tab", shift=True)
+    sequences["\x1bOM"] = Key_event("enter")
+    sequences["\x1b[<"] = _MOUSE_SGR
+    sequences["\x1b[M"] = _MOUSE_X10
+    sequences["\x1b[200~"] = _PASTE
+    return sequences
+
+
+class _Trie_node:
+    __slots__ = ("children", "value")
+
+
+    def __init__(self):
+        self.children:dict[str, _Trie_node] = {}
+        self.value:object = None
+
+
+def _build_trie(sequences:dict[str, object]):
+    root = _Trie_node()
+    for sequence, value in sequences.items():
+        node = root
+        for char in sequence:
+            child = node.children.get(char)
+            if child == None:
+                child = node.children[char] = _Trie_node()
+            node = child
+        node.value = value
+    return root
+
+
+_TRIE = _build_trie(_escape_sequences())
+
+
+def _char_event(char:str, alt=False):
+    """
+    Returns the event of a character that isn't part of an escape sequence.
+    """
+    if char in "\r\n":
+        return Key_event("enter", alt=alt)
+    if char == "\t":
+        return Key_event("tab", alt=alt)
+    if char in "\x7f\x08":
+        return Key_event("backspace", alt=alt)
+    if char == "\x1b":
+        return Key_event("escape", alt=alt)
+    code = ord(char)
+    if code == 0:
+        return Key_event(" ", ctrl=True, alt=alt)
+    if code < 0x1b:
+        return Key_event(chr(code + 0x60), ctrl=True, alt=alt)
+    if code < 0x20:
+        return Key_event(chr(code + 0x40), ctrl=True, alt=alt)
+    return Key_event(char, alt=alt)
+
+
+def _mouse_event(code:int, x:int, y:int, release=False):
+    """
+    Returns the event from the parameters of a mouse report (`x` and `y` from 0).
+    """
+    ctrl, alt, shift = bool(code & 16), bool(code & 8), bool(code & 4)
+    button_bits = code & 3
+    if code & 64:
+        return Mouse_event(x, y, "scroll_up" if button_bits == 0 else "scroll_down", "press", ctrl, alt, shift)
+    button = None if button_bits == 3 else ("left", "middle", "right")[button_bits]
+    if code & 32:
+        action = "move"
+    elif release or button_bits == 3:
+        action = "release"
+    else:
+        action = "press"
+    return Mouse_event(x, y, button, action, ctrl, alt, shift)
+
+
+class Key_parser:
+    """
+    Turns the text read from a terminal into `Key_event`s, `Mouse_event`s and `Paste_event`s.\n
+    Escape sequences are matched with a prefix trie, so a sequence that got split between two reads is finished by the next one. Because the escape key is the start of every sequence, a lone ESC (or ESC + key, which is alt + key) only becomes an event when `flush` is called (after an `escape_timeout` without more input, see `Input_reader`).\n
+    Mouse reports (SGR and X10) and bracketed pastes are parsed too. Unknown CSI sequences are skipped.
+    """
+    def __init__(self):
+        self._buffer = ""
+
+
+    @property
+    def pending(self):
+        """
+        If there is an unfinished escape sequence, waiting for more input (or `flush`).
+        """
+        return bool(self._buffer)
+
+
+    def feed(self, text:str):
+        """
+        Returns the events from the text (and the unfinished sequence from the last call).
+        """
+        self._buffer += text
+        return self._parse(False)
+
+
+    def flush(self):
+        """
+        Returns the events from the unfinished sequence, as if nothing else is coming (ESC is the escape key).
+        """
+        return self._parse(True)
+
+
+    def _parse(self, final:bool):
+        events:list[Input_event] = []
+        buffer = self._buffer
+        index = 0
+        length = len(buffer)
+        while index < length:
+            char = buffer[index]
+            if char != "\x1b":
+                events.append(_char_event(char))
+                index += 1
+                continue
+            consumed, event = self._match_escape(buffer, index, final)
+            if consumed == 0:
+                break
+            if event != None:
+                events.append(event)
+            index += consumed
+        self._buffer = buffer[index:]
+        return events
+
+
+    def _match_escape(self, buffer:str, start:int, final:bool) -> tuple[int, Input_event|None]:
+        """
+        Returns the number of characters the escape sequence at the start takes up (0 if it's unfinished), and its event (or `None`, if it's unknown).
+        """
+        node = _TRIE
+        index = start
+        longest:tuple[int, object]|None = None
+        while index < len(buffer):
+            child = node.children.get(buffer[index])
+            if child == None:
+                break
+            node = child
+            index += 1
+            if node.value in (_MOUSE_SGR, _MOUSE_X10, _PASTE):
+                return self._match_special(node.value, buffer, start, index, final)
+            if node.value != None:
+                longest = (index, node.value)
+        else:
+            if node.children and not final:
+                # might be the start of a longer sequence
+                return 0, None
+        if longest != None:
+            return longest[0] - start, longest[1]
+        if start + 1 >= len(buffer):
+            if not final:
+                return 0, None
+            return 1, Key_event("escape")
+        next_char = buffer[start + 1]
+        if next_char == "[":
+            # unknown CSI sequence
+            end = _CSI_END.match(buffer, start + 2)
+            if end == None:
+                return (0, None) if not final else (2, Key_event("[", alt=True))
+            return end.end() - start, None
+        if next_char == "O" and start + 2 < len(buffer):
+            # unknown SS3 sequence
+            return 3, None
+        if next_char == "\x1b":
+            return 1, Key_event("escape")
+        return 2, _char_event(next_char, alt=True)
+
+
+    def _match_special(self, kind:str, buffer:str, start:int, index:int, final:bool) -> tuple[int, Input_event|None]:
+        if kind == _PASTE:
+            end = buffer.find(_PASTE_END, index)
+            if end == -1:
+                if not final:
+                    return 0, None
+                return len(buffer) - start, Paste_event(buffer[index:])
+            return end + len(_PASTE_END) - start, Paste_event(buffer[index:end])
+        if kind == _MOUSE_SGR:
+            match = _SGR_MOUSE.match(buffer, index)
+            if match == None:
+                prefix = _SGR_MOUSE_PREFIX.match(buffer, index)
+                if prefix.end() == len(buffer) and not final:
+                    return 0, None
+                return prefix.end() - start, None
+            code, x, y, end = match.groups()
+            return match.end() - start, _mouse_event(int(code), int(x) - 1, int(y) - 1, end == "m")
+        # X10: 3 characters after the sequence, offset by 32
+        if len(buffer) - index < 3:
+            return (0, None) if not final else (len(buffer) - start, None)
+        code, x, y = (ord(char) - 32 for char in buffer[index:index + 3])
+        return index + 3 - start, _mouse_event(code, x - 1, y - 1)
+
+
+_WINDOWS_KEYS = {
+    "H": "up", "P": "down", "K": "left", "M": "right", "G": "home", "O": "end", "I": "page_up", "Q": "page_down", "R": "insert", "S": "delete",
+    ";": "f1", "<": "f2", "=": "f3", ">": "f4", "?": "f5", "@": "f6", "A": "f7", "B": "f8", "C": "f9", "D": "f10", "\x85": "f11", "\x86": "f12",
+}
+
+
+class Input_reader:
+    """
+    Reads the keys (and mouse events and pastes) from the terminal, without blocking, and without polling.\n
+    While it's open (`open`, or `with`), the terminal is in cbreak mode (keys arrive right away, without echo, but ctrl+c still interrupts), or in raw mode (if `raw` is true).\n
+    `fileno` can be waited on with `selectors` or `asyncio` (`loop.add_reader`), then `read` returns the events that arrived. An escape key press is only known after `escape_timeout` seconds without more input: `timeout` returns how long to wait for it, and `expire` returns it.\n
+    `events` waits for events by itself. `Frame_scheduler.attach_input` reads the events in the frame loop.\n
+    If `mouse` is "click" (presses, releases and dragging) or "all" (every movement), mouse events are turned on. If `paste` is true, bracketed paste is turned on. These get turned on by writing to the `writer` (the `Frame_writer` of a screen), or to stdout.\n
+    On Windows, the keys are read with `msvcrt` by a background thread (mouse and paste events aren't supported).
+    """
+    def __init__(self, fd:int|None=None, writer:Frame_writer|None=None, raw=False, mouse:str|None=None, paste=True, escape_timeout=0.05, encoding="utf-8"):
+        """
+        `fd` is the file descriptor of the terminal, or `None` for stdin.
+        """
+        if mouse not in (None, "click", "all"):
+            raise ValueError(f"mouse must be None, 'click' or 'all', not {mouse!r}")
+        self.fd = fd
+        self.writer = writer if writer != None else Frame_writer()
+        self.raw = raw
+        self.mouse = mouse
+        self.paste = paste
+        self.escape_timeout = float(escape_timeout)
+        self.parser = Key_parser()
+        self._decoder = codecs.getincrementaldecoder(encoding)("replace")
+        self._pending_since = 0.0
+        self._old_settings:list|None = None
+        self._opened = False
+        # on Windows: the events from the reading thread, and the socket that wakes up the selectors
+        self._events:queue.SimpleQueue|None = None
+        self._wake_reader:socket.socket|None = None
+        self._wake_writer:socket.socket|None = None
+
+
+    def _modes(self, on:bool):
+        """
+        Returns the escape sequences that turn on (or off) the mouse and paste modes.
+        """
+        modes:list[str] = []
+        if self.mouse != None:
+            modes.append("1003" if self.mouse == "all" else "1002")
+            # SGR encoding
+            modes.append("1006")
+        if self.paste:
+            modes.append("2004")
+        if not modes:
+            return ""
+        if not on:
+            modes.reverse()
+        return "".join(f"\x1b[?{mode}{'h' if on else 'l'}" for mode in modes)
+
+
+    def open(self):
+        """
+        Puts the terminal in cbreak (or raw) mode, and turns on the mouse and paste modes.
+        """
+        if self._opened:
+            return self
+        self._opened = True
+        if os.name == "nt" and self.fd == None:
+            self._start_windows_thread()
+            return self
+        if self.fd == None:
+            self.fd = sys.stdin.fileno()
+        import termios
+        try:
+            self._old_settings = termios.tcgetattr(self.fd)
+        except termios.error:
+            # not a terminal (a pipe)
+            self._old_settings = None
+        if self._old_settings != None:
+            settings = termios.tcgetattr(self.fd)
+            settings[3] &= ~(termios.ICANON | termios.ECHO | termios.IEXTEN)
+            if self.raw:
+                settings[0] &= ~(termios.IXON | termios.ICRNL | termios.BRKINT | termios.INPCK | termios.ISTRIP)
+                settings[3] &= ~termios.ISIG
+            settings[6][termios.VMIN] = 1
+            settings[6][termios.VTIME] = 0
+            termios.tcsetattr(self.fd, termios.TCSANOW, settings)
+        modes = self._modes(True)
+        if modes:
+            self.writer.write(modes)
+        return self
+
+
+    def close(self):
+        """
+        Turns off the mouse and paste modes, and puts the terminal back into the mode it was in.
+        """
+        if not self._opened:
+            return
+        self._opened = False
+        if self._wake_reader != None:
+            self._wake_reader.close()
+            self._wake_writer.close()
+            self._wake_reader = None
+            self._wake_writer = None
+            return
+        modes = self._modes(False)
+        if modes:
+            self.writer.write(modes)
+        if self._old_settings != None:
+            import termios
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self._old_settings)
+            self._old_settings = None
+
+
+    def __enter__(self):
+        return self.open()
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    def fileno(self):
+        """
+        Returns the file descriptor, that becomes readable when there is input.
+        """
+        if self._wake_reader != None:
+            return self._wake_reader.fileno()
+        return self.fd if self.fd != None else sys.stdin.fileno()
+
+
+    def read(self):
+        """
+        Reads the input that arrived (call it when `fileno` is readable, because it blocks otherwise), and returns its events.
+        """
+        if self._events != None:
+            return self._read_windows()
+        data = os.read(self.fileno(), 4096)
+        if not data:
+            return []
+        events = self.parser.feed(self._decoder.decode(data))
+        if self.parser.pending:
+            self._pending_since = time.monotonic()
+        return events
+
+
+    def timeout(self):
+        """
+        Returns how many seconds are left until an unfinished escape sequence counts as an escape key press (see `expire`), or `None` if there isn't one.
+        """
+        if not self.parser.pending:
+            return None
+        return max(self._pending_since + self.escape_timeout - time.monotonic(), 0.0)
+
+
+    def expire(self):
+        """
+        Returns the events from an unfinished escape sequence, if no more input arrived for `escape_timeout` seconds.
+        """
+        timeout = self.timeout()
+        if timeout == None or timeout > 0:
+            return []
+        return self.parser.flush()
+
+
+    def events(self, timeout:float|None=None):
+        """
+        Waits at most `timeout` seconds (forever if it's `None`) for input, and returns its events (an empty list, if nothing arrived).
+        """
+        end = None if timeout == None else time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.fileno(), selectors.EVENT_READ)
+            while True:
+                wait = None if end == None else max(end - time.monotonic(), 0.0)
+                escape_wait = self.timeout()
+                if escape_wait != None:
+                    wait = escape_wait if wait == None else min(wait, escape_wait)
+                events = self.read() if selector.select(wait) else []
+                events.extend(self.expire())
+                if events or (end != None and time.monotonic() >= end):
+                    return events
+
+
+    def _start_windows_thread(self):
+        self._events = queue.SimpleQueue()
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+        threading.Thread(target=self._read_windows_keys, name="Input_reader", daemon=True).start()
+
+
+    def _read_windows_keys(self):
+        """
+        Reads the keys with `msvcrt` (blocking), in a background thread.
+        """
+        import msvcrt
+        while self._opened:
+            char = msvcrt.getwch()
+            if char in ("\x00", "\xe0"):
+                code = msvcrt.getwch()
+                name = _WINDOWS_KEYS.get(code)
+                if name == None:
+                    continue
+                event = Key_event(name)
+            else:
+                event = _char_event(char)
+            self._events.put(event)
+            try:
+                self._wake_writer.send(b"\0")
+            except (AttributeError, OSError):
+                return
+
+
+    def _read_windows(self):
+        try:
+            while self._wake_reader.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+        events:list[Input_event] = []
+        while not self._events.empty():
+            events.append(self._events.get())
+        return events
@@ -0,0 +1,65 @@
+from functools import lru_cache
+# local imports
+# from enums import Wrap_styles
+# from width import text_width, fit_text
+from screen_display.enums import Wrap_styles
+from screen_display.width import text_width, fit_text
+
+
+LAYOUT_CACHE_SIZE = 4096
+
+
+def _cut(text:str, width:int, cutoff_str:str|None):
+    """
+    Returns how many characters of the text fit into the width (in cells), and the line made from them.\n
+    If the text doesn't fit, and there is a `cutoff_str`, the end of the line gets replaced with it.
+    """
+    if text_width(text) <= width:
+        return len(text), text
+    cutoff_width = text_width(cutoff_str) if cutoff_str else 0
+    if cutoff_str and width > cutoff_width:
+        taken = fit_text(text, width - cutoff_width)
+        return taken, text[:taken] + cutoff_str
+    taken = fit_text(text, width)
+    return taken, text[:taken]
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def layout_text(text:str, x:int, width:int, wrap_style:Wrap_styles|None=None, cutoff_str:str|None=None):
+    """
+    Splits the text into lines, that fit into a screen with the specified width (in cells), if the text starts at `x`.\n
+    Returns a tuple of (line, x) pairs, one for each row, starting from the row of the text.\n
+    If `wrap_style` is `None`, the text doesn't wrap, and everything after the first line is cut off.\n
+    Otherwise the lines after the first one start at:\n
+    - LEFT: the left side of the screen
+    - CENTER: the position that centers the line on the screen
+    - RIGHT: the position that aligns the line to the right side of the screen
+    - UNDER: under the first character of the text\n
+    If `cutoff_str` isn't `None`, every line that doesn't fit ends with it.\n
+    The results are cached, so the same layout is only computed once.
+    """
+    first_width = width - x
+    if first_width <= 0:
+        return ()
+    taken, line = _cut(text, first_width, cutoff_str)
+    if wrap_style == None:
+        return ((line, x),)
+    lines = [(line, x)]
+    text = text[taken:]
+    while text:
+        if wrap_style == Wrap_styles.UNDER:
+            taken, line = _cut(text, first_width, cutoff_str)
+            lines.append((line, x))
+        else:
+            taken, line = _cut(text, width, cutoff_str)
+            if wrap_style == Wrap_styles.LEFT:
+                lines.append((line, 0))
+            elif wrap_style == Wrap_styles.CENTER:
+                lines.append((line, (width - text_width(line)) // 2))
+            else:
+                lines.append((line, width - text_width(line)))
+        # a wide character that can never fit
+        if taken == 0:
+            taken = 1
+        text = text[taken:]
+    return tuple(lines)
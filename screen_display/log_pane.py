@@ -0,0 +1,336 @@
+"""
+A rectangle of a `Screen` that shows the end of a log, kept in a fixed-size ring buffer.
+"""
+
+from collections import deque
+from typing import Callable, Iterable
+# local imports
+# from text import Text_style
+# from buffer import Cell_buffer
+# from screen import Screen, _blank_line
+# from width import fit_text, split_cells
+from screen_display.text import Text_style
+from screen_display.buffer import Cell_buffer
+from screen_display.screen import Screen, _blank_line
+from screen_display.width import fit_text, split_cells
+
+
+class Log_pane:
+    """
+    A rectangle of a `Screen` (or subscreen), that shows the last lines of a log.\n
+    Only the last `history` lines are kept (in a ring buffer), so adding a line costs the same, no matter how long the log is.\n
+    The pane is drawn over the texts of its screen, and under its subscreens. The parts of the lines that don't fit into the pane get cut off.\n
+    If the pane takes up whole rows of the terminal, and nothing else is drawn in them, new lines get scrolled in with a scroll region (DECSTBM), so only the new lines get written. Otherwise, only the cells that changed get redrawn.\n
+    The older lines can be shown with `scroll`, `page_up` and `page_down`. While the view is scrolled back, new lines don't move it.\n
+    If a `Frame_scheduler` is attached, the changes get drawn in the next frame (with one scroll for all the lines added since the last frame), and `append` is safe to call from other threads.
+    """
+    def __init__(self, screen:Screen, x=0, y=0, width:int|None=None, height:int|None=None, history=10000, style:Text_style=None):
+        """
+        If `width` or `height` is `None`, the pane reaches the edge of the screen.\n
+        `style` is the style of the lines.\n
+        The pane is added to the screen, and gets displayed by `render`, or when a line gets added.
+        """
+        self.sc = screen
+        self.x = int(x)
+        self.y = int(y)
+        # the size the pane was created with (`None` follows the screen)
+        self._requested_size = (width, height)
+        if style == None:
+            style = Text_style()
+        self.style = style
+        self.lines:deque[str] = deque(maxlen=int(history))
+        # how many lines the view is scrolled back from the last line
+        self.scrollback = 0
+        # how many lines were ever added (lines are numbered by this, so the number of a line doesn't change when old lines get dropped)
+        self._added = 0
+        # the (number of the top line, number of lines) of the view that is on the screen (None if unknown)
+        self._drawn:tuple[int, int]|None = None
+        screen._panes.append(self)
+
+
+    @property
+    def width(self):
+        """
+        The width of the pane (clipped to the screen).
+        """
+        width = self.sc.width - self.x
+        requested = self._requested_size[0]
+        return max(width if requested == None else min(requested, width), 0)
+
+
+    @property
+    def height(self):
+        """
+        The height of the pane (clipped to the screen).
+        """
+        height = self.sc.height - self.y
+        requested = self._requested_size[1]
+        return max(height if requested == None else min(requested, height), 0)
+
+
+    @property
+    def following(self):
+        """
+        If the view shows the last lines (it isn't scrolled back).
+        """
+        return self.scrollback == 0
+
+
+    def _view(self):
+        """
+        Returns the (index of the top line in `lines`, number of lines) of the lines in the view.
+        """
+        end = len(self.lines) - self.scrollback
+        start = max(end - self.height, 0)
+        return start, end - start
+
+
+    def visible_lines(self):
+        """
+        Returns the lines in the view, from the top.
+        """
+        start, count = self._view()
+        lines = self.lines
+        return [lines[start + row] for row in range(count)]
+
+
+    def _change(self, change:Callable, *args):
+        """
+        Makes the change (while holding the lock of the scheduler, if one is attached), then draws it (or marks the pane dirty).
+        """
+        scheduler = self.sc._root().scheduler
+        if scheduler == None:
+            change(*args)
+            self._flush()
+            return
+        with scheduler.lock:
+            change(*args)
+            scheduler.mark_pane_dirty(self)
+
+
+    def _add(self, lines:Iterable[str]):
+        added = 0
+        for line in lines:
+            line = str(line)
+            if line.endswith("\n"):
+                line = line[:-1]
+            if "\t" in line:
+                line = line.expandtabs()
+            parts = line.split("\n")
+            self.lines.extend(parts)
+            added += len(parts)
+        self._added += added
+        if self.scrollback:
+            # keeps the view where it is
+            self.scrollback = min(self.scrollback + added, max(len(self.lines) - self.height, 0))
+
+
+    def append(self, line:str):
+        """
+        Adds a line to the end of the log (or more, if it has line breaks).
+        """
+        self._change(self._add, (line,))
+
+
+    def extend(self, lines:Iterable[str]):
+        """
+        Adds the lines to the end of the log, and draws them at once.
+        """
+        self._change(self._add, lines)
+
+
+    def _scroll(self, lines:int):
+        self.scrollback = max(min(self.scrollback + lines, len(self.lines) - self.height), 0)
+
+
+    def scroll(self, lines:int):
+        """
+        Scrolls the view back by the number of lines (forward, if it's negative), but not past the first or the last line.
+        """
+        self._change(self._scroll, int(lines))
+
+
+    def page_up(self):
+        """
+        Scrolls the view back by its height.
+        """
+        self.scroll(max(self.height, 1))
+
+
+    def page_down(self):
+        """
+        Scrolls the view forward by its height.
+        """
+        self.scroll(-max(self.height, 1))
+
+
+    def scroll_to_end(self):
+        """
+        Scrolls the view to the last lines, so it follows the new lines again.
+        """
+        self._change(self._scroll, -len(self.lines))
+
+
+    def _clear(self):
+        self.lines.clear()
+        self.scrollback = 0
+
+
+    def clear(self):
+        """
+        Removes all lines.
+        """
+        self._change(self._clear)
+
+
+    def _remove(self):
+        if self in self.sc._panes:
+            self.sc._panes.remove(self)
+        self._drawn = None
+
+
+    def remove(self):
+        """
+        Removes (and erases) the pane from its screen.
+        """
+        self._change(self._remove)
+
+
+    def _fit(self, line:str, width:int):
+        """
+        Returns the part of the line that fits into the pane.
+        """
+        if len(line) <= width and line.isascii():
+            return line
+        return line[:fit_text(line, width)]
+
+
+    def _cut(self, line:str, start:int, end:int):
+        """
+        Returns the cells of the line between the two x coordinates (relative to the line).\n
+        The halves of wide characters that got cut in half are replaced with spaces.
+        """
+        if line.isascii():
+            return line[start:end]
+        all_cells = split_cells(line)
+        cells = list(all_cells[start:end])
+        if cells and cells[0] == "":
+            cells[0] = " "
+        if cells and end < len(all_cells) and all_cells[end] == "":
+            cells[-1] = " "
+        return "".join(cells)
+
+
+    def _paint(self, buffer:Cell_buffer, x0:int, y0:int):
+        """
+        Draws the whole view into the buffer (composing a frame), with the top left corner of the screen at (`x0`, `y0`).
+        """
+        width = self.width
+        start, count = self._view()
+        self._drawn = (self._added - len(self.lines) + start, count)
+        if width == 0:
+            return
+        blank = _blank_line(width)
+        default_style = self.sc._resolve_style(self.sc.default_style)
+        style = self.sc._resolve_style(self.style)
+        lines = self.lines
+        for row in range(self.height):
+            buffer.put(blank, x0 + self.x, y0 + self.y + row, default_style)
+            if row < count:
+                buffer.put(self._fit(lines[start + row], width), x0 + self.x, y0 + self.y + row, style)
+
+
+    def _paint_span(self, buffer:Cell_buffer, y:int, start:int, end:int, x0:int, y0:int):
+        """
+        Draws the row of the view at the y coordinate of the screen into the buffer, if it's in the (y, start x, end x) span, with the top left corner of the screen at (`x0`, `y0`).
+        """
+        row = y - self.y
+        width = self.width
+        start = max(start, self.x)
+        end = min(end, self.x + width)
+        if row < 0 or row >= self.height or end <= start:
+            return
+        buffer.put(_blank_line(end - start), x0 + start, y0 + y, self.sc._resolve_style(self.sc.default_style))
+        top, count = self._view()
+        if row < count:
+            line = self._cut(self._fit(self.lines[top + row], width), start - self.x, end - self.x)
+            buffer.put(line, x0 + start, y0 + y, self.sc._resolve_style(self.style))
+
+
+    def _scroll_rows(self, moved:int):
+        """
+        Scrolls the rows of the pane up by the number of rows (down, if it's negative) on the terminal, and in the front buffer of the outermost screen, with a scroll region.\n
+        Only scrolls them if the pane takes up whole rows of the terminal, and nothing else is drawn in them.\n
+        Returns if they got scrolled.
+        """
+        width = self.width
+        height = self.height
+        screen = self.sc
+        x = self.x
+        top = self.y
+        # the subscreen the pane is in, inside `screen`
+        inside:Screen|None = None
+        while True:
+            if x != 0 or width != screen.width or top < 0 or top + height > screen.height:
+                return False
+            rows = screen._rows
+            for y in range(top, top + height):
+                if y in rows:
+                    return False
+            for pane in screen._panes:
+                if pane is not self and pane.y < top + height and pane.y + pane.height > top and pane.width > 0:
+                    return False
+            for child in screen._children:
+                if child is not inside and child.offset[1] < top + height and child.offset[1] + child.height > top:
+                    return False
+            if screen.parent == None:
+                break
+            x += screen.offset[0]
+            top += screen.offset[1]
+            inside = screen
+            screen = screen.parent
+        front = screen._front
+        if (
+            front == None or front.width != screen.width or front.height != screen.height or
+            screen.offset[0] != 0 or screen.width < screen.backend.get_terminal_size()[0]
+        ):
+            return False
+        blank_style = self.sc._resolve_style(self.sc.default_style)
+        # the rows that scroll in get the background of the current style
+        screen.change_style(blank_style)
+        screen.writer.write(f"\x1b[{screen.offset[1] + top + 1};{screen.offset[1] + top + height}r")
+        screen.writer.write(f"\x1b[{moved}S" if moved > 0 else f"\x1b[{-moved}T")
+        # setting the scroll region moves the cursor home
+        screen.writer.write("\x1b[r")
+        screen._cursor = None
+        front.scroll(top, top + height, moved, blank_style)
+        return True
+
+
+    def _flush(self):
+        """
+        Draws the changes of the view since it was last drawn.\n
+        If the view only moved by less than its height, the rows get scrolled (if they can be, see `_scroll_rows`), and only the new rows get drawn.
+        """
+        start, count = self._view()
+        view = (self._added - len(self.lines) + start, count)
+        drawn = self._drawn
+        if view == drawn:
+            return
+        self._drawn = view
+        width = self.width
+        height = self.height
+        if width == 0 or height == 0:
+            return
+        with self.sc.writer.frame():
+            if drawn == None:
+                rows = range(height)
+            elif view[0] == drawn[0]:
+                rows = range(min(count, drawn[1]), max(count, drawn[1]))
+            else:
+                moved = view[0] - drawn[0]
+                if abs(moved) < height and count == drawn[1] == height and self._scroll_rows(moved):
+                    rows = range(height - moved, height) if moved > 0 else range(-moved)
+                else:
+                    rows = range(height)
+            self.sc._repaint([(self.y + row, self.x, self.x + width) for row in rows])
@@ -0,0 +1,192 @@
+"""
+Opt-in per-frame measurements for a `Screen` (see `Screen.enable_metrics`).
+"""
+
+import cProfile
+import heapq
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable
+
+
+class Frame_record:
+    """
+    The measurements of one frame (everything the screen did since the previous frame finished).\n
+    - `duration`: the time from the start to the end of the frame, in seconds
+    - `layout`: the time spent laying out texts (`Screen_text.update`)
+    - `flush`: the time spent writing the frame to the output
+    - `encode`: the rest of the frame (composing, diffing, generating escape sequences)
+    - `bytes`, `escapes`: what got written
+    - `cursor_moves`, `style_switches`: how many cursor movement and SGR sequences got written
+    - `cells_changed`: how many cells got redrawn
+    - `texts_touched`: how many texts got laid out again
+    - `peak_memory`: the peak memory traced during the frame (if tracing memory)
+    - `profile`, `snapshot`: the `cProfile.Profile` and `tracemalloc.Snapshot` of the frame (only kept for the slowest frames)
+    """
+    __slots__ = (
+        "index", "start", "duration", "layout", "encode", "flush",
+        "bytes", "escapes", "cursor_moves", "style_switches", "cells_changed", "texts_touched",
+        "peak_memory", "profile", "snapshot", "_layout_at_start",
+    )
+
+
+    def __init__(self, index:int):
+        self.index = index
+        self.start = 0.0
+        self.duration = 0.0
+        self.layout = 0.0
+        self.encode = 0.0
+        self.flush = 0.0
+        self.bytes = 0
+        self.escapes = 0
+        self.cursor_moves = 0
+        self.style_switches = 0
+        self.cells_changed = 0
+        self.texts_touched = 0
+        self.peak_memory = 0
+        self.profile:cProfile.Profile|None = None
+        self.snapshot:tracemalloc.Snapshot|None = None
+        self._layout_at_start = 0.0
+
+
+    def as_dict(self):
+        """
+        Returns the measurements as a dictionary (without the profile and the snapshot).
+        """
+        return {name: getattr(self, name) for name in self.__slots__[:-3]}
+
+
+    def __repr__(self):
+        return (
+            f"Frame_record({self.index}: {self.duration * 1000:.3f} ms "
+            f"(layout {self.layout * 1000:.3f}, encode {self.encode * 1000:.3f}, flush {self.flush * 1000:.3f}), "
+            f"{self.bytes} B, {self.escapes} escapes, {self.cells_changed} cells)"
+        )
+
+
+class Screen_metrics:
+    """
+    Collects a `Frame_record` for every frame of a screen.\n
+    The last `history` records are kept in `frames`, and every finished record gets passed to the hooks (`add_hook`).\n
+    If `profile_slowest` is more than 0, every frame gets profiled with `cProfile`, and the profiles of that many slowest frames are kept (`slowest`).\n
+    If `trace_memory` is true, the peak memory use of every frame is measured with `tracemalloc`, and the slowest frames also keep a snapshot.
+    """
+    def __init__(self, history=120, profile_slowest=0, trace_memory=False):
+        self.frames:deque[Frame_record] = deque(maxlen=history)
+        self.profile_slowest = int(profile_slowest)
+        self.trace_memory = bool(trace_memory)
+        self.current = Frame_record(0)
+        self.total_frames = 0
+        self._hooks:list[Callable[[Frame_record], None]] = []
+        # (duration, index, record) min-heap of the slowest frames
+        self._slowest:list[tuple[float, int, Frame_record]] = []
+        self._profile:cProfile.Profile|None = None
+        self._started_tracing = False
+
+
+    def add_hook(self, hook:Callable[[Frame_record], None]):
+        """
+        Makes the function get called with the record of every finished frame.
+        """
+        self._hooks.append(hook)
+
+
+    def remove_hook(self, hook:Callable[[Frame_record], None]):
+        self._hooks.remove(hook)
+
+
+    def frame_started(self):
+        record = self.current
+        record.start = time.perf_counter()
+        record._layout_at_start = record.layout
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        if self.profile_slowest > 0:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+
+    def frame_finished(self):
+        record = self.current
+        profile = self._profile
+        if profile != None:
+            profile.disable()
+            self._profile = None
+        record.duration = time.perf_counter() - record.start
+        record.encode = max(record.duration - record.flush - (record.layout - record._layout_at_start), 0.0)
+        if self.trace_memory and tracemalloc.is_tracing():
+            record.peak_memory = tracemalloc.get_traced_memory()[1]
+        if self.profile_slowest > 0 or self.trace_memory:
+            self._keep_if_slow(record, profile)
+        self.frames.append(record)
+        self.total_frames += 1
+        self.current = Frame_record(self.total_frames)
+        for hook in self._hooks:
+            hook(record)
+
+
+    def _keep_if_slow(self, record:Frame_record, profile:cProfile.Profile|None):
+        """
+        Keeps the profile (and memory snapshot) of the frame, if it's one of the slowest ones.
+        """
+        limit = max(self.profile_slowest, 1)
+        if len(self._slowest) >= limit and record.duration <= self._slowest[0][0]:
+            return
+        record.profile = profile
+        if self.trace_memory and tracemalloc.is_tracing():
+            record.snapshot = tracemalloc.take_snapshot()
+        entry = (record.duration, record.index, record)
+        if len(self._slowest) < limit:
+            heapq.heappush(self._slowest, entry)
+        else:
+            heapq.heapreplace(self._slowest, entry)
+
+
+    def flushed(self, data:str, seconds:float):
+        record = self.current
+        record.flush += seconds
+        record.bytes += len(data.encode("utf-8"))
+        record.escapes += data.count("\x1b")
+
+
+    def laid_out(self, seconds:float):
+        record = self.current
+        record.layout += seconds
+        record.texts_touched += 1
+
+
+    def slowest(self):
+        """
+        Returns the records of the slowest frames (with their profiles and snapshots), from the slowest.
+        """
+        return [record for _, _, record in sorted(self._slowest, reverse=True)]
+
+
+    def summary(self):
+        """
+        Returns the averages of the measurements of the kept frames, and the maximum duration.
+        """
+        frames = list(self.frames)
+        if not frames:
+            return {"frames": 0}
+        summary:dict[str, float] = {"frames": len(frames)}
+        for name in ("duration", "layout", "encode", "flush", "bytes", "escapes", "cursor_moves", "style_switches", "cells_changed", "texts_touched"):
+            summary[name] = sum(getattr(frame, name) for frame in frames) / len(frames)
+        summary["max_duration"] = max(frame.duration for frame in frames)
+        return summary
+
+
+    def close(self):
+        """
+        Stops profiling, and tracing memory (if it was started by these metrics).
+        """
+        if self._profile != None:
+            self._profile.disable()
+            self._profile = None
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
@@ -0,0 +1,254 @@
+"""
+NumPy backed cell buffer, for large screens.\n
+Only imported by `get_buffer_class`, if NumPy is installed.
+"""
+
+from functools import lru_cache
+from typing import Iterable
+import numpy as np
+# local imports
+# from text import Text_style
+# from width import split_cells
+from screen_display.text import Text_style
+from screen_display.width import split_cells
+
+
+# the code of the second cell of a wide character
+_WIDE_REST = -1
+_SPACE = ord(" ")
+# cells with more than one character (with combining characters) get negative codes from -2
+_clusters:list[str] = []
+_cluster_codes:dict[str, int] = {}
+
+
+def _cell_code(cell:str):
+    """
+    Returns the code for the contents of a cell.
+    """
+    if len(cell) == 1:
+        return ord(cell)
+    if cell == "":
+        return _WIDE_REST
+    code = _cluster_codes.get(cell)
+    if code == None:
+        code = -2 - len(_clusters)
+        _clusters.append(cell)
+        _cluster_codes[cell] = code
+    return code
+
+
+def _cell_char(code:int):
+    """
+    Returns the contents of a cell from its code.
+    """
+    if code >= 0:
+        return chr(code)
+    if code == _WIDE_REST:
+        return ""
+    return _clusters[-2 - code]
+
+
+@lru_cache(maxsize=4096)
+def _text_codes(text:str):
+    """
+    Returns the cell codes of the text as an array, and if the text has wide characters.
+    """
+    if text.isascii() and text.isprintable():
+        return np.frombuffer(text.encode("ascii"), dtype=np.uint8).astype(np.int32), False
+    cells = np.array([_cell_code(cell) for cell in split_cells(text)], dtype=np.int32)
+    return cells, bool((cells == _WIDE_REST).any())
+
+
+class Numpy_cell_buffer:
+    """
+    A `Cell_buffer` that stores the characters and the styles of the cells as code points and style indexes in NumPy arrays (`codes`, `style_ids`).\n
+    Finding the changed cells between two frames is one vectorized comparison.\n
+    A style index of 0 means that the contents of the cell are unknown.\n
+    The rows that might have wide characters are kept in `wide_rows`, so writing into the other rows can skip fixing up the wide characters.
+    """
+    def __init__(self, width:int, height:int, style:Text_style=None):
+        self.width = int(width)
+        self.height = int(height)
+        self.codes = np.full((self.height, self.width), _SPACE, dtype=np.int32)
+        self.style_ids = np.zeros((self.height, self.width), dtype=np.uint16)
+        self.wide_rows:set[int] = set()
+        self.fill(style)
+
+
+    def fill(self, style:Text_style=None):
+        """
+        Fills the whole buffer with spaces with the specified style.
+        """
+        self.codes.fill(_SPACE)
+        self.wide_rows.clear()
+        self.style_ids.fill(0 if style == None else style.index)
+
+
+    def put(self, text:str, x:int, y:int, style:Text_style|None):
+        """
+        Writes the text into the buffer, starting from the specified coordinates.\n
+        Everything that doesn't fit into the row gets cut off.\n
+        Wide characters that only get partly overwritten (or cut off) are replaced with a space, like in a terminal.
+        """
+        if y < 0 or y >= self.height or x >= self.width:
+            return
+        cells, wide = _text_codes(text)
+        if x < 0:
+            cells = cells[-x:]
+            x = 0
+        end = min(x + len(cells), self.width)
+        if end <= x:
+            return
+        codes = self.codes[y]
+        if not wide and y not in self.wide_rows:
+            codes[x:end] = cells[:end - x]
+            self.style_ids[y, x:end] = 0 if style == None else style.index
+            return
+        self.wide_rows.add(y)
+        # the other halves of the wide characters that get overwritten
+        if x > 0 and codes[x] == _WIDE_REST:
+            codes[x - 1] = _SPACE
+        if end < self.width and codes[end] == _WIDE_REST:
+            codes[end] = _SPACE
+        codes[x:end] = cells[:end - x]
+        self.style_ids[y, x:end] = 0 if style == None else style.index
+        # wide characters that got cut in half
+        if codes[x] == _WIDE_REST:
+            codes[x] = _SPACE
+        if end - x < len(cells) and cells[end - x] == _WIDE_REST:
+            codes[end - 1] = _SPACE
+
+
+    def _put_batch(self, batch:list[tuple[np.ndarray, int, int, int]]):
+        """
+        Writes the (cell codes, x, y, style index) items (without wide characters, into rows without wide characters) into the buffer at once.\n
+        The later items overwrite the earlier ones.
+        """
+        lengths = np.array([len(item[0]) for item in batch])
+        starts = np.cumsum(lengths) - lengths
+        cells = np.concatenate([item[0] for item in batch])
+        offsets = np.arange(len(cells)) - np.repeat(starts, lengths)
+        xs = np.repeat(np.array([item[1] for item in batch]), lengths) + offsets
+        ys = np.repeat(np.array([item[2] for item in batch]), lengths)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        positions = ys[inside] * self.width + xs[inside]
+        # NumPy doesn't define which value gets assigned to a repeated position, so only the last cell of every position is kept
+        unique_positions, last = np.unique(positions[::-1], return_index=True)
+        last = len(positions) - 1 - last
+        positions = unique_positions
+        self.codes.reshape(-1)[positions] = cells[inside][last]
+        self.style_ids.reshape(-1)[positions] = np.repeat(np.array([item[3] for item in batch], dtype=np.uint16), lengths)[inside][last]
+
+
+    def put_many(self, items:Iterable[tuple[str, int, int, Text_style|None]]):
+        """
+        Writes all (text, x, y, style) items into the buffer, in order, like `put`.\n
+        Consecutive items without wide characters are written with one vectorized assignment.
+        """
+        batch:list[tuple[np.ndarray, int, int, int]] = []
+        for text, x, y, style in items:
+            cells, wide = _text_codes(text)
+            if wide or y in self.wide_rows:
+                if batch:
+                    self._put_batch(batch)
+                    batch = []
+                self.put(text, x, y, style)
+            else:
+                batch.append((cells, x, y, 0 if style == None else style.index))
+        if batch:
+            self._put_batch(batch)
+
+
+    def scroll(self, top:int, bottom:int, count:int, style:Text_style=None):
+        """
+        Moves the rows between the two y coordinates up by `count` rows (down, if it's negative), like a terminal scrolls its scroll region.\n
+        The rows that get uncovered are filled with spaces with the specified style.
+        """
+        count = max(min(count, bottom - top), top - bottom)
+        if count == 0:
+            return
+        if count > 0:
+            self.codes[top:bottom - count] = self.codes[top + count:bottom]
+            self.style_ids[top:bottom - count] = self.style_ids[top + count:bottom]
+            uncovered = range(bottom - count, bottom)
+        else:
+            self.codes[top - count:bottom] = self.codes[top:bottom + count]
+            self.style_ids[top - count:bottom] = self.style_ids[top:bottom + count]
+            uncovered = range(top, top - count)
+        self.codes[uncovered.start:uncovered.stop] = _SPACE
+        self.style_ids[uncovered.start:uncovered.stop] = 0 if style == None else style.index
+        self.wide_rows = {
+            y if y < top or y >= bottom else y - count
+            for y in self.wide_rows
+            if y < top or y >= bottom or top <= y - count < bottom
+        }
+
+
+    def cells(self, y:int, start:int, end:int):
+        """
+        Returns the characters and the styles of the cells in the row, between the two x coordinates.
+        """
+        by_index = Text_style._by_index
+        chars = [_cell_char(code) for code in self.codes[y, start:end].tolist()]
+        styles = [by_index[index] for index in self.style_ids[y, start:end].tolist()]
+        return chars, styles
+
+
+    def _add_runs(self, ys:list[int], starts:list[int], ends:list[int], runs:list[tuple[int, int, int]]):
+        """
+        Adds the runs to `runs`, after making sure they don't start or end in the middle of a wide character, and merging the ones that touch.
+        """
+        codes = self.codes
+        width = self.width
+        wide_rows = self.wide_rows
+        for y, start, end in zip(ys, starts, ends):
+            if y in wide_rows:
+                if start > 0 and codes[y, start] == _WIDE_REST:
+                    start -= 1
+                if end < width and codes[y, end] == _WIDE_REST:
+                    end += 1
+            if runs and runs[-1][0] == y and runs[-1][2] >= start:
+                start = runs.pop()[1]
+            runs.append((y, start, end))
+
+
+    def diff(self, other:'Numpy_cell_buffer'):
+        """
+        Returns the list of cell runs that are different from the `other` buffer, as (y, start x, end x) tuples.
+        """
+        changed = (self.codes != other.codes) | (self.style_ids != other.style_ids)
+        rows = np.flatnonzero(changed.any(axis=1))
+        runs:list[tuple[int, int, int]] = []
+        if rows.size == 0:
+            return runs
+        # the edges of the runs of changed cells in the changed rows
+        padded = np.zeros((rows.size, self.width + 2), dtype=np.int8)
+        padded[:, 1:-1] = changed[rows]
+        edges = np.diff(padded, axis=1)
+        start_rows, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        self._add_runs(rows[start_rows].tolist(), starts.tolist(), ends.tolist(), runs)
+        return runs
+
+
+    def diff_spans(self, other:'Numpy_cell_buffer', spans:list[tuple[int, int, int]]):
+        """
+        Returns the list of cell runs that are different from the `other` buffer, as (y, start x, end x) tuples, but only checks the cells in the (y, start x, end x) spans.\n
+        The spans must be sorted, and must not overlap.
+        """
+        runs:list[tuple[int, int, int]] = []
+        for y, start, end in spans:
+            start = max(start, 0)
+            end = min(end, self.width)
+            if end <= start:
+                continue
+            changed = (self.codes[y, start:end] != other.codes[y, start:end]) | (self.style_ids[y, start:end] != other.style_ids[y, start:end])
+            if not changed.any():
+                continue
+            padded = np.zeros(end - start + 2, dtype=np.int8)
+            padded[1:-1] = changed
+            edges = np.diff(padded)
+            starts = (np.flatnonzero(edges == 1) + start).tolist()
+            ends = (np.flatnonzero(edges == -1) + start).tolist()
+            self._add_runs([y] * len(starts), starts, ends, runs)
+        return runs
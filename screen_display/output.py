@@ -0,0 +1,277 @@
+import io
+import os
+import sys
+import time
+from collections import deque
+from collections.abc import Callable
+
+
+def _write_fd(fd:int, data:bytes):
+    """
+    Writes all of the data into the file descriptor.
+    """
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _write_binary(stream, data:bytes):
+    """
+    Writes all of the data into a binary stream, and flushes it.
+    """
+    view = memoryview(data)
+    while view:
+        written = stream.write(view)
+        # buffered streams always write everything
+        if written == None or written >= len(view):
+            break
+        view = view[written:]
+    if hasattr(stream, "flush"):
+        stream.flush()
+
+
+def _write_text(stream, data:str):
+    """
+    Writes the data into a text stream, and flushes it.
+    """
+    stream.write(data)
+    if hasattr(stream, "flush"):
+        stream.flush()
+
+
+def _write_stdout(data:str):
+    # looked up every time, because colorama can replace it
+    _write_text(sys.stdout, data)
+
+
+def _is_text_stream(stream):
+    """
+    Guesses if the stream accepts `str` or `bytes`.
+    """
+    if isinstance(stream, io.TextIOBase):
+        return True
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)):
+        return False
+    mode = getattr(stream, "mode", None)
+    if isinstance(mode, str):
+        return "b" not in mode
+    return hasattr(stream, "encoding")
+
+
+class Frame_writer:
+    """
+    Collects everything that a `Screen` writes to the terminal, and writes it out with one `write()` at the end of the frame.\n
+    `output` can be a text stream, a binary stream, a socket, a file descriptor, a function that gets called with the text of every frame, or `None` for `sys.stdout`.\n
+    `encoding` is used for the outputs that need `bytes`.\n
+    Frames can be nested with `with writer.frame():`, and only the outermost one gets flushed. Anything written outside of a frame gets flushed immediately.
+    """
+    def __init__(self, output=None, encoding="utf-8"):
+        self.output = output
+        self.encoding = str(encoding)
+        self._parts:list[str] = []
+        self._depth = 0
+        # the `Screen_metrics` the frames get measured by (see `Screen.enable_metrics`)
+        self.metrics:'Screen_metrics|None' = None
+        # functions that also get the text of every flushed frame (see `add_tap`)
+        self._taps:list[Callable[[str], None]] = []
+        if output == None:
+            self._sink = _write_stdout
+        elif isinstance(output, int):
+            self._sink = lambda data: _write_fd(output, data.encode(self.encoding))
+        elif callable(output):
+            self._sink = output
+        elif hasattr(output, "sendall"):
+            self._sink = lambda data: output.sendall(data.encode(self.encoding))
+        elif _is_text_stream(output):
+            self._sink = lambda data: _write_text(output, data)
+        else:
+            self._sink = lambda data: _write_binary(output, data.encode(self.encoding))
+
+
+    def write(self, text:str):
+        """
+        Adds the text to the current frame.
+        """
+        self._parts.append(text)
+        if self._depth == 0:
+            self.flush()
+
+
+    def frame(self):
+        """
+        Returns the writer, for use in a `with` statement, that makes everything written inside it go out together.
+        """
+        return self
+
+
+    def __enter__(self):
+        self._depth += 1
+        if self._depth == 1 and self.metrics != None:
+            self.metrics.frame_started()
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if self._depth == 0:
+            self.flush()
+            if self.metrics != None:
+                self.metrics.frame_finished()
+
+
+    def flush(self):
+        """
+        Writes out everything from the current frame with a single `write()`.
+        """
+        if not self._parts:
+            return
+        data = "".join(self._parts)
+        self._parts.clear()
+        if self.metrics == None:
+            self._sink(data)
+        else:
+            start = time.perf_counter()
+            self._sink(data)
+            self.metrics.flushed(data, time.perf_counter() - start)
+        for tap in self._taps:
+            tap(data)
+
+
+    def add_tap(self, tap:Callable[[str], None]):
+        """
+        Makes the function get called with the text of every frame, after it got written (from the thread that made the frame).
+        """
+        self._taps.append(tap)
+
+
+    def remove_tap(self, tap:Callable[[str], None]):
+        if tap in self._taps:
+            self._taps.remove(tap)
+
+
+    def start_thread(self, max_frames=2, keyframe:Callable[[], str|None]|None=None):
+        """
+        Makes the frames get written to the output by a background thread (see `Threaded_sink`), and returns the `Threaded_sink`.
+        """
+        if not isinstance(self._sink, Threaded_sink):
+            self._sink = Threaded_sink(self._sink, max_frames, keyframe)
+        return self._sink
+
+
+    def stop_thread(self):
+        """
+        Writes out the queued frames, stops the background thread, and makes the frames get written right away again.
+        """
+        if isinstance(self._sink, Threaded_sink):
+            sink = self._sink
+            self._sink = sink.sink
+            sink.close()
+
+
+class Threaded_sink:
+    """
+    Writes the frames into another sink (function) from a background thread, so the thread that made a frame never waits for the output.\n
+    The frames wait in a queue of at most `max_frames` frames. If the output falls behind, and the queue is full, the queued frames get dropped, and the new frame gets replaced by a keyframe (from the `keyframe` function), that redraws everything.\n
+    If there is no `keyframe` function (or it returns `None`), the queued frames get merged into one write instead.\n
+    `frames_written`, `frames_dropped`, `keyframes`, and the time the frames spent in the queue (`latency_last`, `latency_max`, `latency_total`) are counted. Every frame that got queued ends up counted as written (merged frames too) or dropped (the ones a keyframe replaced).
+    """
+    def __init__(self, sink:Callable[[str], None], max_frames=2, keyframe:Callable[[], str|None]|None=None):
+        import threading
+        if max_frames < 1:
+            raise ValueError(f"max_frames must be at least 1, not {max_frames}")
+        self.sink = sink
+        self.max_frames = int(max_frames)
+        self.keyframe = keyframe
+        # (time it got queued, frame, number of queued frames it stands for)
+        self._queue:deque[tuple[float, str, int]] = deque()
+        self._condition = threading.Condition()
+        self._writing = False
+        self._closed = False
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.keyframes = 0
+        self.latency_last = 0.0
+        self.latency_max = 0.0
+        self.latency_total = 0.0
+        # the last exception the sink raised
+        self.error:Exception|None = None
+        self._thread = threading.Thread(target=self._run, name="Threaded_sink", daemon=True)
+        self._thread.start()
+
+
+    def __call__(self, data:str):
+        """
+        Queues the frame, without waiting for it to get written.
+        """
+        with self._condition:
+            if self._closed:
+                raise ValueError("the sink is closed")
+            queued_at = time.perf_counter()
+            frames = 1
+            if len(self._queue) >= self.max_frames:
+                keyframe = self.keyframe() if self.keyframe != None else None
+                if keyframe != None:
+                    # the keyframe stands for the new frame
+                    self.frames_dropped += sum(entry[2] for entry in self._queue)
+                    self.keyframes += 1
+                    data = keyframe
+                else:
+                    data = "".join(entry[1] for entry in self._queue) + data
+                    frames += sum(entry[2] for entry in self._queue)
+                queued_at = self._queue[0][0]
+                self._queue.clear()
+            self._queue.append((queued_at, data, frames))
+            self._condition.notify_all()
+
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                queued_at, data, frames = self._queue.popleft()
+                self._writing = True
+            try:
+                self.sink(data)
+            except Exception as error:
+                self.error = error
+            latency = time.perf_counter() - queued_at
+            with self._condition:
+                self._writing = False
+                self.frames_written += frames
+                self.latency_last = latency
+                self.latency_max = max(self.latency_max, latency)
+                self.latency_total += latency
+                self._condition.notify_all()
+
+
+    def queued(self):
+        """
+        Returns how many frames are waiting to be written.
+        """
+        with self._condition:
+            return len(self._queue)
+
+
+    def wait(self, timeout:float|None=None):
+        """
+        Waits until every queued frame is written.\n
+        Returns if the queue got empty before the timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._writing, timeout)
+
+
+    def close(self):
+        """
+        Writes out the queued frames, and stops the thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        import threading
+        if self._thread is not threading.current_thread():
+            self._thread.join()
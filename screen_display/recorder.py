@@ -0,0 +1,278 @@
+"""
+Records the frames of a `Screen` into a compact, append-only log file, and replays them.
+"""
+
+import json
+import struct
+import threading
+import time
+import zlib
+from typing import BinaryIO, Iterator
+# local imports
+# from screen import Screen
+# from output import Frame_writer
+# from virtual_terminal import Virtual_terminal
+from screen_display.screen import Screen
+from screen_display.output import Frame_writer
+from screen_display.virtual_terminal import Virtual_terminal
+
+
+_MAGIC = b"SDREC"
+_VERSION = 1
+# version, width, height, start time (UNIX time)
+_HEADER = struct.Struct("<BHHd")
+# flags, time since the start, length of the data
+_RECORD = struct.Struct("<BdI")
+_KEYFRAME = 1
+_COMPRESSED = 2
+# frames longer than this get compressed
+COMPRESS_MIN_LENGTH = 512
+
+
+class Frame_recorder:
+    """
+    Records every frame a `Screen` (and its subscreens) writes into a log file, while it's attached.\n
+    The frames are already deltas (only the changed cells get written), so they are stored as they are, with the time they were written.\n
+    Every `keyframe_interval` seconds (or `keyframe_frames` frames), a keyframe (`Screen.encode_keyframe`), that redraws everything, gets stored after the frame, so replaying can start from the middle of the recording.\n
+    The log is only appended to, and gets written to the file as it goes, so the recording isn't kept in memory. Long frames are compressed with `zlib`.\n
+    Read the log with `Recording`.
+    """
+    def __init__(self, screen:Screen, file:str|BinaryIO, keyframe_interval:float=5.0, keyframe_frames=300):
+        """
+        `file` is the path of the log file (overwritten), or a binary file object (not closed by `close`).
+        """
+        self.screen = screen._root()
+        self.keyframe_interval = float(keyframe_interval)
+        self.keyframe_frames = int(keyframe_frames)
+        if isinstance(file, str):
+            self.file:BinaryIO = open(file, "wb")
+            self._owns_file = True
+        else:
+            self.file = file
+            self._owns_file = False
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._last_keyframe = self._start
+        self._frames_since_keyframe = 0
+        self.frames = 0
+        self.keyframes = 0
+        self.bytes_written = 0
+        self._closed = False
+        self.file.write(_MAGIC + _HEADER.pack(_VERSION, self.screen.width, self.screen.height, time.time()))
+        # the contents of the screen, at the start
+        self._write_keyframe(0.0)
+        self.screen.writer.add_tap(self._record)
+
+
+    def _write_record(self, flags:int, timestamp:float, data:str):
+        payload = data.encode("utf-8")
+        if len(payload) >= COMPRESS_MIN_LENGTH:
+            compressed = zlib.compress(payload, 1)
+            if len(compressed) < len(payload):
+                payload = compressed
+                flags |= _COMPRESSED
+        self.file.write(_RECORD.pack(flags, timestamp, len(payload)))
+        self.file.write(payload)
+        self.bytes_written += _RECORD.size + len(payload)
+
+
+    def _write_keyframe(self, timestamp:float):
+        keyframe = self.screen.encode_keyframe()
+        if keyframe == None:
+            return
+        self._write_record(_KEYFRAME, timestamp, keyframe)
+        self.keyframes += 1
+        self._frames_since_keyframe = 0
+        self._last_keyframe = time.monotonic()
+        self.file.flush()
+
+
+    def _record(self, data:str):
+        """
+        Stores a frame (called by the `Frame_writer` of the screen).
+        """
+        with self._lock:
+            if self._closed:
+                return
+            now = time.monotonic()
+            timestamp = now - self._start
+            self._write_record(0, timestamp, data)
+            self.frames += 1
+            self._frames_since_keyframe += 1
+            if (
+                self._frames_since_keyframe >= self.keyframe_frames or
+                now - self._last_keyframe >= self.keyframe_interval
+            ):
+                self._write_keyframe(timestamp)
+
+
+    def close(self):
+        """
+        Stops recording, and closes the log file (if it was opened by the recorder).
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self.screen.writer.remove_tap(self._record)
+            self.file.flush()
+            if self._owns_file:
+                self.file.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Recording:
+    """
+    Reads a log file, written by a `Frame_recorder`.\n
+    It can replay the frames (`replay`), return what was on the screen at any time (`seek`), and export the recording to asciicast (`to_asciicast`).\n
+    Seeking starts from the last keyframe before the time, so only the frames after it have to be processed.
+    """
+    def __init__(self, path:str):
+        self.path = path
+        with open(path, "rb") as file:
+            magic = file.read(len(_MAGIC))
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a screen recording")
+            version, self.width, self.height, self.start_time = _HEADER.unpack(file.read(_HEADER.size))
+        if version != _VERSION:
+            raise ValueError(f"unknown recording version: {version}")
+        self._data_start = len(_MAGIC) + _HEADER.size
+        # (time, file position) of the keyframes
+        self._keyframes:list[tuple[float, int]]|None = None
+        self._duration = 0.0
+
+
+    def _records(self, position:int|None=None, with_data=True) -> Iterator[tuple[int, float, str|None, int]]:
+        """
+        Yields the (flags, time, frame, file position) of the records, from the position (or the start).\n
+        If `with_data` is false, the frames are skipped (and `None`), without reading them.\n
+        A record that got cut off at the end (while recording) is left out.
+        """
+        with open(self.path, "rb") as file:
+            size = file.seek(0, 2)
+            file.seek(self._data_start if position == None else position)
+            while True:
+                record_position = file.tell()
+                header = file.read(_RECORD.size)
+                if len(header) < _RECORD.size:
+                    return
+                flags, timestamp, length = _RECORD.unpack(header)
+                if not with_data:
+                    if record_position + _RECORD.size + length > size:
+                        return
+                    file.seek(length, 1)
+                    yield flags, timestamp, None, record_position
+                    continue
+                payload = file.read(length)
+                if len(payload) < length:
+                    return
+                if flags & _COMPRESSED:
+                    payload = zlib.decompress(payload)
+                yield flags, timestamp, payload.decode("utf-8"), record_position
+
+
+    def _index(self):
+        """
+        Finds the keyframes (and the duration), without reading the frames.
+        """
+        if self._keyframes == None:
+            self._keyframes = []
+            for flags, timestamp, _, position in self._records(with_data=False):
+                if flags & _KEYFRAME:
+                    self._keyframes.append((timestamp, position))
+                self._duration = timestamp
+        return self._keyframes
+
+
+    @property
+    def duration(self):
+        """
+        The time of the last frame, in seconds from the start.
+        """
+        self._index()
+        return self._duration
+
+
+    def frames(self):
+        """
+        Yields the (time, frame) of the recorded frames, in order (without the keyframes).
+        """
+        for flags, timestamp, data, _ in self._records():
+            if not flags & _KEYFRAME:
+                yield timestamp, data
+
+
+    def _frames_from(self, timestamp:float):
+        """
+        Yields the (time, frame) of the frames that get the screen to what it was at the time, then the ones after it.\n
+        Starts from the last keyframe before the time (if there is one).
+        """
+        start = None
+        for keyframe_time, position in self._index():
+            if keyframe_time > timestamp:
+                break
+            start = position
+        first = True
+        for flags, frame_time, data, _ in self._records(start):
+            # only the keyframe it started from is needed
+            if flags & _KEYFRAME and not (first and start != None):
+                continue
+            first = False
+            yield frame_time, data
+
+
+    def seek(self, timestamp:float, terminal:Virtual_terminal|None=None):
+        """
+        Returns a `Virtual_terminal` with what was on the screen at the time (in seconds from the start).\n
+        If `terminal` isn't `None`, the frames are written into that terminal instead of a new one.
+        """
+        if terminal == None:
+            terminal = Virtual_terminal(self.width, self.height)
+        for frame_time, data in self._frames_from(timestamp):
+            if frame_time > timestamp:
+                break
+            terminal.feed(data)
+        return terminal
+
+
+    def replay(self, output=None, speed:float=1.0, start:float=0.0, end:float|None=None):
+        """
+        Writes the frames into the output (anything a `Screen` can write into, or `None` for stdout), with the recorded timing.\n
+        `speed` multiplies the speed (0 writes everything without waiting). Replaying starts at `start` seconds (from the keyframe before it, without waiting), and stops at `end` seconds.
+        """
+        writer = Frame_writer(output)
+        began = time.monotonic()
+        for frame_time, data in self._frames_from(start):
+            if end != None and frame_time > end:
+                break
+            if speed > 0 and frame_time > start:
+                delay = (frame_time - start) / speed - (time.monotonic() - began)
+                if delay > 0:
+                    time.sleep(delay)
+            writer.write(data)
+
+
+    def to_asciicast(self, path:str, title:str|None=None):
+        """
+        Exports the recording into an asciicast (v2) file, that asciinema can play.
+        """
+        header:dict[str, object] = {
+            "version": 2,
+            "width": self.width,
+            "height": self.height,
+            "timestamp": int(self.start_time),
+        }
+        if title != None:
+            header["title"] = title
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(json.dumps(header) + "\n")
+            # from the first keyframe, so a recording started on a screen that was already drawn starts with its contents
+            for frame_time, data in self._frames_from(0.0):
+                file.write(json.dumps([round(frame_time, 6), "o", data]) + "\n")
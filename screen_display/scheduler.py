@@ -0,0 +1,291 @@
+"""
+Draws the changes of a `Screen` in frames, at a limited rate.
+"""
+
+import threading
+import time
+from typing import Callable
+# local imports
+# from screen import Screen, Screen_text
+from screen_display.screen import Screen, Screen_text
+
+
+class Frame_scheduler:
+    """
+    Collects the texts of a `Screen` that changed (dirty texts), and redraws all of them in one frame, at most `fps` times a second.\n
+    While a scheduler is attached to a screen (`screen.scheduler`), `update_text`, `request_update`, moving, displaying, erasing or removing texts, and changing `Log_pane`s only mark them dirty, instead of redrawing them right away.\n
+    Any number of changes to a text between two frames cost one redraw, and nothing gets written if nothing changed.\n
+    The frames can be drawn with `tick` (right away), `step` (when the next frame is due), or by `run`/`start`, that keep drawing frames (in the background), but only when something changed.\n
+    If the texts are changed from other threads while frames are drawn in the background, `update_text` is safe to call, but other changes should be made while holding `lock`.\n
+    With `attach_input`, the frame loop also reads the keyboard (and mouse) input, so a change made because of a key press gets drawn in the next frame.
+    """
+    def __init__(self, screen:Screen, fps:float=30):
+        """
+        Attaches the scheduler to the screen (or the outermost screen, if it's a subscreen, because that draws the frames).
+        """
+        screen = screen._root()
+        self.screen = screen
+        self.fps = fps
+        self.lock = threading.RLock()
+        # the dirty texts, with the cells they took up when they first changed, and if their layout needs updating
+        self._dirty:dict[Screen_text, tuple[list[tuple[int, int, int]], bool]] = {}
+        # the log panes with changes to draw
+        self._dirty_panes:dict['Log_pane', None] = {}
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread:threading.Thread|None = None
+        self._next_frame = 0.0
+        # how many times texts got marked dirty, and how many frames got drawn
+        self.updates = 0
+        self.frames = 0
+        # the input read by the frame loop, and the function its events get passed to
+        self.input:'Input_reader|None' = None
+        self._input_handler:'Callable[[Input_event], None]|None' = None
+        # wakes up the frame loop, while it waits for input
+        self._selector:'selectors.BaseSelector|None' = None
+        self._wake_reader:'socket.socket|None' = None
+        self._wake_writer:'socket.socket|None' = None
+        screen.scheduler = self
+
+
+    @property
+    def fps(self):
+        """
+        The maximum number of frames a second.
+        """
+        return self._fps
+
+
+    @fps.setter
+    def fps(self, fps:float):
+        fps = float(fps)
+        if fps <= 0:
+            raise ValueError(f"fps must be positive, not {fps}")
+        self._fps = fps
+
+
+    def mark_dirty(self, sc_text:Screen_text, old_spans:list[tuple[int, int, int]], update=False):
+        """
+        Marks the text dirty, so the (y, start x, end x) cells it took up before the change, and the ones it takes up after it get redrawn in the next frame.\n
+        If the text is already dirty, the cells are added to the ones from the earlier changes.\n
+        If `update` is true, the layout of the text gets updated before the next frame.
+        """
+        with self.lock:
+            entry = self._dirty.get(sc_text)
+            if entry == None:
+                self._dirty[sc_text] = (list(old_spans), update)
+            else:
+                spans = entry[0]
+                for span in old_spans:
+                    if span not in spans:
+                        spans.append(span)
+                if update and not entry[1]:
+                    self._dirty[sc_text] = (spans, True)
+            self.updates += 1
+            self._notify()
+
+
+    def mark_pane_dirty(self, pane:'Log_pane'):
+        """
+        Marks the `Log_pane` dirty, so its new lines (or the lines it got scrolled to) get drawn in the next frame.
+        """
+        with self.lock:
+            self._dirty_panes[pane] = None
+            self.updates += 1
+            self._notify()
+
+
+    def _notify(self):
+        """
+        Wakes up the frame loop.
+        """
+        if not self._wake.is_set():
+            self._wake.set()
+            if self._wake_writer != None:
+                try:
+                    self._wake_writer.send(b"\0")
+                except (BlockingIOError, OSError):
+                    pass
+
+
+    def attach_input(self, reader:'Input_reader', handler:Callable[['Input_event'], None]):
+        """
+        Makes the frame loop (`run`/`start`) wait for the input of the reader too, and call the handler with its events (while holding `lock`), before drawing the next frame.\n
+        The reader should be open (see `Input_reader.open`).
+        """
+        import selectors
+        import socket
+        self.detach_input()
+        self.input = reader
+        self._input_handler = handler
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+        self._wake_writer.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(reader.fileno(), selectors.EVENT_READ, "input")
+        self._selector.register(self._wake_reader, selectors.EVENT_READ, "wake")
+        # a loop that is already waiting
+        self._wake.set()
+
+
+    def detach_input(self):
+        """
+        Stops reading the input in the frame loop.
+        """
+        if self.input == None:
+            return
+        self.input = None
+        self._input_handler = None
+        self._selector.close()
+        self._wake_reader.close()
+        self._wake_writer.close()
+        self._selector = None
+        self._wake_reader = None
+        self._wake_writer = None
+
+
+    def handle_input(self, events:'list[Input_event]'):
+        """
+        Passes the events to the input handler (while holding `lock`).
+        """
+        handler = self._input_handler
+        if handler == None or not events:
+            return
+        with self.lock:
+            for event in events:
+                handler(event)
+
+
+    def _wait_for_input(self, timeout:float):
+        """
+        Waits at most `timeout` seconds for input or a change, and handles the input events that arrived.
+        """
+        if self._wake.is_set():
+            timeout = 0
+        escape_timeout = self.input.timeout()
+        if escape_timeout != None:
+            timeout = min(timeout, escape_timeout)
+        events:'list[Input_event]' = []
+        for key, _ in self._selector.select(timeout):
+            if key.data == "wake":
+                try:
+                    while self._wake_reader.recv(4096):
+                        pass
+                except (BlockingIOError, OSError):
+                    pass
+            else:
+                events.extend(self.input.read())
+        events.extend(self.input.expire())
+        self.handle_input(events)
+
+
+    def tick(self):
+        """
+        Draws all changes since the last frame right away, in one frame.\n
+        If the terminal got resized, the screen gets resized, and everything gets redrawn (see `Screen.check_resize`).\n
+        Returns if anything was drawn.
+        """
+        with self.lock:
+            self._wake.clear()
+            resized = self.screen._check_size()
+            dirty = self._dirty
+            panes = self._dirty_panes
+            if not dirty and not panes and not resized:
+                return False
+            self._dirty = {}
+            self._dirty_panes = {}
+            with self.screen.writer.frame():
+                if not resized:
+                    for pane in panes:
+                        pane._flush()
+                # the spans to redraw on each (sub)screen
+                screen_spans:dict[Screen, list[tuple[int, int, int]]] = {}
+                for sc_text, (old_spans, update) in dirty.items():
+                    screen = sc_text.sc
+                    # removed texts only get erased
+                    if update and screen._texts.get(sc_text.text_obj) is sc_text:
+                        sc_text.update()
+                        screen._index_tag(sc_text)
+                    spans = screen_spans.setdefault(screen, [])
+                    spans.extend(old_spans)
+                    spans.extend(sc_text.spans())
+                if resized:
+                    self.screen.render()
+                else:
+                    for screen, spans in screen_spans.items():
+                        screen._repaint(spans)
+            self.frames += 1
+            return True
+
+
+    def step(self):
+        """
+        Waits until the next frame is due (based on `fps`), and draws all changes since the last frame.\n
+        Returns if anything was drawn.
+        """
+        delay = self._reserve_frame()
+        if delay > 0:
+            time.sleep(delay)
+        return self.tick()
+
+
+    def _reserve_frame(self):
+        """
+        Returns how many seconds are left until the next frame is due, and schedules the one after it.
+        """
+        now = time.monotonic()
+        delay = self._next_frame - now
+        self._next_frame = max(now, self._next_frame) + 1 / self._fps
+        return delay
+
+
+    def run(self):
+        """
+        Keeps drawing frames, until `stop` is called.\n
+        Waits without drawing anything, while nothing changes (but checks if the terminal got resized every `Backend.POLL_INTERVAL` seconds).
+        """
+        self._stopped.clear()
+        self._loop()
+
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            if self.input != None:
+                self._wait_for_input(self.screen.backend.POLL_INTERVAL)
+            else:
+                self._wake.wait(self.screen.backend.POLL_INTERVAL)
+            if self._stopped.is_set():
+                break
+            self.step()
+
+
+    def start(self):
+        """
+        Starts `run` in a background thread.
+        """
+        if self._thread != None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._loop, name="Frame_scheduler", daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        """
+        Stops `run` (and waits for the background thread to finish), then draws the remaining changes.
+        """
+        self._stopped.set()
+        self._notify()
+        if self._thread != None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+        self.tick()
+
+
+    def detach(self):
+        """
+        Stops the scheduler, and detaches it from the screen, so the texts get redrawn right away again.
+        """
+        self.stop()
+        if self.screen.scheduler is self:
+            self.screen.scheduler = None
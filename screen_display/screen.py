@@ -1,26 +1,37 @@
 import math
-import os
-import sys
-#pip
-# try to remove it without the background being weird
-import colorama as col
+import time
+from functools import lru_cache
 # local imports
 # from enums import Styles, Colors, Wrap_styles
 # from text import Text_style
-# from acc_console_font import get_size
+# from buffer import Cell_buffer, get_buffer_class
+# from output import Frame_writer
+# from terminal import Terminal_control
+# from backends import Backend, get_backend
+# from layout import layout_text
+# from width import text_width, fit_text
 from screen_display.enums import Styles, Colors, Wrap_styles
 from screen_display.text import Text_style
-from screen_display.acc_console_font import get_size
+from screen_display.buffer import Cell_buffer, get_buffer_class
+from screen_display.output import Frame_writer
+from screen_display.terminal import Terminal_control
+from screen_display.backends import Backend, get_backend
+from screen_display.layout import layout_text
+from screen_display.width import text_width, fit_text
 
 
 class Text:
     """
     Text object for a `Screen` object.\n
-    `wrap_style` specifies if the text wraps, where the first character of the next line starts to get drawn.\n
+    `wrap_style` specifies if the text wraps, where the first character of the next line starts to get drawn (see `layout_text`).\n
     If `cutoff` is true, when the text reches the end of the line (no matter if it will wrap or not), the last few characters will be replaced with the `cutoff_str`.\n
+    `tag` can be used to find the text on the screen with `get_texts`.\n
     WILL ONLY UPDATE ON THE SCREEN IF IT GETS UPDATED FROM `request_update` OR FROM THE SCREEN WITH `update_text`, `update_texts` OR `update_all`!
     """
-    def __init__(self, text:str, x:int, y:int, style:Text_style=None, wrap=False, wrap_style:Wrap_styles=Wrap_styles.LEFT, cutoff=False, cutoff_str="..."):
+    __slots__ = ("text", "x", "y", "wrap", "style", "wrap_style", "cutoff", "cutoff_str", "tag")
+
+
+    def __init__(self, text:str, x:int, y:int, style:Text_style=None, wrap=False, wrap_style:Wrap_styles=Wrap_styles.LEFT, cutoff=False, cutoff_str="...", tag:str=None):
         self.text = str(text)
         self.x = int(x)
         self.y = int(y)
@@ -31,6 +42,7 @@ class Text:
         self.wrap_style = Wrap_styles(wrap_style)
         self.cutoff = bool(cutoff)
         self.cutoff_str = str(cutoff_str)
+        self.tag = tag
     
     
     def request_update(self, screen:'Screen'):
@@ -45,6 +57,9 @@ class Simple_text:
     Minimal text object.\n
     Should only be used by a `Screen` object.
     """
+    __slots__ = ("text", "x", "y", "style")
+
+
     def __init__(self, text:str, x:int, y:int, style:Text_style=None):
         self.text = str(text)
         self.x = int(x)
@@ -55,56 +70,279 @@ class Simple_text:
     
     
     def display(self, screen:'Screen'):
-        screen.change_style(self.style)
-        screen.write_to(self.text, self.x, self.y)
+        with screen.writer.frame():
+            screen.change_style(self.style)
+            screen.write_to(self.text, self.x, self.y)
+
+
+@lru_cache(maxsize=256)
+def _blank_line(width:int):
+    """
+    Returns a (shared) string of spaces.
+    """
+    return " " * width
 
 
 class Screen_text:
     """
     `Screen` object specific text object.\n
-    Should only be used by a `Screen` object.
+    Should only be used by a `Screen` object.\n
+    Texts with a higher `order` are drawn over the ones with a lower one. `visible` is if the text should be on the screen (if it was displayed or erased last).\n
+    The text that displays (and erases) the text on its own gets compiled once (see `_compiled_form`), and gets reused until the layout, the offset of the screen or a default style changes.
     """
-    def __init__(self, text:Text, screen:'Screen'):
+    __slots__ = ("sc", "text_obj", "order", "visible", "text", "blank", "_layout_key", "_tag", "_compiled_key", "_compiled")
+
+
+    def __init__(self, text:Text, screen:'Screen', order=0):
         self.sc = screen
         self.text_obj = text
+        self.order = int(order)
+        self.visible = False
         self.text:list[Simple_text] = []
         self.blank:list[Simple_text] = []
+        self._layout_key:tuple|None = None
+        # the tag it's indexed under in the screen
+        self._tag:str|None = None
+        # the compiled display (True) and erase (False) forms, and what they were compiled for
+        self._compiled_key:tuple|None = None
+        self._compiled:dict[bool, tuple[str, tuple[int, int]|None, int, int, list[tuple[str, int, int, Text_style]]]] = {}
         self.update()
     
     
     def update(self):
         """
-        Recalculates the `text` and `blank` `Simple_Text` lists, from the `text` `Text` object, and the parrent `Screen`.
+        Recalculates the `text` and `blank` `Simple_Text` lists, from the `text` `Text` object, and the parrent `Screen`.\n
+        Does nothing if neither of them changed since the last update.\n
+        The existing `Simple_text` objects get reused.
         """
-        self.text:list[Simple_text] = []
-        self.blank:list[Simple_text] = []
-        if self.text_obj.wrap:
-            x_pos = min(self.text_obj.x, self.sc.width - 1)
-            y_pos = min(self.text_obj.y, self.sc.height - 1)
-            self.text.append(
-                Simple_text(self.text_obj.text, x_pos, y_pos, self.text_obj.style))
-            self.blank.append(
-                Simple_text(" " * (len(self.text_obj.text)), x_pos, y_pos, self.sc.default_style))
+        text_obj = self.text_obj
+        width = self.sc.width
+        height = self.sc.height
+        default_style = self.sc.default_style
+        key = (text_obj.text, text_obj.x, text_obj.y, text_obj.style, text_obj.wrap, text_obj.wrap_style, text_obj.cutoff, text_obj.cutoff_str, width, height, default_style)
+        if key == self._layout_key:
+            return
+        self._layout_key = key
+        metrics = self.sc.writer.metrics
+        if metrics != None:
+            start = time.perf_counter()
+        segments = self.text
+        blanks = self.blank
+        old_rows = [segment.y for segment in segments]
+        cutoff_str = text_obj.cutoff_str if text_obj.cutoff else None
+        if text_obj.wrap:
+            x_pos = min(text_obj.x, width - 1)
+            y_pos = min(text_obj.y, height - 1)
+            lines = layout_text(text_obj.text, x_pos, width, text_obj.wrap_style, cutoff_str)
+        elif text_obj.x + 1 < width and text_obj.y + 1 < height:
+            y_pos = text_obj.y
+            lines = layout_text(text_obj.text, text_obj.x, width, None, cutoff_str)
         else:
-            if self.text_obj.x + 1 < self.sc.width and self.text_obj.y + 1 < self.sc.height:
-                if self.sc.width - (self.text_obj.x + len(self.text_obj.text)) < 0:
-                    text = self.text_obj.text[:(self.sc.width - (self.text_obj.x + len(self.text_obj.text)))]
-                else:
-                    text = self.text_obj.text
-                self.text.append(
-                    Simple_text(text, self.text_obj.x, self.text_obj.y, self.text_obj.style))
-                self.blank.append(
-                    Simple_text(" " * (len(text)), self.text_obj.x, self.text_obj.y, self.sc.default_style))                
-        
+            lines = ()
+        count = 0
+        for line, x_pos in lines:
+            if y_pos >= height:
+                break
+            blank_line = _blank_line(text_width(line))
+            if count < len(segments):
+                segment = segments[count]
+                segment.text = line
+                segment.x = x_pos
+                segment.y = y_pos
+                segment.style = text_obj.style
+                blank = blanks[count]
+                blank.text = blank_line
+                blank.x = x_pos
+                blank.y = y_pos
+                blank.style = default_style
+            else:
+                segments.append(
+                    Simple_text(line, x_pos, y_pos, text_obj.style))
+                blanks.append(
+                    Simple_text(blank_line, x_pos, y_pos, default_style))
+            count += 1
+            y_pos += 1
+        del segments[count:]
+        del blanks[count:]
+        self.sc._index_rows(self, old_rows, [segment.y for segment in segments])
+        if metrics != None:
+            metrics.laid_out(time.perf_counter() - start)
+    
+    
+    def _fits(self, width:int, height:int):
+        """
+        Returns if the text fits into a screen with the size without getting clipped, so its layout doesn't depend on the size.
+        """
+        text_obj = self.text_obj
+        if text_obj.x + 1 >= width or text_obj.y + 1 >= height:
+            return False
+        return text_obj.x + text_width(text_obj.text) <= width
+
+
+    def spans(self):
+        """
+        Returns the cells the text takes up on the screen, as (y, start x, end x) tuples.
+        """
+        return [(blank.y, blank.x, blank.x + len(blank.text)) for blank in self.blank]
+    
+    
+    def move(self, x:int, y:int):
+        """
+        Moves the text to the new coordinates.\n
+        If the text is visible, only the cells it left, and the cells it moved to get redrawn.
+        """
+        old_spans = self.spans()
+        self.text_obj.x = int(x)
+        self.text_obj.y = int(y)
+        self.update()
+        if self.visible:
+            self.sc._redraw(self, old_spans)
+    
+    def remove(self):
+        """
+        Removes (and erases) this text from its screen.
+        """
+        return self.sc.remove_text(self)
     
+    
+    def _covered(self):
+        """
+        Returns if anything else is drawn in the cells of the text (or the text gets clipped by its screen or an outer one), so it can't be written on its own.
+        """
+        screen = self.sc
+        spans = self.spans()
+        for y, start, end in spans:
+            for other in screen._rows.get(y, ()):
+                if other is self or not other.visible:
+                    continue
+                for blank in other.blank:
+                    if blank.y == y and blank.x < end and blank.x + len(blank.text) > start:
+                        return True
+            for pane in screen._panes:
+                if pane.y <= y < pane.y + pane.height and pane.x < end and pane.x + pane.width > start:
+                    return True
+        # the subscreens over the text
+        above = screen._children
+        while True:
+            for child in above:
+                child_x, child_y = child.offset
+                for y, start, end in spans:
+                    if child_y <= y < child_y + child.height and child_x < end and child_x + child.width > start:
+                        return True
+            # clipped by the screen
+            for y, start, end in spans:
+                if y < 0 or y >= screen.height or start < 0 or end > screen.width:
+                    return True
+            if screen.parent == None:
+                return False
+            spans = [(screen.offset[1] + y, screen.offset[0] + start, screen.offset[0] + end) for y, start, end in spans]
+            siblings = screen.parent._children
+            above = siblings[siblings.index(screen) + 1:]
+            screen = screen.parent
+
+
+    def _compiled_form(self, shown:bool):
+        """
+        Returns the (text, cursor position after it, number of cells, number of style switches, cells for the front buffer) that writes the text (or the blanks under it, if `shown` is false) to the terminal on its own, from any state, and leaves the terminal in the default style.\n
+        The form is compiled once, and reused until the layout of the text, the offset of a screen or a default style changes.
+        """
+        root = self.sc
+        x0 = 0
+        y0 = 0
+        default_styles = [root.default_style]
+        while root.parent != None:
+            x0 += root.offset[0]
+            y0 += root.offset[1]
+            root = root.parent
+            default_styles.append(root.default_style)
+        key = (self._layout_key, x0, y0, root.offset[0], root.offset[1], root.width, tuple(default_styles))
+        if key != self._compiled_key:
+            self._compiled_key = key
+            self._compiled.clear()
+        form = self._compiled.get(shown)
+        if form != None:
+            return form
+        parts:list[str] = []
+        cells:list[tuple[str, int, int, Text_style]] = []
+        cursor = root._cursor
+        switches = 0
+        state:list[int|None] = [None, None, None]
+        for segment, blank in zip(self.text, self.blank):
+            if not blank.text:
+                continue
+            text = segment.text if shown else blank.text
+            style = self.sc._resolve_style(segment.style) if shown else self.sc.default_style
+            x = x0 + blank.x
+            y = y0 + blank.y
+            parts.append(f"\x1b[{root.offset[1] + y + 1};{root.offset[0] + x + 1}H")
+            escape = root._sgr_change(state, root._resolve_codes(style.codes))
+            if escape:
+                parts.append(escape)
+                switches += 1
+            parts.append(text)
+            cells.append((text, x, y, style))
+            end = x + len(blank.text)
+            cursor = (end, y) if end < root.width else None
+        if cells:
+            escape = root._sgr_change(state, root._resolve_codes(root.default_style.codes))
+            if escape:
+                parts.append(escape)
+                switches += 1
+        form = ("".join(parts), cursor, sum(len(blank.text) for blank in self.blank), switches, cells)
+        self._compiled[shown] = form
+        return form
+
+
+    def _write_compiled(self, shown:bool):
+        """
+        Writes the compiled form of the text (or the blanks under it, if `shown` is false), if nothing else is drawn where it is, it's not clipped, the front buffer of the outermost screen is up to date, and no `Frame_scheduler` is attached.\n
+        Returns if it was written.
+        """
+        root = self.sc._root()
+        front = root._front
+        if (
+            root.scheduler != None or front == None or
+            front.width != root.width or front.height != root.height or
+            self._covered()
+        ):
+            return False
+        text, cursor, cell_count, switches, cells = self._compiled_form(shown)
+        if not cells:
+            return True
+        with root.writer.frame():
+            root.writer.write(text)
+            front.put_many(cells)
+            root._cursor = cursor
+            root._sgr = list(root._resolve_codes(root.default_style.codes))
+            root._style = root.default_style
+            metrics = root.writer.metrics
+            if metrics != None:
+                metrics.current.cells_changed += cell_count
+                metrics.current.cursor_moves += len(cells)
+                metrics.current.style_switches += switches
+        return True
+
+
     def display(self):
-        for text in self.text:
-            text.display(self.sc)
+        """
+        Draws the text on the screen, under the texts that have a higher order than it.\n
+        If it wasn't visible, and nothing else is drawn where it is, its compiled form gets written (see `_compiled_form`).
+        """
+        was_visible = self.visible
+        self.visible = True
+        if was_visible or not self._write_compiled(True):
+            self.sc._redraw(self, self.spans())
     
     
     def erase(self):
-        for blank in self.blank:
-            blank.display(self.sc)
+        """
+        Removes the text from the screen, and redraws the visible texts under it.\n
+        If it was visible, and nothing else is drawn where it is, the compiled form of the blanks under it gets written.
+        """
+        was_visible = self.visible
+        self.visible = False
+        if not was_visible or not self._write_compiled(False):
+            self.sc._redraw(self, self.spans())
 
 
 # MIGHT NOT BE A GOOD IDEA?!
@@ -123,24 +361,101 @@ class Border:
     def update(self, sc):
         pass
 
+def _csi_move(amount:int, direction:str):
+    """
+    Returns the relative cursor movement sequence (CUU/CUD/CUF/CUB) for the amount.
+    """
+    if amount == 0:
+        return ""
+    if amount == 1:
+        return f"\x1b[{direction}"
+    return f"\x1b[{amount}{direction}"
+
+
+def _merge_spans(spans:list[tuple[int, int, int]], width:int, height:int):
+    """
+    Sorts the (y, start x, end x) spans, clips them to the screen, and merges the ones that overlap or touch.
+    """
+    merged:list[tuple[int, int, int]] = []
+    for y, start, end in sorted(spans):
+        start = max(start, 0)
+        end = min(end, width)
+        if y < 0 or y >= height or end <= start:
+            continue
+        if merged and merged[-1][0] == y and merged[-1][2] >= start:
+            if end > merged[-1][2]:
+                merged[-1] = (y, merged[-1][1], end)
+        else:
+            merged.append((y, start, end))
+    return merged
+
+
+def _order_key(sc_text:Screen_text):
+    return sc_text.order
+
+
 class Screen:
 
     _INITIALISED = False
+    _RESET_CODES = (39, 49, 22)
     _MIN_WIDTH_VSC = 30
     MIN_WIDTH = -1
     MIN_HEIGHT = 1
 
 
-    def __init__(self, width:int=None, height:int=None, default_style:Text_style=None, title:str=None, in_terminal=True, subscreen=False, offset_x=0, offset_y=0, border:Border=None):
+    def __init__(self, width:int=None, height:int=None, default_style:Text_style=None, title:str=None, in_terminal=True, subscreen=False, offset_x=0, offset_y=0, border:Border=None, output=None, backend:Backend=None, cell_engine="python", parent:'Screen'=None):
+        """
+        `output` is where the screen writes to. It can be a text stream, a binary stream, a socket, a file descriptor, a function that gets called with the text of every frame (like `Async_output`) or `None` for `sys.stdout`.\n
+        `backend` is used for the platform specific terminal functions. If it's `None`, the one for the current platform is used.\n
+        `cell_engine` selects how the screen stores the cells of a frame ("python", "numpy" or "auto", see `get_buffer_class`).\n
+        If `parent` isn't `None`, the screen is a subscreen of the parent screen: its offset is relative to the parent, it gets clipped to the parent, and instead of writing to the terminal itself, it gets drawn into the frames of the parent, over the texts of the parent, and the subscreens that were attached before it.
+        """
         self.width = width
         self.height = height
         self.default_style = default_style
         self.title = title
         self.in_terminal = in_terminal
-        self.subscreen = subscreen
+        self.parent = parent
+        self.subscreen = subscreen or parent != None
+        # the size the screen was created with (`None` follows the terminal or the parent)
+        self._requested_size = (width, height)
         self.offset = [offset_x, offset_y]
-        self.texts:list[Screen_text] = []
+        # in order of adding
+        self._texts:dict[Text, Screen_text] = {}
+        self._tags:dict[str, dict[Screen_text, None]] = {}
+        # the texts that have a segment in each row
+        self._rows:dict[int, dict[Screen_text, None]] = {}
+        self._next_order = 0
         self.border = border
+        self.cell_engine = str(cell_engine)
+        # the attached subscreens, from the bottom to the top
+        self._children:list[Screen] = []
+        # the log panes on the screen, drawn over the texts, and under the subscreens
+        self._panes:list['Log_pane'] = []
+        # the styles of the texts, with the `DEFAULT` parts replaced (for subscreens)
+        self._resolved_styles:dict[Text_style, Text_style] = {}
+        if parent != None:
+            # everything goes through the outermost screen
+            self.writer = parent.writer
+            self.backend = parent.backend
+            self.terminal = parent.terminal
+            parent._children.append(self)
+        else:
+            self.writer = Frame_writer(output)
+            self.backend = backend if backend != None else get_backend()
+            self.terminal = Terminal_control(self.writer)
+        # front: what is on the terminal, back: the frame that is being composed
+        self._front:Cell_buffer|None = None
+        self._back:Cell_buffer|None = None
+        self._style:Text_style|None = None
+        # the (foreground, background, style) SGR parameters the terminal is in (None if unknown)
+        self._sgr:list[int|None] = [None, None, None]
+        # the position of the cursor on the screen (None if unknown)
+        self._cursor:tuple[int, int]|None = None
+        # the `size_version` of the backend, when the size of the screen was last checked
+        self._size_version = self.backend.size_version
+        # the `Frame_scheduler` that redraws the changed texts in frames (None if they get redrawn right away)
+        self.scheduler:'Frame_scheduler|None' = None
         if not self.subscreen:
             self.init()
         else:
@@ -159,21 +474,25 @@ class Screen:
         """
         if not self._INITIALISED:
             self._INITIALISED = True
-            col.init()
-            if not self.in_terminal or get_size()[0] < 1:
+            self.backend.enable_ansi()
+            font_width = self.backend.get_font_size()[0]
+            if not self.in_terminal or font_width < 1:
                 self.MIN_WIDTH = self._MIN_WIDTH_VSC
             else:
-                self.MIN_WIDTH = math.ceil(120 / get_size()[0])
+                self.MIN_WIDTH = math.ceil(120 / font_width)
             # set size
+            self.backend.watch_resize()
+            self._size_version = self.backend.poll_size()
+            max_width, max_height = self._max_size()
             if self.width == None:
-                self.width = os.get_terminal_size().columns
+                self.width = max_width
             if self.height == None:
-                self.height = os.get_terminal_size().lines
+                self.height = max_height
             self.set_width(self.width)
             self.set_height(self.height)
-            self.change_size()
             if self.default_style == None:
                 self.default_style = Text_style()
+            self.change_size()
             self.change_default_style(self.default_style)
             if self.title != None:
                 self.change_title(self.title)
@@ -190,11 +509,11 @@ class Screen:
             self._INITIALISED = True
             self.MIN_WIDTH = 1
             # set size
-            # max size = parrent size?
+            max_width, max_height = self._max_size()
             if self.width == None:
-                self.width = os.get_terminal_size().columns - self.offset[0]
+                self.width = max_width - self.offset[0]
             if self.height == None:
-                self.height = os.get_terminal_size().lines - self.offset[1]
+                self.height = max_height - self.offset[1]
             self.set_width(self.width)
             self.set_height(self.height)
             if self.default_style == None:
@@ -214,15 +533,25 @@ class Screen:
         """
         if self._INITIALISED:
             self._INITIALISED = False
-            self.reset()
-            col.deinit()
+            if self.parent != None:
+                self.detach()
+                return
+            with self.writer.frame():
+                self.reset()
+            self.writer.stop_thread()
+            self.backend.disable_ansi()
     
 
     def reset_color(self):
         """
         Resets current text colors/style.
         """
-        sys.stdout.write("\x1b[0m")
+        if self.parent != None:
+            self.parent.reset_color()
+            return
+        self.writer.write("\x1b[0m")
+        self._style = None
+        self._sgr = list(self._RESET_CODES)
     
 
     def reset_all_color(self):
@@ -253,7 +582,14 @@ class Screen:
         """
         Clears the screen.
         """
-        sys.stdout.write("\x1b[2J")
+        if self.parent != None:
+            with self.writer.frame():
+                self.change_style(self.default_style)
+                for y in range(self.height):
+                    self.write_to(_blank_line(self.width), 0, y)
+            return
+        self.writer.write("\x1b[2J")
+        self._front = self._new_buffer(self.default_style)
 
 
     def set_width(self, width:int):
@@ -265,9 +601,11 @@ class Screen:
         if width < self.MIN_WIDTH:
             width = self.MIN_WIDTH
         if self.subscreen:
-            max_w = os.get_terminal_size().columns
+            max_w = self._max_size()[0]
             if width + self.offset[0] > max_w:
                 width = max_w - self.offset[0]
+        if width != self.width:
+            self._front = None
         self.width = width
     
 
@@ -280,73 +618,137 @@ class Screen:
         if height < self.MIN_HEIGHT:
             height = self.MIN_HEIGHT
         if self.subscreen:
-            max_h = os.get_terminal_size().lines
+            max_h = self._max_size()[1]
             if height + self.offset[1] > max_h:
                 height = max_h - self.offset[1]
+        if height != self.height:
+            self._front = None
         self.height = height
 
 
-    def change_size(self, rerender=True):
+    def _max_size(self):
         """
-        This is the only method that changes the terminal size, because changing it will clear all text.\n
-        If `rerender` is True, it will automaticaly rerender the screen after it has bee cleared.
+        Returns the (width, height) the screen has to fit into: the size of the parent, or the terminal.
         """
-        os.system(f"mode {self.width}, {self.height}")
-        self.render()
-    
+        if self.parent != None:
+            return self.parent.width, self.parent.height
+        return self.backend.get_terminal_size()
 
-    def change_title(self, title:str):
+
+    def _check_size(self):
+        """
+        Resizes the screen (and its subscreens), if the terminal got resized since the last check, and lays out again the texts whose clipping changed.\n
+        Returns if the screen got resized (and needs a full repaint).
+        """
+        version = self.backend.poll_size()
+        if version == self._size_version:
+            return False
+        self._size_version = version
+        return self._apply_size()
+
+
+    def _apply_size(self):
         """
-        Changes the terminal's title.
+        Fits the screen (and its subscreens) into the size of the terminal (or the parent), and lays out again the texts whose clipping changed.\n
+        Returns if the size of the screen changed.
         """
-        os.system("title " + str(title))
+        old_width, old_height = self.width, self.height
+        max_width, max_height = self._max_size()
+        requested_width, requested_height = self._requested_size
+        width = max_width - self.offset[0]
+        height = max_height - self.offset[1]
+        if requested_width != None:
+            width = min(requested_width, width)
+        if requested_height != None:
+            height = min(requested_height, height)
+        self.set_width(width)
+        self.set_height(height)
+        resized = (self.width, self.height) != (old_width, old_height)
+        if resized:
+            for sc_text in self._texts.values():
+                if not (sc_text._fits(old_width, old_height) and sc_text._fits(self.width, self.height)):
+                    sc_text.update()
+        for child in self._children:
+            resized = child._apply_size() or resized
+        return resized
 
 
-    def _convert_color(self, color:Colors):
+    def check_resize(self):
         """
-        Converts the color from Colors enum to a console accepted equivalent.
+        Checks if the terminal got resized. This is cheap: the size only gets queried again after a `SIGWINCH`, or every `Backend.POLL_INTERVAL` seconds, where there are no signals.\n
+        If it did, the screen gets resized (if it's bigger than the terminal, or its size wasn't specified), the texts whose clipping changed get laid out again, and everything gets redrawn with one full repaint.\n
+        `render` (and the `Frame_scheduler`) checks it automatically.\n
+        Returns if the screen got resized.
         """
-        colors = [Colors.BLACK, Colors.RED, Colors.GREEN, Colors.YELLOW, Colors.BLUE, Colors.MAGENTA, Colors.CYAN, Colors.WHITE, Colors.LIGHTBLACK, Colors.LIGHTRED, Colors.LIGHTGREEN, Colors.LIGHTYELLOW, Colors.LIGHTBLUE, Colors.LIGHTMAGENTA, Colors.LIGHTCYAN, Colors.LIGHTWHITE]
-        colors_mapped = ["0", "4", "2", "6", "1", "5", "3", "7", "8", "C", "A", "E", "9", "D", "B", "F"]
-        try:
-            return colors_mapped[colors.index(color)]
-        except ValueError:
-            return -1
+        if self.parent != None:
+            return self._root().check_resize()
+        if not self._check_size():
+            return False
+        self.render()
+        return True
+
+
+    def change_size(self, rerender=True):
+        """
+        This is the only method that changes the terminal size, because changing it will clear all text.\n
+        If `rerender` is True, it will automaticaly rerender the screen after it has bee cleared.\n
+        Does nothing if the terminal already has this size.\n
+        Subscreens with a parent only redraw the parent.
+        """
+        if self.parent != None:
+            if rerender:
+                self.parent._repaint([(y, 0, self.parent.width) for y in range(self.parent.height)])
+            return
+        if self.terminal.set_size(self.width, self.height):
+            self._cursor = None
+            self._front = None
+            if rerender:
+                self.render()
+    
+
+    def change_title(self, title:str):
+        """
+        Changes the terminal's title.\n
+        Does nothing if the terminal already has this title, or if the screen has a parent.
+        """
+        if self.parent != None:
+            return
+        self.terminal.set_title(title)
 
 
     def _change_terminal_color(self):
         """
-        Changes the color of the terminal to the deffault color of the screen, or black and white.
+        Changes the color of the terminal to the deffault color of the screen.\n
+        White on black (what `DEFAULT` and `RESET` turn into) resets the terminal to its own colors.\n
+        Does nothing if the terminal already has these colors.
         """
-        f_color = self._convert_color(self.default_style.fore_color)
-        b_color = self._convert_color(self.default_style.back_color)
-        if f_color == -1:
-            f_color = self._convert_color(Colors.WHITE)
-        if b_color == -1:
-            b_color = self._convert_color(Colors.BLACK)
-        os.system(f"color {b_color}{f_color}")
+        if self.default_style.fore_color == Colors.WHITE and self.default_style.back_color == Colors.BLACK:
+            self.terminal.set_default_colors(Colors.RESET, Colors.RESET)
+        else:
+            self.terminal.set_default_colors(self.default_style.fore_color, self.default_style.back_color)
 
 
     def change_default_style_exp(self, fore_color:Colors=None, back_color:Colors=None, style:Styles=None):
         """
         `change_default_style` expanded.
         """
+        old_style = self.default_style
         # Background color overrides foreground color in vscode.
-        if fore_color != None:
-            if fore_color == Colors.DEFAULT or fore_color == Colors.RESET:
-                self.default_style.fore_color = Colors.WHITE
-            else:
-                self.default_style.fore_color = fore_color
-        if back_color != None:
-            if back_color == Colors.DEFAULT or back_color == Colors.RESET:
-                self.default_style.back_color = Colors.BLACK
-            else:
-                self.default_style.back_color = back_color
-        if style != None:
-            if style == Styles.DEFAULT:
-                self.default_style.text_type = Styles.NORMAL
-            else:
-                self.default_style.text_type = style
+        if fore_color == Colors.DEFAULT or fore_color == Colors.RESET:
+            fore_color = Colors.WHITE
+        if back_color == Colors.DEFAULT or back_color == Colors.RESET:
+            back_color = Colors.BLACK
+        if style == Styles.DEFAULT:
+            style = Styles.NORMAL
+        self.default_style = self.default_style.replace(fore_color, back_color, style)
+        if self.parent != None:
+            # only the terminal's default style is the same as the outermost screen's
+            if self.default_style is not old_style:
+                self._resolved_styles.clear()
+            return
+        # everything on the screen might have changed color
+        if self.default_style is not old_style:
+            self._front = None
         self._change_terminal_color()
 
 
@@ -358,88 +760,643 @@ class Screen:
         self.change_default_style_exp(style.fore_color, style.back_color, style.text_type)
 
 
+    def _set_sgr(self, codes:tuple[int|None, int|None, int|None]):
+        """
+        Changes the (foreground, background, style) SGR parameters of the terminal, with one escape sequence.\n
+        `None` parameters, and the ones that the terminal is already in are skipped.
+        """
+        escape = self._sgr_change(self._sgr, codes)
+        if escape:
+            self.writer.write(escape)
+            if self.writer.metrics != None:
+                self.writer.metrics.current.style_switches += 1
+
+
+    def _sgr_change(self, state:list[int|None], codes:tuple[int|None, int|None, int|None]):
+        """
+        Returns the escape sequence that changes the SGR parameters of a terminal in the `state` to the `codes` (like `_set_sgr`), and updates the state.
+        """
+        fore, back, style = codes
+        params:list[str] = []
+        if fore != None and fore != state[0]:
+            params.append(str(fore))
+            state[0] = fore
+        if back != None and back != state[1]:
+            params.append(str(back))
+            state[1] = back
+        if style != None and style != state[2]:
+            # bright and dim can be on at the same time
+            if style != self._RESET_CODES[2] and state[2] != self._RESET_CODES[2]:
+                params.append(str(self._RESET_CODES[2]))
+            params.append(str(style))
+            state[2] = style
+        if not params:
+            return ""
+        return f"\x1b[{';'.join(params)}m"
+
+
+    def _resolve_codes(self, codes:tuple[int|None, int|None, int|None]):
+        """
+        Replaces the `None` (`DEFAULT`) SGR parameters with the ones from the default style.
+        """
+        default_codes = self.default_style.codes
+        return tuple(
+            code if code != None else
+            default_code if default_code != None else
+            reset_code
+            for code, default_code, reset_code in zip(codes, default_codes, self._RESET_CODES)
+        )
+
+
     def change_style_exp(self, fore_color:Colors=None, back_color:Colors=None, style:Styles=None):
         """
-        `change_default_style` expanded.
+        `change_default_style` expanded.\n
+        Only changes the parts of the terminal's style that are different.
         """
+        self._style = None
         # Background color overrides foreground color in vscode.
-        if fore_color != None:
-            if fore_color == Colors.DEFAULT:
-                fore_color = self.default_style.fore_color
-            sys.stdout.write(f"\x1b[{30 + fore_color.value}m")
-        if back_color != None:
-            if back_color == Colors.DEFAULT:
-                back_color = self.default_style.back_color
-            sys.stdout.write(f"\x1b[{40 + back_color.value}m")
-        if style != None:
-            if style == Styles.DEFAULT:
-                style = self.default_style.text_type
-            sys.stdout.write(f"\x1b[{style.value}m")
+        codes = self._resolve_codes(Text_style(
+            Colors.DEFAULT if fore_color == None else fore_color,
+            Colors.DEFAULT if back_color == None else back_color,
+            Styles.DEFAULT if style == None else style,
+        ).codes)
+        self._set_sgr((
+            None if fore_color == None else codes[0],
+            None if back_color == None else codes[1],
+            None if style == None else codes[2],
+        ))
     
 
     def change_style(self, style:Text_style):
         """
-        Changes the current color/style of the terminal.
+        Changes the current color/style of the terminal.\n
+        Only changes the parts of the terminal's style that are different.
         """
+        if self.parent != None:
+            self.parent.change_style(self._resolve_style(style))
+            self._style = style
+            return
         # Background color overrides foreground color in vscode.
-        self.change_style_exp(style.fore_color, style.back_color, style.text_type)
+        if None in self._sgr and None not in style.codes:
+            # the state of the terminal is unknown, so everything has to be set
+            self.writer.write(style.escape)
+            self._sgr = list(style.codes)
+            if self.writer.metrics != None:
+                self.writer.metrics.current.style_switches += 1
+        else:
+            self._set_sgr(self._resolve_codes(style.codes))
+        self._style = style
     
 
+    def forget_terminal_state(self):
+        """
+        Makes the screen forget where the cursor is, and what style the terminal is in.\n
+        Should be used after something was written to the terminal, not through the screen.
+        """
+        if self.parent != None:
+            self.parent.forget_terminal_state()
+        self._cursor = None
+        self._sgr = [None, None, None]
+        self._style = None
+
+
+    def _cursor_move(self, x:int, y:int):
+        """
+        Returns the shortest sequence that moves the cursor from its current position to the specified coordinates.\n
+        Chooses from an absolute move, relative moves, a carriage return/line feed, or overwriting the cells in between with what is already in them.
+        """
+        abs_x = self.offset[0] + x
+        abs_y = self.offset[1] + y
+        if abs_x == 0:
+            best = "\x1b[H" if abs_y == 0 else f"\x1b[{abs_y + 1}H"
+        else:
+            best = f"\x1b[{abs_y + 1};{abs_x + 1}H"
+        if self._cursor == None:
+            return best
+        cur_x, cur_y = self._cursor
+        if cur_x == x and cur_y == y:
+            return ""
+        d_x = x - cur_x
+        d_y = y - cur_y
+        # relative
+        vertical = _csi_move(d_y, "B") if d_y > 0 else _csi_move(-d_y, "A")
+        if d_x > 0:
+            horizontal = _csi_move(d_x, "C")
+            if d_y == 0 and d_x < len(horizontal):
+                horizontal = self._overwrite_gap(cur_x, x, y) or horizontal
+        elif d_x < 0:
+            horizontal = "\b" * -d_x if -d_x < 4 else _csi_move(-d_x, "D")
+        else:
+            horizontal = ""
+        if len(vertical) + len(horizontal) < len(best):
+            best = vertical + horizontal
+        # carriage return (+ line feeds)
+        if 0 <= d_y < 4:
+            move = "\r" + "\n" * d_y + (_csi_move(abs_x, "C") if abs_x else "")
+            if len(move) < len(best):
+                best = move
+        return best
+
+
+    def _overwrite_gap(self, start:int, end:int, y:int):
+        """
+        Returns the characters between the two x coordinates if they are known, and in the current style of the terminal, or None.
+        """
+        if self._front == None:
+            return None
+        chars, styles = self._front.cells(y, start, min(end + 1, self._front.width))
+        # can't start or end in the middle of a wide character
+        if chars[0] == "" or (end < self._front.width and chars[-1] == ""):
+            return None
+        sgr = tuple(self._sgr)
+        for style in styles[:end - start]:
+            if style == None or self._resolve_codes(style.codes) != sgr:
+                return None
+        return "".join(chars[:end - start])
+
+
     def move_cursor(self, x:int, y:int):
         """
-        Moves the cursor.
+        Moves the cursor.\n
+        Only writes the shortest sequence that gets the cursor there from its current position.
         """
-        sys.stdout.write(f"\x1b[{self.offset[1]+y+1};{self.offset[0]+x+1}H")
+        if self.parent != None:
+            self.parent.move_cursor(self.offset[0] + x, self.offset[1] + y)
+            return
+        move = self._cursor_move(x, y)
+        if move:
+            self.writer.write(move)
+            if self.writer.metrics != None:
+                self.writer.metrics.current.cursor_moves += 1
+        self._cursor = (x, y)
     
 
     def write_to(self, text:str, x:int, y:int):
         """
-        Writes text to specified coordinates.
+        Writes text to specified coordinates.\n
+        The part of the text that doesn't fit into the line gets cut off.
         """
-        self.move_cursor(min(x, self.width - 1), min(y, self.height - 1))
-        sys.stdout.write(text)
+        x = min(x, self.width - 1)
+        y = min(y, self.height - 1)
+        text = text[:fit_text(text, self.width - x)]
+        if self.parent != None:
+            self.parent.write_to(text, self.offset[0] + x, self.offset[1] + y)
+            return
+        with self.writer.frame():
+            self.move_cursor(x, y)
+            self.writer.write(text)
+            end = x + text_width(text)
+            # the cursor stays on the last column (or wraps), after it gets reached
+            self._cursor = (end, y) if end < self.width else None
+            if self._front != None:
+                self._front.put(text, x, y, self._style)
     
 
+    @property
+    def texts(self):
+        """
+        The `Screen_text` objects on the screen, in the order they were added.
+        """
+        return list(self._texts.values())
+
+
+    def _index_tag(self, sc_text:Screen_text):
+        """
+        Moves the text under its current tag in the tag index.
+        """
+        tag = sc_text.text_obj.tag
+        if tag == sc_text._tag:
+            return
+        if sc_text._tag != None:
+            tagged = self._tags[sc_text._tag]
+            del tagged[sc_text]
+            if not tagged:
+                del self._tags[sc_text._tag]
+        if tag != None:
+            self._tags.setdefault(tag, {})[sc_text] = None
+        sc_text._tag = tag
+
+
+    def _index_rows(self, sc_text:Screen_text, old_rows:list[int], new_rows:list[int]):
+        """
+        Moves the text from its old rows to its new rows in the row index.
+        """
+        if old_rows == new_rows:
+            return
+        for y in old_rows:
+            row = self._rows.get(y)
+            if row != None:
+                row.pop(sc_text, None)
+                if not row:
+                    del self._rows[y]
+        for y in new_rows:
+            self._rows.setdefault(y, {})[sc_text] = None
+
+
+    def _add_text(self, text:Text):
+        sc_text = self._texts.get(text)
+        if sc_text == None:
+            sc_text = Screen_text(text, self, self._next_order)
+            self._next_order += 1
+            self._texts[text] = sc_text
+            self._index_tag(sc_text)
+        return sc_text
+
+
     def add_texts(self, texts:Text|list[Text]):
         """
-        Adds (a) `Screen_text` object(s) to the list that will be displayed if `render()` is run.
+        Adds (a) `Text` object(s) to the screen, that will be displayed if `render()` is run.\n
+        Returns the `Screen_text` handle(s) for them, that can be used for updating or removing them.\n
+        Texts that are already on the screen aren't added again, and their existing handle is returned.
         """
         if type(texts) == Text:
-            self.texts.append(Screen_text(texts, self))
-        else:
-            for text in texts:
-                self.texts.append(Screen_text(text, self))
+            return self._add_text(texts)
+        return [self._add_text(text) for text in texts]
+
+
+    def get_text(self, text:Text):
+        """
+        Returns the `Screen_text` handle of the text, or None if it's not on this screen.
+        """
+        return self._texts.get(text)
+
+
+    def get_texts(self, tag:str):
+        """
+        Returns the `Screen_text` handles of all texts with the specified tag.
+        """
+        tagged = self._tags.get(tag)
+        return list(tagged) if tagged != None else []
+
+
+    def remove_text(self, text:Text|Screen_text):
+        """
+        Removes a text (or handle) from the screen, and erases it.\n
+        Returns if the text was on the screen.
+        """
+        if isinstance(text, Screen_text):
+            text = text.text_obj
+        sc_text = self._texts.pop(text, None)
+        if sc_text == None:
+            return False
+        if sc_text._tag != None:
+            tagged = self._tags[sc_text._tag]
+            del tagged[sc_text]
+            if not tagged:
+                del self._tags[sc_text._tag]
+            sc_text._tag = None
+        self._index_rows(sc_text, [segment.y for segment in sc_text.text], [])
+        sc_text.visible = False
+        self._redraw(sc_text)
+        return True
+
+
+    def raise_text(self, text:Text|Screen_text):
+        """
+        Moves a text (or handle) over all other texts on the screen, and redraws it, if it's visible.\n
+        Returns if the text was on the screen.
+        """
+        if isinstance(text, Screen_text):
+            text = text.text_obj
+        sc_text = self._texts.pop(text, None)
+        if sc_text == None:
+            return False
+        self._texts[text] = sc_text
+        sc_text.order = self._next_order
+        self._next_order += 1
+        if sc_text.visible:
+            self._redraw(sc_text)
+        return True
+
+
+    def remove_texts(self, texts:list[Text|Screen_text]):
+        """
+        Removes texts (or handles) from the screen, and erases them.\n
+        Returns how many of them were on the screen.
+        """
+        with self.writer.frame():
+            return sum(self.remove_text(text) for text in texts)
     
 
+    def _new_buffer(self, style:Text_style|None):
+        """
+        Returns a new cell buffer with the size of the screen, filled with spaces with the style.
+        """
+        return get_buffer_class(self.cell_engine, self.width * self.height)(self.width, self.height, style)
+
+
+    def _redraw(self, sc_text:Screen_text, old_spans:list[tuple[int, int, int]]|None=None):
+        """
+        Redraws the cells the text took up before it changed (`old_spans`), and the ones it takes up now.\n
+        If a `Frame_scheduler` is attached, the text only gets marked dirty, and gets redrawn in the next frame.
+        """
+        if old_spans == None:
+            old_spans = []
+        scheduler = self._root().scheduler
+        if scheduler != None:
+            scheduler.mark_dirty(sc_text, old_spans)
+        else:
+            self._repaint(old_spans + sc_text.spans())
+
+
+    def _compose(self):
+        """
+        Composes the next frame from all `Screen_text` objects into the back buffer.
+        """
+        if self._back == None or self._back.width != self.width or self._back.height != self.height:
+            self._back = self._new_buffer(self.default_style)
+        else:
+            self._back.fill(self.default_style)
+        for text in self._texts.values():
+            text.visible = True
+        self._back.put_many(
+            (segment.text, segment.x, segment.y, segment.style)
+            for text in self._texts.values()
+            for segment in text.text
+        )
+        for pane in self._panes:
+            pane._paint(self._back, 0, 0)
+        for child in self._children:
+            child._compose_into(self._back, child.offset[0], child.offset[1])
+
+
+    def _compose_into(self, buffer:Cell_buffer, x0:int, y0:int):
+        """
+        Composes the subscreen (and its subscreens) into the buffer of the parent, with its top left corner at (`x0`, `y0`).
+        """
+        blank = _blank_line(self.width)
+        for y in range(self.height):
+            buffer.put(blank, x0, y0 + y, self.default_style)
+        resolve = self._resolve_style
+        for text in self._texts.values():
+            text.visible = True
+        buffer.put_many(
+            (segment.text, x0 + segment.x, y0 + segment.y, resolve(segment.style))
+            for text in self._texts.values()
+            for segment in text.text
+        )
+        for pane in self._panes:
+            pane._paint(buffer, x0, y0)
+        for child in self._children:
+            child._compose_into(buffer, x0 + child.offset[0], y0 + child.offset[1])
+
+
+    def _paint_span(self, buffer:Cell_buffer, y:int, start:int, end:int, x0:int, y0:int):
+        """
+        Draws the (y, start x, end x) cell span of the screen from the visible texts (and log panes and subscreens) in it into the buffer, with the top left corner of the screen at (`x0`, `y0`).
+        """
+        buffer.put(_blank_line(end - start), x0 + start, y0 + y, self.default_style)
+        row = self._rows.get(y)
+        if row != None:
+            resolve = self._resolve_style
+            for sc_text in sorted(row, key=_order_key):
+                if not sc_text.visible:
+                    continue
+                for segment, blank in zip(sc_text.text, sc_text.blank):
+                    if blank.y == y and blank.x < end and blank.x + len(blank.text) > start:
+                        buffer.put(segment.text, x0 + segment.x, y0 + y, resolve(segment.style))
+        for pane in self._panes:
+            pane._paint_span(buffer, y, start, end, x0, y0)
+        for child in self._children:
+            child_x, child_y = child.offset
+            if child_y <= y < child_y + child.height:
+                child_start = max(start - child_x, 0)
+                child_end = min(end - child_x, child.width)
+                if child_start < child_end:
+                    child._paint_span(buffer, y - child_y, child_start, child_end, x0 + child_x, y0 + child_y)
+
+
+    def _resolve_style(self, style:Text_style|None):
+        """
+        Replaces the `DEFAULT` parts of the style with the ones from the default style of the screen, if it's a subscreen with a parent.\n
+        (The `DEFAULT` parts get drawn with the default style of the outermost screen otherwise.)
+        """
+        if self.parent == None or style == None:
+            return style
+        resolved = self._resolved_styles.get(style)
+        if resolved == None:
+            default = self.default_style
+            resolved = self.parent._resolve_style(style.replace(
+                default.fore_color if style.fore_color == Colors.DEFAULT else None,
+                default.back_color if style.back_color == Colors.DEFAULT else None,
+                default.text_type if style.text_type == Styles.DEFAULT else None,
+            ))
+            self._resolved_styles[style] = resolved
+        return resolved
+
+
+    def _root(self):
+        """
+        Returns the outermost screen (the one that has no parent).
+        """
+        screen = self
+        while screen.parent != None:
+            screen = screen.parent
+        return screen
+
+
+    def raise_screen(self):
+        """
+        Moves the subscreen over all other subscreens of its parent, and redraws it.
+        """
+        if self.parent == None:
+            return
+        self.parent._children.remove(self)
+        self.parent._children.append(self)
+        self._repaint([(y, 0, self.width) for y in range(self.height)])
+
+
+    def detach(self):
+        """
+        Detaches the subscreen from its parent, and redraws the parent where it was.
+        """
+        parent = self.parent
+        if parent == None or self not in parent._children:
+            return
+        parent._children.remove(self)
+        parent._repaint([(self.offset[1] + y, self.offset[0], self.offset[0] + self.width) for y in range(self.height)])
+
+
+    def _repaint(self, spans:list[tuple[int, int, int]]):
+        """
+        Redraws the (y, start x, end x) cell spans of the screen from the visible texts in them.\n
+        Only the cells that are different from what is already on the screen get written.
+        """
+        if not spans:
+            return
+        if self.parent != None:
+            self.parent._repaint([(self.offset[1] + y, self.offset[0] + start, self.offset[0] + end) for y, start, end in _merge_spans(spans, self.width, self.height)])
+            return
+        if self._back == None or self._back.width != self.width or self._back.height != self.height:
+            self._back = self._new_buffer(self.default_style)
+        if self._front == None or self._front.width != self.width or self._front.height != self.height:
+            # the contents of the screen are unknown
+            self._front = self._new_buffer(None)
+        spans = _merge_spans(spans, self.width, self.height)
+        for y, start, end in spans:
+            self._paint_span(self._back, y, start, end, 0, 0)
+        with self.writer.frame():
+            self._draw_runs(self._back, self._back.diff_spans(self._front, spans))
+            self.change_style(self.default_style)
+
+
+    def _draw_runs(self, buffer:Cell_buffer, runs:list[tuple[int, int, int]]):
+        """
+        Writes the (y, start x, end x) cell runs from the buffer to the terminal.
+        """
+        if self.writer.metrics != None:
+            self.writer.metrics.current.cells_changed += sum(end - start for _, start, end in runs)
+        for y, start, end in runs:
+            chars, styles = buffer.cells(y, start, end)
+            x = 0
+            end -= start
+            while x < end:
+                style = styles[x]
+                run_start = x
+                x += 1
+                while x < end and styles[x] is style:
+                    x += 1
+                self.change_style(style)
+                self.write_to("".join(chars[run_start:x]), start + run_start, y)
+
+
     def render(self):
         """
-        Displays all `Screen_text` objects from the `texts` variable.
+        Displays all `Screen_text` objects from the `texts` variable.\n
+        Only the cells that are different from what is already on the screen get redrawn.\n
+        The screen only gets cleared first, if it was resized, cleared, or its default style changed.\n
+        Everything gets written out at once, at the end.\n
+        If the terminal got resized, the screen gets resized first (see `check_resize`).\n
+        Subscreens with a parent redraw their part of the parent.
         """
-        #clear
-        self.reset_color()
-        self.reset_cursor()
-        self.clear()
-        self.change_default_style(self.default_style)
-        #render
-        for text in self.texts:
-            text.display()
-        #clear
-        self.change_style(self.default_style)
+        if self.parent != None:
+            for text in self._texts.values():
+                text.visible = True
+            self._repaint([(y, 0, self.width) for y in range(self.height)])
+            return
+        if self._check_size():
+            self._front = None
+        with self.writer.frame():
+            self.change_default_style(self.default_style)
+            self._compose()
+            if self._front == None or self._front.width != self.width or self._front.height != self.height:
+                #clear
+                # the cleared cells get the current background, if the terminal ignores the default color change
+                self.change_style(self.default_style)
+                self.reset_cursor()
+                self.clear()
+            #render
+            self._draw_runs(self._back, self._back.diff(self._front))
+            # the back buffer is on the screen now
+            self._front, self._back = self._back, self._front
+            #clear
+            self.change_style(self.default_style)
     
     
+    def encode_keyframe(self):
+        """
+        Returns the text that redraws the whole screen from what the screen thinks is on it (and applies the size, title and default colors of the terminal again), then puts the cursor and the style of the terminal back to what the screen thinks they are.\n
+        Returns `None` if the contents of the screen are unknown.\n
+        Doesn't write anything.
+        """
+        front = self._front
+        if front == None or front.width != self.width or front.height != self.height:
+            return None
+        parts = [self.terminal.replay(), "\x1b[0m"]
+        state = list(self._RESET_CODES)
+        default_codes = self._resolve_codes(self.default_style.codes)
+        for y in range(front.height):
+            chars, styles = front.cells(y, 0, front.width)
+            parts.append(f"\x1b[{self.offset[1] + y + 1};{self.offset[0] + 1}H")
+            x = 0
+            while x < front.width:
+                style = styles[x]
+                run_start = x
+                x += 1
+                while x < front.width and styles[x] is style:
+                    x += 1
+                # unknown cells get the default style
+                codes = default_codes if style == None else self._resolve_codes(style.codes)
+                parts.append(self._sgr_change(state, codes))
+                parts.append("".join(chars[run_start:x]))
+        if None not in self._sgr:
+            parts.append(self._sgr_change(state, tuple(self._sgr)))
+        if self._cursor != None:
+            parts.append(f"\x1b[{self.offset[1] + self._cursor[1] + 1};{self.offset[0] + self._cursor[0] + 1}H")
+        return "".join(parts)
+
+
+    @property
+    def metrics(self):
+        """
+        The `Screen_metrics` that measure the frames of the screen (and its subscreens), or `None` if they aren't measured.
+        """
+        return self.writer.metrics
+
+
+    def enable_metrics(self, history=120, profile_slowest=0, trace_memory=False):
+        """
+        Starts measuring every frame of the screen (and its subscreens): the time spent on layout, encoding and writing, and the number of bytes, escape sequences, cursor moves, style switches, changed cells and laid out texts.
+
+        If `profile_slowest` is more than 0, the frames get profiled with `cProfile`, and the profiles of that many of the slowest frames are kept.
+
+        If `trace_memory` is true, the memory use of the frames is traced with `tracemalloc`.
+
+        Returns the `Screen_metrics` (see there), that hooks can be added to, or the existing one, if the frames are already measured.
+
+        Without metrics, measuring costs close to nothing.
+        """
+        if self.writer.metrics == None:
+            from screen_display.metrics import Screen_metrics
+            self.writer.metrics = Screen_metrics(history, profile_slowest, trace_memory)
+        return self.writer.metrics
+
+
+    def disable_metrics(self):
+        """
+        Stops measuring the frames, and returns the `Screen_metrics`, that has the measurements so far (or `None`).
+        """
+        metrics = self.writer.metrics
+        self.writer.metrics = None
+        if metrics != None:
+            metrics.close()
+        return metrics
+
+
+    def start_writer_thread(self, max_frames=2):
+        """
+        Makes the frames get written by a background thread, so the methods that write (`render`...) never wait for the terminal.\n
+        If the terminal falls behind by more than `max_frames` frames, the outdated frames get dropped, and replaced by a keyframe (`encode_keyframe`).\n
+        Returns the `Threaded_sink`, that counts the written and dropped frames, and their latency.
+        """
+        return self.writer.start_thread(max_frames, self.encode_keyframe)
+
+
+    def stop_writer_thread(self):
+        """
+        Waits until the queued frames get written, and makes the frames get written right away again.
+        """
+        self.writer.stop_thread()
+
+
     def erase_all(self):
         """
-        Erases all text from the `texts` list.
+        Erases all text from the `texts` list.\n
+        Everything gets written out at once, at the end.
         """
-        #clear
-        self.reset_color()
-        self.reset_cursor()
-        self.change_default_style(self.default_style)
-        #render
-        for text in self.texts:
-            text.erase()
-        #clear
-        self.change_style(self.default_style)
+        with self.writer.frame():
+            #clear
+            self.reset_color()
+            self.reset_cursor()
+            self.change_default_style(self.default_style)
+            #render
+            spans:list[tuple[int, int, int]] = []
+            for text in self._texts.values():
+                text.visible = False
+                spans.extend(text.spans())
+            self._repaint(spans)
+            #clear
+            self.change_style(self.default_style)
     
     
     def update_border(self):
@@ -447,24 +1404,30 @@ class Screen:
         
     
     def update_texts(self):
-        for text in self.texts:
+        for text in self._texts.values():
             text.update()
+            self._index_tag(text)
             
     
     def update_all(self):
         self.border.update(self)
-        for text in self.texts:
-            text.update()
+        self.update_texts()
     
     
-    def update_text(self, text:Text):
+    def update_text(self, text:Text|Screen_text):
         """
-        Tries to update a specific text from this screen (if it exists).
+        Tries to update a specific text (or handle) from this screen (if it exists).\n
+        If a `Frame_scheduler` is attached, the text only gets marked dirty, and gets updated and redrawn in the next frame.
         """
-        updated = False
-        for sc_text in self.texts:
-            if sc_text.text_obj == text:
-                sc_text.update()
-                updated = True
-                break
-        return updated
\ No newline at end of file
+        if isinstance(text, Screen_text):
+            text = text.text_obj
+        sc_text = self._texts.get(text)
+        if sc_text == None:
+            return False
+        scheduler = self._root().scheduler
+        if scheduler != None:
+            scheduler.mark_dirty(sc_text, sc_text.spans(), True)
+            return True
+        sc_text.update()
+        self._index_tag(sc_text)
+        return True
\ No newline at end of file
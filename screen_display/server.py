@@ -0,0 +1,334 @@
+"""
+Shows a `Screen` to any number of clients over Unix domain or TCP sockets, while encoding each frame only once.
+"""
+
+import codecs
+import os
+import selectors
+import socket
+import stat
+import threading
+from collections import deque
+# local imports
+# from screen import Screen
+# from output import Frame_writer
+from screen_display.screen import Screen
+from screen_display.output import Frame_writer
+
+
+def _open_listener(address:str|tuple[str, int], backlog:int):
+    """
+    Returns a non-blocking listening socket on the path (Unix domain socket), or the (host, port) (TCP).
+    """
+    if isinstance(address, str):
+        # a socket left behind by an earlier server
+        try:
+            if stat.S_ISSOCK(os.stat(address).st_mode):
+                os.unlink(address)
+        except FileNotFoundError:
+            pass
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(address)
+        listener.listen(backlog)
+    else:
+        listener = socket.create_server(address, backlog=backlog)
+    listener.setblocking(False)
+    return listener
+
+
+class _Client:
+    __slots__ = ("sock", "queue", "queued", "current", "needs_keyframe", "frames_skipped")
+
+
+    def __init__(self, sock:socket.socket):
+        self.sock = sock
+        # the encoded frames waiting to be sent
+        self.queue:deque[bytes] = deque()
+        self.queued = 0
+        # the rest of the frame that is being sent
+        self.current:memoryview|None = None
+        self.needs_keyframe = True
+        self.frames_skipped = 0
+
+
+class Screen_server:
+    """
+    Streams the frames of a `Screen` (and its subscreens) to the clients connected to a Unix domain socket (if `address` is a path), or a TCP socket (if it's a (host, port)).\n
+    Every frame is encoded once, and the same bytes get queued for all clients. The sockets are written by one background thread, without ever blocking, so a slow client never slows down the screen.\n
+    Clients that join get a keyframe (`Screen.encode_keyframe`) that draws everything, before the frames after it. If more than `max_queued` bytes are waiting to be sent to a client (it fell behind), its queued frames get skipped, and replaced by a keyframe.\n
+    Keyframes are made in the thread that draws the frames, when the next frame gets drawn (or when `sync` is called). If the screen has a `Frame_scheduler`, clients that join get their keyframe right away (while holding the lock of the scheduler).\n
+    Use `Screen_client` to connect to it.
+    """
+    def __init__(self, screen:Screen, address:str|tuple[str, int], max_queued=1 << 20, backlog=16, encoding="utf-8"):
+        self.screen = screen._root()
+        self.max_queued = int(max_queued)
+        self.encoding = str(encoding)
+        self._listener = _open_listener(address, backlog)
+        # the actual address (the port of TCP sockets opened on port 0)
+        self.address = self._listener.getsockname()
+        self._path = address if isinstance(address, str) else None
+        self._clients:dict[socket.socket, _Client] = {}
+        self._lock = threading.Lock()
+        self._selector = selectors.DefaultSelector()
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+        self._wake_writer.setblocking(False)
+        self._selector.register(self._listener, selectors.EVENT_READ, "accept")
+        self._selector.register(self._wake_reader, selectors.EVENT_READ, "wake")
+        self._closed = False
+        self.frames = 0
+        self.keyframes = 0
+        self.frames_skipped = 0
+        self.clients_joined = 0
+        self.screen.writer.add_tap(self._broadcast)
+        self._thread = threading.Thread(target=self._run, name="Screen_server", daemon=True)
+        self._thread.start()
+
+
+    @property
+    def clients(self):
+        """
+        The number of connected clients.
+        """
+        return len(self._clients)
+
+
+    def _wake(self):
+        try:
+            self._wake_writer.send(b"\0")
+        except (BlockingIOError, OSError):
+            # already woken up (or closed)
+            pass
+
+
+    def _give_keyframes(self, keyframe:bytes|None):
+        """
+        Replaces the queued frames of the clients that need a keyframe with the keyframe (encoded from the screen, if it's `None`).\n
+        Should be called between frames, while holding `_lock`.
+        """
+        for client in self._clients.values():
+            if not client.needs_keyframe:
+                continue
+            if keyframe == None:
+                text = self.screen.encode_keyframe()
+                if text == None:
+                    # nothing to show yet
+                    return
+                keyframe = text.encode(self.encoding)
+            client.frames_skipped += len(client.queue)
+            self.frames_skipped += len(client.queue)
+            client.queue.clear()
+            client.queue.append(keyframe)
+            client.queued = len(keyframe)
+            client.needs_keyframe = False
+            self.keyframes += 1
+
+
+    def _broadcast(self, data:str):
+        """
+        Queues the frame for every client (called by the `Frame_writer` of the screen, after the frame).
+        """
+        if not self._clients:
+            return
+        payload = data.encode(self.encoding)
+        with self._lock:
+            self.frames += 1
+            lagging = False
+            for client in self._clients.values():
+                if client.needs_keyframe:
+                    lagging = True
+                elif client.queued + len(payload) > self.max_queued:
+                    client.needs_keyframe = True
+                    lagging = True
+                else:
+                    client.queue.append(payload)
+                    client.queued += len(payload)
+            if lagging:
+                # the keyframe is made after the frame, so it replaces the frame too
+                self._give_keyframes(None)
+        self._wake()
+
+
+    def sync(self):
+        """
+        Gives a keyframe to the clients that are waiting for one (joined, or fell behind).\n
+        Should be called from the thread that draws the frames, between frames (useful if the screen doesn't change for a long time).
+        """
+        with self._lock:
+            self._give_keyframes(None)
+        self._wake()
+
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self._listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            if sock.family != socket.AF_UNIX:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._clients[sock] = _Client(sock)
+                self.clients_joined += 1
+            self._selector.register(sock, selectors.EVENT_READ, "client")
+            scheduler = self.screen.scheduler
+            if scheduler != None:
+                with scheduler.lock:
+                    with self._lock:
+                        self._give_keyframes(None)
+
+
+    def _drop(self, client:_Client):
+        with self._lock:
+            self._clients.pop(client.sock, None)
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+
+
+    def _send(self, client:_Client):
+        """
+        Sends as much of the queued frames to the client as it takes without blocking.\n
+        Returns if there is more to send.
+        """
+        while True:
+            if client.current == None:
+                with self._lock:
+                    if not client.queue:
+                        return False
+                    frame = client.queue.popleft()
+                    client.queued -= len(frame)
+                client.current = memoryview(frame)
+            try:
+                sent = client.sock.send(client.current)
+            except (BlockingIOError, InterruptedError):
+                return True
+            except OSError:
+                self._drop(client)
+                return False
+            client.current = client.current[sent:] if sent < len(client.current) else None
+
+
+    def _run(self):
+        while not self._closed:
+            for key, events in self._selector.select():
+                if key.data == "accept":
+                    self._accept()
+                elif key.data == "wake":
+                    try:
+                        while self._wake_reader.recv(4096):
+                            pass
+                    except (BlockingIOError, InterruptedError):
+                        pass
+                else:
+                    client = self._clients.get(key.fileobj)
+                    if client != None and events & selectors.EVENT_READ:
+                        # clients don't send anything, so it's a disconnect
+                        try:
+                            if not client.sock.recv(4096):
+                                self._drop(client)
+                        except (BlockingIOError, InterruptedError):
+                            pass
+                        except OSError:
+                            self._drop(client)
+            if self._closed:
+                break
+            for client in list(self._clients.values()):
+                if client.current == None and not client.queue:
+                    continue
+                events = selectors.EVENT_READ
+                if self._send(client):
+                    events |= selectors.EVENT_WRITE
+                if client.sock.fileno() != -1:
+                    self._selector.modify(client.sock, events, "client")
+
+
+    def close(self):
+        """
+        Stops the server, and disconnects the clients.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self.screen.writer.remove_tap(self._broadcast)
+        self._wake()
+        self._thread.join()
+        for client in list(self._clients.values()):
+            self._drop(client)
+        self._selector.close()
+        self._listener.close()
+        self._wake_reader.close()
+        self._wake_writer.close()
+        if self._path != None:
+            try:
+                os.unlink(self._path)
+            except FileNotFoundError:
+                pass
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Screen_client:
+    """
+    Connects to a `Screen_server` at the path (Unix domain socket), or the (host, port) (TCP).
+    """
+    def __init__(self, address:str|tuple[str, int], encoding="utf-8"):
+        if isinstance(address, str):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(address)
+        else:
+            self.sock = socket.create_connection(address)
+        # frames can get split in the middle of a character
+        self._decoder = codecs.getincrementaldecoder(encoding)("replace")
+
+
+    def read(self, timeout:float|None=None):
+        """
+        Waits for the next part of the frames, and returns it, or returns "" if the server closed the connection.\n
+        Raises `TimeoutError` if nothing arrived in `timeout` seconds.
+        """
+        self.sock.settimeout(timeout)
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except socket.timeout:
+                raise TimeoutError("nothing arrived from the server") from None
+            if not data:
+                return self._decoder.decode(b"", True)
+            text = self._decoder.decode(data)
+            # only the start of a character arrived
+            if text:
+                return text
+
+
+    def run(self, output=None):
+        """
+        Writes everything from the server into the output (anything a `Screen` can write into, like a `Virtual_terminal`, or `None` for stdout), until the server closes the connection.
+        """
+        writer = Frame_writer(output)
+        while True:
+            text = self.read()
+            if not text:
+                return
+            writer.write(text)
+
+
+    def close(self):
+        self.sock.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
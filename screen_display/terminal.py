@@ -0,0 +1,119 @@
+# local imports
+# from enums import Colors
+# from output import Frame_writer
+from screen_display.enums import Colors
+from screen_display.output import Frame_writer
+
+
+# xterm's default palette
+_COLOR_RGB = {
+    Colors.BLACK:        "00/00/00",
+    Colors.RED:          "cd/00/00",
+    Colors.GREEN:        "00/cd/00",
+    Colors.YELLOW:       "cd/cd/00",
+    Colors.BLUE:         "00/00/ee",
+    Colors.MAGENTA:      "cd/00/cd",
+    Colors.CYAN:         "00/cd/cd",
+    Colors.WHITE:        "e5/e5/e5",
+    Colors.LIGHTBLACK:   "7f/7f/7f",
+    Colors.LIGHTRED:     "ff/00/00",
+    Colors.LIGHTGREEN:   "00/ff/00",
+    Colors.LIGHTYELLOW:  "ff/ff/00",
+    Colors.LIGHTBLUE:    "5c/5c/ff",
+    Colors.LIGHTMAGENTA: "ff/00/ff",
+    Colors.LIGHTCYAN:    "00/ff/ff",
+    Colors.LIGHTWHITE:   "ff/ff/ff",
+}
+
+
+def _size_sequence(size:tuple[int, int]):
+    return f"\x1b[8;{size[1]};{size[0]}t"
+
+
+def _title_sequence(title:str):
+    return f"\x1b]0;{title}\x07"
+
+
+def _colors_sequence(colors:tuple[Colors, Colors]):
+    sequences:list[str] = []
+    for color, set_code, reset_code in zip(colors, (10, 11), (110, 111)):
+        if color in _COLOR_RGB:
+            sequences.append(f"\x1b]{set_code};rgb:{_COLOR_RGB[color]}\x07")
+        else:
+            sequences.append(f"\x1b]{reset_code}\x07")
+    return "".join(sequences)
+
+
+class Terminal_control:
+    """
+    Changes the size, title and default colors of the terminal with escape sequences, instead of starting a shell.\n
+    Remembers the last values it applied, so setting the same value again writes nothing.
+    """
+    def __init__(self, writer:Frame_writer):
+        self.writer = writer
+        self.size:tuple[int, int]|None = None
+        self.title:str|None = None
+        self.colors:tuple[Colors, Colors]|None = None
+
+
+    def forget(self):
+        """
+        Forgets the last applied values, so the next calls will apply them again.
+        """
+        self.size = None
+        self.title = None
+        self.colors = None
+
+
+    def replay(self):
+        """
+        Returns the escape sequences that apply the last applied values again (without writing them).
+        """
+        sequences:list[str] = []
+        if self.size != None:
+            sequences.append(_size_sequence(self.size))
+        if self.title != None:
+            sequences.append(_title_sequence(self.title))
+        if self.colors != None:
+            sequences.append(_colors_sequence(self.colors))
+        return "".join(sequences)
+
+
+    def set_size(self, width:int, height:int):
+        """
+        Resizes the terminal window (`CSI 8;height;width t`).\n
+        Returns if anything was written.
+        """
+        size = (int(width), int(height))
+        if size == self.size:
+            return False
+        self.size = size
+        self.writer.write(_size_sequence(size))
+        return True
+
+
+    def set_title(self, title:str):
+        """
+        Changes the title of the terminal window (OSC 0).\n
+        Returns if anything was written.
+        """
+        title = "".join(char for char in str(title) if char >= " " and char != "\x7f")
+        if title == self.title:
+            return False
+        self.title = title
+        self.writer.write(_title_sequence(title))
+        return True
+
+
+    def set_default_colors(self, fore_color:Colors, back_color:Colors):
+        """
+        Changes the default foreground and background color of the terminal (OSC 10/11).\n
+        `Colors.RESET` (or a color that has no RGB value) resets that color to the terminal's own default (OSC 110/111).\n
+        Returns if anything was written.
+        """
+        colors = (Colors(fore_color), Colors(back_color))
+        if colors == self.colors:
+            return False
+        self.colors = colors
+        self.writer.write(_colors_sequence(colors))
+        return True
@@ -3,8 +3,82 @@
 from screen_display.enums import Colors, Styles
 
 class Text_style:
-    def __init__(self, fore_color=Colors.DEFAULT, back_color=Colors.DEFAULT, text_type=Styles.DEFAULT):
-        self.fore_color = Colors(fore_color)
-        self.back_color = Colors(back_color)
-        self.text_type = Styles(text_type)
-        
\ No newline at end of file
+    """
+    The colors and style of a text.\n
+    Text styles are immutable, and interned: creating a style with the same values returns the same object, so styles can be compared by identity. Use `replace` to get a changed style.\n
+    The SGR parameters (`codes`), and the escape sequence that sets all of them (`escape`) are precomputed.\n
+    Every style also gets a unique, small `index` (starting from 1), and `Text_style.from_index` returns the style for an index.\n
+    `DEFAULT` values have a code of `None`, because they depend on the default style of the screen.
+    """
+    __slots__ = ("fore_color", "back_color", "text_type", "codes", "escape", "index")
+    _interned:dict[tuple[Colors, Colors, Styles], 'Text_style'] = {}
+    # index 0 is for "no style"
+    _by_index:list['Text_style|None'] = [None]
+
+
+    def __new__(cls, fore_color=Colors.DEFAULT, back_color=Colors.DEFAULT, text_type=Styles.DEFAULT):
+        key = (Colors(fore_color), Colors(back_color), Styles(text_type))
+        style = cls._interned.get(key)
+        if style == None:
+            style = object.__new__(cls)
+            codes = (
+                None if key[0] == Colors.DEFAULT else 30 + key[0].value,
+                None if key[1] == Colors.DEFAULT else 40 + key[1].value,
+                None if key[2] == Styles.DEFAULT else key[2].value,
+            )
+            for name, value in zip(cls.__slots__, (*key, codes, sgr_escape(codes), len(cls._by_index))):
+                object.__setattr__(style, name, value)
+            cls._interned[key] = style
+            cls._by_index.append(style)
+        return style
+
+
+    @classmethod
+    def from_index(cls, index:int):
+        """
+        Returns the style with the index (`None` for 0).
+        """
+        return cls._by_index[index]
+
+
+    def __setattr__(self, name:str, value):
+        raise AttributeError(f"'{type(self).__name__}' objects are immutable, use 'replace' instead")
+
+
+    def __delattr__(self, name:str):
+        raise AttributeError(f"'{type(self).__name__}' objects are immutable")
+
+
+    def __reduce__(self):
+        return (Text_style, (self.fore_color, self.back_color, self.text_type))
+
+
+    def __repr__(self):
+        return f"Text_style({self.fore_color}, {self.back_color}, {self.text_type})"
+
+
+    def replace(self, fore_color:Colors=None, back_color:Colors=None, text_type:Styles=None):
+        """
+        Returns the style with the values that aren't `None` changed.
+        """
+        return Text_style(
+            self.fore_color if fore_color == None else fore_color,
+            self.back_color if back_color == None else back_color,
+            self.text_type if text_type == None else text_type,
+        )
+
+
+def sgr_escape(codes:tuple[int|None, int|None, int|None]):
+    """
+    Returns the escape sequence that sets the terminal to the (foreground, background, style) SGR parameters, from any state.\n
+    `None` parameters are left out.
+    """
+    params = [str(code) for code in codes[:2] if code != None]
+    if codes[2] != None:
+        # bright and dim can be on at the same time
+        if codes[2] != Styles.NORMAL.value:
+            params.append(str(Styles.NORMAL.value))
+        params.append(str(codes[2]))
+    if not params:
+        return ""
+    return f"\x1b[{';'.join(params)}m"
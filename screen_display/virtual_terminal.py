@@ -0,0 +1,620 @@
+"""
+An in-memory terminal, that `Screen`s can draw into without a real terminal (for pre-rendering, tests and benchmarks).
+"""
+
+import re
+import struct
+import zlib
+from array import array
+from typing import Callable
+# local imports
+# from backends import Backend
+# from width import char_width, split_cells
+from screen_display.backends import Backend
+from screen_display.width import char_width, split_cells
+
+
+# (foreground, background, intensity) SGR parameters
+_DEFAULT_SGR = (39, 49, 22)
+_TAB_WIDTH = 8
+_SGR_CACHE_SIZE = 4096
+
+_TOKEN = re.compile(
+    r"(?P<text>[^\x00-\x1f\x7f]+)"
+    r"|\x1b\[(?P<params>[0-?]*)[ -/]*(?P<final>[@-~])"
+    r"|\x1b\](?P<osc>[^\x07\x1b]*)(?:\x07|\x1b\\)"
+    r"|\x1b(?P<esc>[78c])"
+    r"|(?P<control>[\x00-\x1f\x7f])"
+)
+# the start of an escape sequence that got cut off at the end of a write
+_INCOMPLETE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|\][^\x07\x1b]*\x1b?)?")
+
+_SNAPSHOT_MAGIC = b"VTSN"
+# magic, version, flags, width, height, cursor x, cursor y
+_SNAPSHOT_HEADER = struct.Struct("<4sBBHHHH")
+_SNAPSHOT_COMPRESSED = 1
+_SNAPSHOT_CURSOR_VISIBLE = 2
+
+
+def _is_foreground(code:int):
+    return 30 <= code <= 37 or 90 <= code <= 97 or code == 39
+
+
+def _is_background(code:int):
+    return 40 <= code <= 47 or 100 <= code <= 107 or code == 49
+
+
+class Virtual_terminal:
+    """
+    A terminal in memory, that understands the escape sequences `Screen`s write (cursor movement, SGR colors and styles, clearing, resizing, title and default colors), and keeps the cells in a grid.\n
+    It can be the `output` of a `Screen` (with a `Virtual_backend`, so the screen gets its size from it):\n
+    ```
+    terminal = Virtual_terminal(80, 24)
+    screen = Screen(output=terminal, backend=Virtual_backend(terminal))
+    ```
+    The grid can be exported as plain text (`text`), as text with escape sequences (`styled_text`), or as a compact binary snapshot (`snapshot`, `from_snapshot`).\n
+    `chars` has the contents of the cells (wide characters are followed by an empty string, like in `split_cells`), and `cell_styles` has the indexes of their styles in `styles`, that are (foreground, background, intensity) SGR parameters.\n
+    Writes are parsed with one regular expression, and text is written into the rows with slice assignments, so long frame streams are fast to process. Escape sequences that are cut in half by a write are finished by the next one.\n
+    SGR parameters that `Screen`s don't use (underline, inverse...) are ignored.
+    """
+    def __init__(self, width=80, height=24):
+        self.width = max(int(width), 1)
+        self.height = max(int(height), 1)
+        self.title:str|None = None
+        # the default (foreground, background) colors set with OSC 10/11 ("rgb:rr/gg/bb"), or None if they weren't changed
+        self.default_colors:list[str|None] = [None, None]
+        self.styles:list[tuple] = [_DEFAULT_SGR]
+        self._style_ids:dict[tuple, int] = {_DEFAULT_SGR: 0}
+        self._sgr:tuple = _DEFAULT_SGR
+        self._style = 0
+        # (SGR parameters, SGR state before) -> (SGR state after, style index)
+        self._sgr_cache:dict[tuple[str, tuple], tuple[tuple, int]] = {}
+        self.cursor_x = 0
+        self.cursor_y = 0
+        self.cursor_visible = True
+        # the cursor is past the last column, and the next character goes to the next line
+        self._wrap_pending = False
+        self._saved_cursor:tuple[int, int, tuple]|None = None
+        # scrolling region
+        self._top = 0
+        self._bottom = self.height - 1
+        self._pending = ""
+        self._resize_listeners:list[Callable[[], None]] = []
+        self.chars:list[list[str]] = [[" "] * self.width for _ in range(self.height)]
+        self.cell_styles:list[list[int]] = [[0] * self.width for _ in range(self.height)]
+
+
+    def __call__(self, data:str):
+        self.feed(data)
+
+
+    def feed(self, data:str):
+        """
+        Processes the text written to the terminal.
+        """
+        if self._pending:
+            data = self._pending + data
+            self._pending = ""
+        for match in _TOKEN.finditer(data):
+            kind = match.lastgroup
+            if kind == "text":
+                self._put_text(match.group("text"))
+            elif kind == "final":
+                self._csi(match.group("params"), match.group("final"))
+            elif kind == "control":
+                char = match.group("control")
+                if char == "\x1b" and _INCOMPLETE.fullmatch(data, match.start()):
+                    # finished by the next write
+                    self._pending = data[match.start():]
+                    return
+                self._control(char)
+            elif kind == "osc":
+                self._osc(match.group("osc"))
+            else:
+                self._escape(match.group("esc"))
+
+
+    def _intern_style(self, sgr:tuple):
+        """
+        Returns the index of the style in `styles` (adding it, if it's new).
+        """
+        style_id = self._style_ids.get(sgr)
+        if style_id == None:
+            style_id = len(self.styles)
+            self.styles.append(sgr)
+            self._style_ids[sgr] = style_id
+        return style_id
+
+
+    def _put_text(self, text:str):
+        if text.isascii():
+            cells = text
+        else:
+            # zero width characters at the start (from a write that got cut in half) belong to the cell before the cursor
+            lead = 0
+            while lead < len(text) and char_width(text[lead]) == 0:
+                lead += 1
+            if lead:
+                self._combine(text[:lead])
+            cells = split_cells(text[lead:])
+        index = 0
+        length = len(cells)
+        while index < length:
+            if self._wrap_pending:
+                self._wrap_pending = False
+                self.cursor_x = 0
+                self._line_feed()
+            x = self.cursor_x
+            count = min(length - index, self.width - x)
+            # wide characters that don't fit into the line go to the next one
+            if index + count < length and cells[index + count] == "":
+                count -= 1
+                if count <= 0 and x == 0:
+                    # doesn't fit into any line
+                    index += 2
+                    continue
+            end = x + count
+            if count > 0:
+                row = self.chars[self.cursor_y]
+                self._split_wide(row, x, end)
+                row[x:end] = cells[index:end - x + index]
+                self.cell_styles[self.cursor_y][x:end] = [self._style] * count
+                index += count
+            if end >= self.width or index < length:
+                self.cursor_x = self.width - 1
+                self._wrap_pending = True
+            else:
+                self.cursor_x = end
+
+
+    def _combine(self, chars:str):
+        """
+        Adds the zero width characters to the last written cell.
+        """
+        x = self.cursor_x if self._wrap_pending else self.cursor_x - 1
+        row = self.chars[self.cursor_y]
+        if x > 0 and row[x] == "":
+            x -= 1
+        if x >= 0:
+            row[x] += "".join(char for char in chars if ord(char) >= 0xA0)
+
+
+    def _split_wide(self, row:list[str], start:int, end:int):
+        """
+        Blanks the halves of the wide characters, that the cells from `start` to `end` are about to cut in half.
+        """
+        if start > 0 and row[start] == "":
+            row[start - 1] = " "
+        if end < self.width and row[end] == "":
+            row[end] = " "
+
+
+    def _erase(self, y:int, start:int, end:int):
+        """
+        Erases the cells in the row, with the current background color.
+        """
+        start = max(start, 0)
+        end = min(end, self.width)
+        if start >= end:
+            return
+        row = self.chars[y]
+        self._split_wide(row, start, end)
+        row[start:end] = [" "] * (end - start)
+        self.cell_styles[y][start:end] = [self._erase_style()] * (end - start)
+
+
+    def _erase_style(self):
+        return self._intern_style((_DEFAULT_SGR[0], self._sgr[1], _DEFAULT_SGR[2]))
+
+
+    def _blank_row(self):
+        return [" "] * self.width, [self._erase_style()] * self.width
+
+
+    def _scroll_up(self, count:int, top:int, bottom:int):
+        """
+        Scrolls the rows from `top` to `bottom` (inclusive) up, and adds blank rows at the bottom.
+        """
+        count = min(count, bottom - top + 1)
+        if count <= 0:
+            return
+        del self.chars[top:top + count]
+        del self.cell_styles[top:top + count]
+        for _ in range(count):
+            chars, styles = self._blank_row()
+            self.chars.insert(bottom - count + 1, chars)
+            self.cell_styles.insert(bottom - count + 1, styles)
+
+
+    def _scroll_down(self, count:int, top:int, bottom:int):
+        """
+        Scrolls the rows from `top` to `bottom` (inclusive) down, and adds blank rows at the top.
+        """
+        count = min(count, bottom - top + 1)
+        if count <= 0:
+            return
+        del self.chars[bottom - count + 1:bottom + 1]
+        del self.cell_styles[bottom - count + 1:bottom + 1]
+        for _ in range(count):
+            chars, styles = self._blank_row()
+            self.chars.insert(top, chars)
+            self.cell_styles.insert(top, styles)
+
+
+    def _line_feed(self):
+        if self.cursor_y == self._bottom:
+            self._scroll_up(1, self._top, self._bottom)
+        elif self.cursor_y < self.height - 1:
+            self.cursor_y += 1
+
+
+    def _move_to(self, x:int, y:int):
+        self.cursor_x = min(max(x, 0), self.width - 1)
+        self.cursor_y = min(max(y, 0), self.height - 1)
+        self._wrap_pending = False
+
+
+    def _control(self, char:str):
+        if char == "\r":
+            self.cursor_x = 0
+            self._wrap_pending = False
+        elif char in "\n\x0b\x0c":
+            self._wrap_pending = False
+            self._line_feed()
+        elif char == "\b":
+            if self.cursor_x > 0 and not self._wrap_pending:
+                self.cursor_x -= 1
+            self._wrap_pending = False
+        elif char == "\t":
+            self._move_to((self.cursor_x // _TAB_WIDTH + 1) * _TAB_WIDTH, self.cursor_y)
+
+
+    def _escape(self, char:str):
+        if char == "7":
+            self._saved_cursor = (self.cursor_x, self.cursor_y, self._sgr)
+        elif char == "8":
+            self._restore_cursor()
+        elif char == "c":
+            self.reset()
+
+
+    def _restore_cursor(self):
+        if self._saved_cursor == None:
+            self._move_to(0, 0)
+            return
+        x, y, sgr = self._saved_cursor
+        self._sgr = sgr
+        self._style = self._intern_style(sgr)
+        self._move_to(x, y)
+
+
+    def _csi(self, params:str, final:str):
+        if params.startswith("?"):
+            if final in "hl" and "25" in params[1:].split(";"):
+                self.cursor_visible = final == "h"
+            return
+        if final == "m":
+            self._set_sgr(params)
+            return
+        numbers = [int(param) if param.isdigit() else 0 for param in params.split(";")] if params else []
+        first = numbers[0] if numbers else 0
+        amount = max(first, 1)
+        if final in "Hf":
+            column = numbers[1] if len(numbers) > 1 else 0
+            self._move_to(max(column, 1) - 1, amount - 1)
+        elif final == "A":
+            self._move_to(self.cursor_x, self.cursor_y - amount)
+        elif final == "B":
+            self._move_to(self.cursor_x, self.cursor_y + amount)
+        elif final == "C":
+            self._move_to(self.cursor_x + amount, self.cursor_y)
+        elif final == "D":
+            self._move_to(self.cursor_x - amount, self.cursor_y)
+        elif final == "E":
+            self._move_to(0, self.cursor_y + amount)
+        elif final == "F":
+            self._move_to(0, self.cursor_y - amount)
+        elif final == "G":
+            self._move_to(amount - 1, self.cursor_y)
+        elif final == "d":
+            self._move_to(self.cursor_x, amount - 1)
+        elif final == "J":
+            self._erase_display(first)
+        elif final == "K":
+            self._erase_line(first)
+        elif final == "X":
+            self._erase(self.cursor_y, self.cursor_x, self.cursor_x + amount)
+        elif final == "S":
+            self._scroll_up(amount, self._top, self._bottom)
+        elif final == "T":
+            self._scroll_down(amount, self._top, self._bottom)
+        elif final == "L":
+            if self._top <= self.cursor_y <= self._bottom:
+                self._scroll_down(amount, self.cursor_y, self._bottom)
+        elif final == "M":
+            if self._top <= self.cursor_y <= self._bottom:
+                self._scroll_up(amount, self.cursor_y, self._bottom)
+        elif final == "r":
+            top = amount - 1
+            bottom = (numbers[1] if len(numbers) > 1 and numbers[1] else self.height) - 1
+            if top < bottom < self.height:
+                self._top = top
+                self._bottom = bottom
+                self._move_to(0, 0)
+        elif final == "s":
+            self._saved_cursor = (self.cursor_x, self.cursor_y, self._sgr)
+        elif final == "u":
+            self._restore_cursor()
+        elif final == "t":
+            if first == 8 and len(numbers) >= 3:
+                self.resize(numbers[2] or self.width, numbers[1] or self.height)
+
+
+    def _erase_display(self, mode:int):
+        if mode == 0:
+            self._erase(self.cursor_y, self.cursor_x, self.width)
+            rows = range(self.cursor_y + 1, self.height)
+        elif mode == 1:
+            self._erase(self.cursor_y, 0, self.cursor_x + 1)
+            rows = range(self.cursor_y)
+        else:
+            rows = range(self.height)
+        for y in rows:
+            self.chars[y], self.cell_styles[y] = self._blank_row()
+
+
+    def _erase_line(self, mode:int):
+        if mode == 0:
+            self._erase(self.cursor_y, self.cursor_x, self.width)
+        elif mode == 1:
+            self._erase(self.cursor_y, 0, self.cursor_x + 1)
+        else:
+            self._erase(self.cursor_y, 0, self.width)
+
+
+    def _set_sgr(self, params:str):
+        key = (params, self._sgr)
+        cached = self._sgr_cache.get(key)
+        if cached == None:
+            if len(self._sgr_cache) >= _SGR_CACHE_SIZE:
+                self._sgr_cache.clear()
+            sgr = self._parse_sgr(params)
+            cached = (sgr, self._intern_style(sgr))
+            self._sgr_cache[key] = cached
+        self._sgr, self._style = cached
+
+
+    def _parse_sgr(self, params:str):
+        """
+        Returns the SGR state after the SGR parameters.
+        """
+        sgr = list(self._sgr)
+        parts = params.replace(":", ";").split(";") if params else ["0"]
+        index = 0
+        while index < len(parts):
+            code = int(parts[index]) if parts[index].isdigit() else 0
+            index += 1
+            if code == 0:
+                sgr[:] = _DEFAULT_SGR
+            elif code in (1, 2, 22):
+                sgr[2] = code
+            elif _is_foreground(code):
+                sgr[0] = code
+            elif _is_background(code):
+                sgr[1] = code
+            elif code in (38, 48) and index < len(parts):
+                # 256 colors, or true color
+                length = 2 if parts[index] == "5" else 4 if parts[index] == "2" else 1
+                sgr[0 if code == 38 else 1] = ";".join([str(code)] + parts[index:index + length])
+                index += length
+        return tuple(sgr)
+
+
+    def _osc(self, osc:str):
+        command, _, value = osc.partition(";")
+        if command in ("0", "2"):
+            self.title = value
+        elif command in ("10", "11"):
+            self.default_colors[int(command) - 10] = value
+        elif command in ("110", "111"):
+            self.default_colors[int(command) - 110] = None
+
+
+    def resize(self, width:int, height:int):
+        """
+        Changes the size of the terminal (like the `CSI 8 ; height ; width t` sequence).\n
+        The rows and columns that don't fit get cut off.
+        """
+        width = max(int(width), 1)
+        height = max(int(height), 1)
+        if (width, height) == (self.width, self.height):
+            return
+        for y in range(self.height):
+            row = self.chars[y]
+            styles = self.cell_styles[y]
+            if width < self.width:
+                # a wide character that got cut in half
+                if row[width] == "":
+                    row[width - 1] = " "
+                del row[width:]
+                del styles[width:]
+            else:
+                row.extend([" "] * (width - self.width))
+                styles.extend([0] * (width - self.width))
+        del self.chars[height:]
+        del self.cell_styles[height:]
+        for _ in range(height - self.height):
+            self.chars.append([" "] * width)
+            self.cell_styles.append([0] * width)
+        self.width = width
+        self.height = height
+        self._top = 0
+        self._bottom = height - 1
+        self._move_to(self.cursor_x, self.cursor_y)
+        for listener in self._resize_listeners:
+            listener()
+
+
+    def reset(self):
+        """
+        Clears everything, and resets the cursor, the style and the scrolling region (like `ESC c`).
+        """
+        self._sgr = _DEFAULT_SGR
+        self._style = 0
+        self._top = 0
+        self._bottom = self.height - 1
+        self._saved_cursor = None
+        self.cursor_visible = True
+        self._move_to(0, 0)
+        self.chars = [[" "] * self.width for _ in range(self.height)]
+        self.cell_styles = [[0] * self.width for _ in range(self.height)]
+
+
+    def cell(self, x:int, y:int):
+        """
+        Returns the contents of the cell, and its (foreground, background, intensity) SGR parameters.
+        """
+        return self.chars[y][x], self.styles[self.cell_styles[y][x]]
+
+
+    def line(self, y:int):
+        """
+        Returns the text in the row.
+        """
+        return "".join(self.chars[y])
+
+
+    def text(self, trailing_spaces=False):
+        """
+        Returns the text on the terminal, with the rows in separate lines.\n
+        The spaces at the ends of the rows are removed, if `trailing_spaces` is false.
+        """
+        lines = ["".join(row) for row in self.chars]
+        if not trailing_spaces:
+            lines = [line.rstrip(" ") for line in lines]
+        return "\n".join(lines)
+
+
+    def styled_text(self):
+        """
+        Returns the text on the terminal, with the rows in separate lines, and SGR escape sequences before the cells that change the style.\n
+        Printing it into a real terminal shows what is on this one.
+        """
+        lines:list[str] = []
+        current = 0
+        for row, styles in zip(self.chars, self.cell_styles):
+            parts:list[str] = []
+            x = 0
+            while x < self.width:
+                style = styles[x]
+                run_start = x
+                x += 1
+                while x < self.width and styles[x] == style:
+                    x += 1
+                if style != current:
+                    parts.append(f"\x1b[0;{';'.join(str(code) for code in self.styles[style])}m")
+                    current = style
+                parts.append("".join(row[run_start:x]))
+            lines.append("".join(parts))
+        return "\n".join(lines) + ("\x1b[0m" if current != 0 else "")
+
+
+    def snapshot(self, compress=True):
+        """
+        Returns the contents of the terminal (cells, styles, cursor, title) in a compact binary format, that `from_snapshot` can load.\n
+        The styles of the cells are run-length encoded, and the data is compressed with `zlib`, if `compress` is true.
+        """
+        runs = array("I")
+        for styles in self.cell_styles:
+            x = 0
+            while x < self.width:
+                style = styles[x]
+                run_start = x
+                x += 1
+                while x < self.width and styles[x] == style:
+                    x += 1
+                runs.append(x - run_start)
+                runs.append(style)
+        sections = [
+            (self.title or "").encode("utf-8"),
+            "\n".join(",".join(str(code) for code in style) for style in self.styles).encode("utf-8"),
+            "\n".join("".join(row) for row in self.chars).encode("utf-8"),
+            runs.tobytes(),
+        ]
+        body = b"".join(struct.pack("<I", len(section)) + section for section in sections)
+        flags = _SNAPSHOT_CURSOR_VISIBLE if self.cursor_visible else 0
+        if compress:
+            body = zlib.compress(body, 1)
+            flags |= _SNAPSHOT_COMPRESSED
+        return _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, 1, flags, self.width, self.height, self.cursor_x, self.cursor_y) + body
+
+
+    @classmethod
+    def from_snapshot(cls, data:bytes):
+        """
+        Returns a terminal, with the contents from the `snapshot`.
+        """
+        magic, version, flags, width, height, cursor_x, cursor_y = _SNAPSHOT_HEADER.unpack_from(data)
+        if magic != _SNAPSHOT_MAGIC or version != 1:
+            raise ValueError("not a virtual terminal snapshot")
+        body = data[_SNAPSHOT_HEADER.size:]
+        if flags & _SNAPSHOT_COMPRESSED:
+            body = zlib.decompress(body)
+        sections:list[bytes] = []
+        position = 0
+        while position < len(body):
+            (length,) = struct.unpack_from("<I", body, position)
+            position += 4
+            sections.append(body[position:position + length])
+            position += length
+        title, styles, text, run_data = sections
+        terminal = cls(width, height)
+        terminal.title = title.decode("utf-8") or None
+        terminal.styles = [
+            tuple(int(code) if code.isdigit() else code for code in style.split(","))
+            for style in styles.decode("utf-8").split("\n")
+        ]
+        terminal._style_ids = {style: index for index, style in enumerate(terminal.styles)}
+        for y, line in enumerate(text.decode("utf-8").split("\n")[:height]):
+            cells = list(line if line.isascii() else split_cells(line))[:width]
+            terminal.chars[y] = cells + [" "] * (width - len(cells))
+        runs = array("I")
+        runs.frombytes(run_data)
+        y = 0
+        row:list[int] = []
+        for index in range(0, len(runs), 2):
+            row.extend([runs[index + 1]] * runs[index])
+            if len(row) >= width:
+                terminal.cell_styles[y] = row[:width]
+                y += 1
+                row = []
+        terminal._move_to(cursor_x, cursor_y)
+        terminal.cursor_visible = bool(flags & _SNAPSHOT_CURSOR_VISIBLE)
+        return terminal
+
+
+class Virtual_backend(Backend):
+    """
+    Backend for a `Screen` that draws into a `Virtual_terminal`: the size of the terminal is the size of the virtual terminal, and it gets noticed right away, when it changes.
+    """
+    def __init__(self, terminal:Virtual_terminal):
+        super().__init__()
+        self.terminal = terminal
+
+
+    def _query_terminal_size(self):
+        return self.terminal.width, self.terminal.height
+
+
+    def watch_resize(self):
+        if not self._watching:
+            self.terminal._resize_listeners.append(self._resized)
+            self._watching = True
+        return True
+
+
+    def getch(self):
+        """
+        There are no key presses, so it returns an empty byte string.
+        """
+        return b""
@@ -13,6 +13,6 @@ setup(
     packages=find_packages(),
     
     install_requires=[
-        'colorama',
+        'colorama; platform_system=="Windows"',
     ],
 )
@@ -0,0 +1,19 @@
+import pytest
+# local imports
+from screen_display import Screen, Virtual_terminal, Virtual_backend
+
+
+@pytest.fixture
+def virtual_screen():
+    """
+    Returns a function that makes a `Screen` (with the keyword arguments) that writes into a new `Virtual_terminal` with the size, and returns both.
+    """
+    screens:list[Screen] = []
+    def make(width=40, height=10, **kwargs):
+        terminal = Virtual_terminal(width, height)
+        screen = Screen(output=terminal, backend=Virtual_backend(terminal), **kwargs)
+        screens.append(screen)
+        return screen, terminal
+    yield make
+    for screen in screens:
+        screen.deinit()
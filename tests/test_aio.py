@@ -0,0 +1,52 @@
+import asyncio
+import os
+import sys
+# local imports
+from screen_display import Text, Log_pane
+from screen_display.aio import Async_output, Async_scheduler
+
+
+def test_changes_wake_up_the_frame_loop(virtual_screen):
+    screen, terminal = virtual_screen(30, 6)
+    screen.backend.POLL_INTERVAL = 10
+    text = Text("0", 0, 0)
+    screen.add_texts(text)
+    pane = Log_pane(screen, 0, 2, height=3)
+    screen.render()
+    async def main():
+        scheduler = Async_scheduler(screen, fps=1000)
+        task = scheduler.start()
+        await asyncio.sleep(0.01)
+        pane.append("logged")
+        await asyncio.wait_for(_until(lambda: terminal.line(2).rstrip() == "logged"), 1)
+        text.text = "1"
+        screen.update_text(text)
+        await asyncio.wait_for(_until(lambda: terminal.line(0).rstrip() == "1"), 1)
+        await scheduler.stop_async()
+        assert task.done()
+    asyncio.run(main())
+
+
+def test_default_output_leaves_stdout_open_and_blocking(monkeypatch):
+    read_fd, write_fd = os.pipe()
+    stdout = os.fdopen(write_fd, "w")
+    monkeypatch.setattr(sys, "stdout", stdout)
+    async def main():
+        output = await Async_output.open()
+        assert not os.get_blocking(write_fd)
+        output("frame")
+        await output.close()
+    try:
+        asyncio.run(main())
+        assert not stdout.closed
+        assert os.get_blocking(write_fd)
+        print("after", end="", flush=True)
+        assert os.read(read_fd, 100) == b"frameafter"
+    finally:
+        stdout.close()
+        os.close(read_fd)
+
+
+async def _until(condition):
+    while not condition():
+        await asyncio.sleep(0.001)
@@ -0,0 +1,66 @@
+import re
+import pytest
+# local imports
+from screen_display import Text, Text_style, Colors, Styles, Wrap_styles
+from screen_display.buffer import Cell_buffer, get_buffer_class
+
+
+def run_scenario(virtual_screen, engine:str):
+    """
+    Renders the same changes with the cell engine, and returns what the terminal showed after each of them.
+    """
+    screen, terminal = virtual_screen(30, 8, cell_engine=engine)
+    shown:list[str] = []
+    plain = Text("plain text", 1, 0)
+    styled = Text("styled", 20, 0, Text_style(Colors.RED, Colors.BLUE, Styles.BRIGHT))
+    wrapped = Text("some words that get wrapped into lines", 2, 2, wrap=True, wrap_style=Wrap_styles.CENTER)
+    wide = Text("日本語のテキスト", 4, 5, Text_style(Colors.GREEN))
+    covering = Text("x", 5, 5)
+    under = Text("overlapped text", 8, 4)
+    over = Text("TOP", 12, 4, Text_style(Colors.YELLOW))
+    handles = screen.add_texts([plain, styled, wrapped, wide, covering, under, over])
+    screen.render()
+    shown.append(terminal.styled_text())
+    plain.text = "changed"
+    styled.x = 12
+    wide.x = 7
+    screen.update_texts()
+    screen.render()
+    shown.append(terminal.styled_text())
+    handles[2].erase()
+    shown.append(terminal.styled_text())
+    screen.remove_text(wide)
+    shown.append(terminal.styled_text())
+    screen.render()
+    shown.append(terminal.styled_text())
+    return type(screen._front), shown
+
+
+def test_numpy_engine_draws_the_same(virtual_screen):
+    pytest.importorskip("numpy")
+    python_buffer, python_shown = run_scenario(virtual_screen, "python")
+    numpy_buffer, numpy_shown = run_scenario(virtual_screen, "numpy")
+    assert python_buffer is Cell_buffer
+    assert numpy_buffer is not Cell_buffer
+    assert numpy_shown == python_shown
+    assert "overTOPped text" in re.sub("\x1b\\[[0-9;]*m", "", python_shown[0])
+    assert "changed" in python_shown[1]
+    assert "wrapped" not in python_shown[2]
+    assert "テキスト" not in python_shown[3]
+    assert "wrapped" in python_shown[4]
+
+
+def test_numpy_engine_overlapping_items():
+    pytest.importorskip("numpy")
+    styles = [Text_style(color) for color in (Colors.RED, Colors.GREEN, Colors.BLUE)]
+    # every item overwrites most of the cells of the ones before it
+    items = [("abcdefghij"[index % 10] * 12, index % 5, 1, styles[index % 3]) for index in range(200)]
+    items += [("x" * 30, -3, 2, styles[0]), ("yy", 18, 2, styles[1]), ("z", 1, 2, None)]
+    python_buffer = Cell_buffer(20, 4)
+    numpy_buffer = get_buffer_class("numpy")(20, 4)
+    python_buffer.put_many(items)
+    numpy_buffer.put_many(items)
+    for y in range(4):
+        chars, cell_styles = numpy_buffer.cells(y, 0, 20)
+        assert (list(chars), list(cell_styles)) == tuple(map(list, python_buffer.cells(y, 0, 20)))
+    assert "".join(python_buffer.cells(1, 0, 20)[0]) == "fghijjjjjjjjjjjj    "
@@ -0,0 +1,39 @@
+# local imports
+from screen_display import Text, Text_style, Colors
+
+
+def assert_terminal_matches_front(screen, terminal):
+    for y in range(screen.height):
+        assert terminal.chars[y] == list(screen._front.cells(y, 0, screen.width)[0]), f"row {y}"
+
+
+def test_display_move_and_erase(virtual_screen):
+    screen, terminal = virtual_screen(30, 6)
+    texts = [
+        Text("inside", 2, 0, Text_style(Colors.RED)),
+        Text("off the left edge", -1, 1),
+        Text("off the right edge", 20, 2),
+        Text("日本語", 5, 3, Text_style(Colors.GREEN)),
+    ]
+    handles = screen.add_texts(texts)
+    screen.render()
+    assert_terminal_matches_front(screen, terminal)
+    assert terminal.line(1).startswith("ff the left edge")
+    for handle in handles:
+        handle.erase()
+        assert_terminal_matches_front(screen, terminal)
+    assert terminal.text() == "\n" * 5
+    for handle in handles:
+        handle.display()
+        assert_terminal_matches_front(screen, terminal)
+    handles[0].move(-2, 0)
+    handles[1].move(3, 1)
+    handles[3].move(27, 3)
+    assert_terminal_matches_front(screen, terminal)
+    for handle in handles:
+        handle.erase()
+        assert_terminal_matches_front(screen, terminal)
+        handle.display()
+        assert_terminal_matches_front(screen, terminal)
+    assert terminal.line(0).startswith("side")
+    assert terminal.line(1).startswith("   off the left edge")
@@ -0,0 +1,92 @@
+import os
+import time
+import pytest
+# local imports
+from screen_display import Key_parser, Key_event, Mouse_event, Paste_event, Input_reader
+
+
+def _x10(code:int, x:int, y:int):
+    return "\x1b[M" + chr(32 + code) + chr(32 + x) + chr(32 + y)
+
+
+CASES = [
+    # plain keys
+    ("a", [Key_event("a")]),
+    ("ab\r", [Key_event("a"), Key_event("b"), Key_event("enter")]),
+    ("\t\x7f", [Key_event("tab"), Key_event("backspace")]),
+    ("\x03", [Key_event("c", ctrl=True)]),
+    # special keys, and modifiers
+    ("\x1b[A\x1bOB", [Key_event("up"), Key_event("down")]),
+    ("\x1b[1;5C", [Key_event("right", ctrl=True)]),
+    ("\x1b[1;2D", [Key_event("left", shift=True)]),
+    ("\x1b[1;8H", [Key_event("home", ctrl=True, alt=True, shift=True)]),
+    ("\x1b[3;5~\x1b[15~", [Key_event("delete", ctrl=True), Key_event("f5")]),
+    ("\x1b[Z", [Key_event("tab", shift=True)]),
+    # alt + key
+    ("\x1bx", [Key_event("x", alt=True)]),
+    ("\x1b\x7f", [Key_event("backspace", alt=True)]),
+    ("\x1b\x1b[A", [Key_event("escape"), Key_event("up")]),
+    # SGR mouse
+    ("\x1b[<0;10;5M", [Mouse_event(9, 4, "left", "press")]),
+    ("\x1b[<2;10;5m", [Mouse_event(9, 4, "right", "release")]),
+    ("\x1b[<32;3;4M", [Mouse_event(2, 3, "left", "move")]),
+    ("\x1b[<64;1;1M\x1b[<65;1;1M", [Mouse_event(0, 0, "scroll_up", "press"), Mouse_event(0, 0, "scroll_down", "press")]),
+    ("\x1b[<17;120;40M", [Mouse_event(119, 39, "middle", "press", ctrl=True)]),
+    # X10 mouse
+    (_x10(0, 10, 5) + _x10(3, 10, 5), [Mouse_event(9, 4, "left", "press"), Mouse_event(9, 4, None, "release")]),
+    # bracketed paste (escape sequences in it aren't keys)
+    ("\x1b[200~hello\x1b[Aworld\r\x1b[201~!", [Paste_event("hello\x1b[Aworld\r"), Key_event("!")]),
+    # unknown sequences are skipped
+    ("\x1b[99x\x1bOzq", [Key_event("q")]),
+]
+
+
+@pytest.mark.parametrize("text, events", CASES)
+def test_parse(text:str, events:list):
+    parser = Key_parser()
+    assert parser.feed(text) == events
+    assert not parser.pending
+
+
+@pytest.mark.parametrize("text, events", CASES)
+def test_parse_split_between_reads(text:str, events:list):
+    for split in range(1, len(text)):
+        parser = Key_parser()
+        parsed = parser.feed(text[:split])
+        parsed += parser.feed(text[split:])
+        assert parsed == events, f"split at {split}"
+        assert not parser.pending
+
+
+def test_lone_escape_waits_for_flush():
+    parser = Key_parser()
+    assert parser.feed("\x1b") == []
+    assert parser.pending
+    assert parser.flush() == [Key_event("escape")]
+    assert not parser.pending
+    # an unfinished sequence is cut off where it ends
+    assert parser.feed("\x1b[") == []
+    assert parser.flush() == [Key_event("[", alt=True)]
+
+
+def test_lone_escape_times_out():
+    read_fd, write_fd = os.pipe()
+    try:
+        reader = Input_reader(read_fd, escape_timeout=0.2)
+        os.write(write_fd, b"\x1b")
+        assert reader.read() == []
+        assert 0 < reader.timeout() <= 0.2
+        assert reader.expire() == []
+        time.sleep(0.25)
+        assert reader.timeout() == 0
+        assert reader.expire() == [Key_event("escape")]
+        assert reader.timeout() == None
+        # more input before the timeout finishes the sequence
+        os.write(write_fd, b"\x1b")
+        assert reader.read() == []
+        os.write(write_fd, b"[B")
+        assert reader.read() == [Key_event("down")]
+        assert reader.timeout() == None
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
@@ -0,0 +1,71 @@
+# local imports
+from screen_display import Screen, Text, Log_pane, Frame_scheduler
+
+
+def test_lines_scroll_in(virtual_screen):
+    screen, terminal = virtual_screen(30, 8)
+    screen.add_texts(Text("header", 0, 0))
+    pane = Log_pane(screen, 0, 2, height=4, history=100)
+    screen.render()
+    for index in range(10):
+        pane.append(f"line {index}")
+    assert [terminal.line(y).rstrip() for y in range(8)] == ["header", "", "line 6", "line 7", "line 8", "line 9", "", ""]
+    assert len(pane.lines) == 10
+
+
+def test_history_is_a_ring_buffer(virtual_screen):
+    screen, terminal = virtual_screen(30, 8)
+    pane = Log_pane(screen, 0, 0, height=3, history=5)
+    pane.extend(f"line {index}" for index in range(20))
+    assert list(pane.lines) == [f"line {index}" for index in range(15, 20)]
+    pane.page_up()
+    assert pane.visible_lines() == ["line 15", "line 16", "line 17"]
+    assert [terminal.line(y).rstrip() for y in range(3)] == ["line 15", "line 16", "line 17"]
+    # new lines don't move a scrolled back view
+    pane.append("line 20")
+    assert [terminal.line(y).rstrip() for y in range(3)] == ["line 16", "line 17", "line 18"]
+    pane.scroll_to_end()
+    assert [terminal.line(y).rstrip() for y in range(3)] == ["line 18", "line 19", "line 20"]
+
+
+def test_pane_beside_other_content(virtual_screen):
+    screen, terminal = virtual_screen(40, 8)
+    pane = Log_pane(screen, 10, 1, width=20, height=3)
+    screen.add_texts([Text("left", 0, 2), Text("right", 32, 2)])
+    screen.render()
+    pane.extend(["a" * 30, "b", "c"])
+    assert terminal.line(1) == " " * 10 + "a" * 20 + " " * 10
+    assert terminal.line(2).rstrip() == "left      b                     right"
+    assert terminal.line(3).rstrip() == "          c"
+
+
+def test_pane_under_a_subscreen(virtual_screen):
+    screen, terminal = virtual_screen(40, 8)
+    pane = Log_pane(screen, 0, 2, height=3)
+    pane.extend(["x" * 40] * 3)
+    child = Screen(6, 2, offset_x=2, offset_y=3, parent=screen)
+    child.add_texts(Text("CHILD", 0, 0))
+    # under the pane, one of them under the subscreen too
+    hidden = [Text("p" * 10, 0, 3), Text("q", 20, 3)]
+    screen.add_texts(hidden)
+    screen.render()
+    assert terminal.line(3) == "xx" + "CHILD " + "x" * 32
+    # repainting several spans of the row in one frame
+    scheduler = Frame_scheduler(screen)
+    for text in hidden:
+        text.text = text.text.replace(text.text[0], "r")
+        screen.update_text(text)
+    scheduler.tick()
+    assert terminal.line(3) == "xx" + "CHILD " + "x" * 32
+    pane.append("new")
+    scheduler.tick()
+    assert terminal.line(3) == "xx" + "CHILD " + "x" * 32
+    assert terminal.line(4).rstrip() == "ne"
+
+
+def test_wide_characters_cut_by_a_span(virtual_screen):
+    screen, terminal = virtual_screen(20, 4)
+    pane = Log_pane(screen, 0, 0, height=2)
+    assert pane._cut("a日b", 2, 4) == " b"
+    assert pane._cut("a日b", 0, 2) == "a "
+    assert pane._cut("a日b", 0, 3) == "a日"
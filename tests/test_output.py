@@ -0,0 +1,48 @@
+import time
+# local imports
+from screen_display import Screen, Text, Virtual_terminal, Virtual_backend
+from screen_display.output import Threaded_sink
+
+
+def test_slow_output_drops_frames_for_keyframes():
+    terminal = Virtual_terminal(30, 6)
+    def slow_output(data:str):
+        time.sleep(0.02)
+        terminal.feed(data)
+    screen = Screen(output=slow_output, backend=Virtual_backend(terminal))
+    frames:list[str] = []
+    screen.writer.add_tap(frames.append)
+    text = Text("0", 0, 1)
+    screen.add_texts(text)
+    screen.render()
+    sink = screen.start_writer_thread(max_frames=2)
+    frames.clear()
+    slowest = 0.0
+    for value in range(300):
+        text.text = str(value)
+        start = time.perf_counter()
+        screen.update_text(text)
+        screen.render()
+        slowest = max(slowest, time.perf_counter() - start)
+    screen.stop_writer_thread()
+    assert sink.frames_dropped > 0 and sink.keyframes > 0
+    assert sink.frames_written + sink.frames_dropped == len(frames)
+    # the callers never waited for the output
+    assert slowest < 0.02
+    assert terminal.line(1).rstrip() == "299"
+    screen.deinit()
+
+
+def test_merged_frames_are_all_written():
+    written:list[str] = []
+    def slow_sink(data:str):
+        time.sleep(0.002)
+        written.append(data)
+    sink = Threaded_sink(slow_sink, max_frames=2)
+    for value in range(100):
+        sink(f"{value},")
+    sink.close()
+    assert sink.frames_dropped == 0
+    assert sink.frames_written == 100
+    assert len(written) < 100
+    assert "".join(written) == "".join(f"{value}," for value in range(100))
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+
+def _run(code:str):
+    """
+    Runs the code in a new interpreter (so nothing is imported yet), and returns the words it printed.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=root).stdout.split()
+
+
+def test_optional_modules_load_on_first_use():
+    loaded = _run(
+        "import sys, screen_display\n"
+        "print(*[name for name in ('socket', 'selectors', 'json', 'cProfile', 'tracemalloc') if name in sys.modules])\n"
+        "from screen_display import Screen_server\n"
+        "print('socket' in sys.modules)"
+    )
+    assert loaded == ["True"]
+
+
+def test_star_import_exports_the_lazy_names():
+    names = _run("from screen_display import *\nprint(*sorted(name for name in dir() if not name.startswith('_')))")
+    for name in ("Screen", "Text", "Colors", "get_backend", "get_size", "Frame_scheduler", "Log_pane", "Virtual_terminal", "Screen_server", "Key_event", "Screen_metrics", "Recording"):
+        assert name in names
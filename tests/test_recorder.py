@@ -0,0 +1,28 @@
+import json
+# local imports
+from screen_display import Text, Virtual_terminal, Frame_recorder, Recording
+
+
+def test_asciicast_starts_from_the_screen_at_the_start(virtual_screen, tmp_path):
+    screen, terminal = virtual_screen(30, 6)
+    first = Text("first", 0, 0)
+    screen.add_texts([first] + [Text(f"row {y}", 0, y) for y in range(1, 4)])
+    screen.render()
+    path = str(tmp_path / "screen.rec")
+    with Frame_recorder(screen, path):
+        first.text = "changed"
+        screen.update_texts()
+        screen.render()
+    recording = Recording(path)
+    cast_path = str(tmp_path / "screen.cast")
+    recording.to_asciicast(cast_path)
+    replayed = Virtual_terminal(recording.width, recording.height)
+    with open(cast_path, encoding="utf-8") as file:
+        header = json.loads(file.readline())
+        for line in file:
+            replayed.feed(json.loads(line)[2])
+    assert (header["width"], header["height"]) == (30, 6)
+    seeked = recording.seek(recording.duration)
+    assert [seeked.line(y).rstrip() for y in range(4)] == ["changed", "row 1", "row 2", "row 3"]
+    assert replayed.text() == seeked.text()
+    assert replayed.text() == terminal.text()
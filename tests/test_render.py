@@ -0,0 +1,33 @@
+# local imports
+from screen_display import Text
+
+
+def test_render_only_writes_the_changes(virtual_screen):
+    screen, terminal = virtual_screen()
+    frames:list[str] = []
+    screen.writer.add_tap(frames.append)
+    texts = [Text(f"line {index}", 0, index) for index in range(5)]
+    screen.add_texts(texts)
+    screen.render()
+    assert terminal.line(4).startswith("line 4")
+    frames.clear()
+    screen.render()
+    assert "line" not in "".join(frames)
+    texts[2].text = "line X"
+    screen.update_texts()
+    screen.render()
+    written = "".join(frames)
+    assert "X" in written
+    assert "line" not in written
+    assert terminal.text() == "line 0\nline 1\nline X\nline 3\nline 4" + "\n" * 5
+
+
+def test_render_after_a_clear_draws_everything(virtual_screen):
+    screen, terminal = virtual_screen()
+    screen.add_texts([Text("top", 0, 0), Text("bottom", 3, 8)])
+    screen.render()
+    terminal.reset()
+    screen.clear()
+    screen.render()
+    assert terminal.line(0).startswith("top")
+    assert terminal.line(8)[3:9] == "bottom"
@@ -0,0 +1,47 @@
+# local imports
+from screen_display import Text, Frame_scheduler
+
+
+def test_erase_then_move_in_one_frame(virtual_screen):
+    screen, terminal = virtual_screen()
+    text = Text("hello", 0, 0)
+    handle = screen.add_texts(text)
+    screen.render()
+    scheduler = Frame_scheduler(screen)
+    handle.erase()
+    handle.move(10, 2)
+    scheduler.tick()
+    assert terminal.line(0).strip() == ""
+    assert terminal.line(2).strip() == ""
+    handle.display()
+    scheduler.tick()
+    assert terminal.line(2)[10:15] == "hello"
+
+
+def test_move_then_move_in_one_frame(virtual_screen):
+    screen, terminal = virtual_screen()
+    handle = screen.add_texts(Text("hello", 0, 0))
+    screen.render()
+    scheduler = Frame_scheduler(screen)
+    handle.move(5, 1)
+    handle.move(20, 4)
+    scheduler.tick()
+    assert terminal.line(0).strip() == ""
+    assert terminal.line(1).strip() == ""
+    assert terminal.line(4)[20:25] == "hello"
+    assert terminal.text().count("hello") == 1
+
+
+def test_changes_are_coalesced_into_one_frame(virtual_screen):
+    screen, terminal = virtual_screen()
+    text = Text("0", 2, 1)
+    screen.add_texts(text)
+    screen.render()
+    scheduler = Frame_scheduler(screen)
+    for value in range(100):
+        text.text = str(value)
+        screen.update_text(text)
+    assert scheduler.tick()
+    assert not scheduler.tick()
+    assert scheduler.frames == 1
+    assert terminal.line(1)[2:4] == "99"
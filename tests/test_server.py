@@ -0,0 +1,88 @@
+import os
+import time
+# local imports
+from screen_display import Text, Virtual_terminal, Screen_server, Screen_client
+
+
+def _read_until(client:Screen_client, terminal:Virtual_terminal, condition, timeout=5.0):
+    """
+    Feeds what arrives from the server into the terminal, until the condition is true.
+    """
+    end = time.monotonic() + timeout
+    while not condition():
+        terminal.feed(client.read(max(end - time.monotonic(), 0.001)))
+
+
+def _wait_for(condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.001)
+
+
+def test_late_client_gets_the_current_screen(virtual_screen, tmp_path):
+    screen, terminal = virtual_screen(30, 6)
+    text = Text("before", 1, 1)
+    screen.add_texts([text, Text("static", 3, 3)])
+    screen.render()
+    with Screen_server(screen, str(tmp_path / "screen.sock")) as server:
+        text.text = "joined later"
+        screen.update_texts()
+        screen.render()
+        with Screen_client(server.address) as client:
+            _wait_for(lambda: server.clients == 1)
+            server.sync()
+            seen = Virtual_terminal(30, 6)
+            _read_until(client, seen, lambda: seen.text() == terminal.text())
+            assert seen.line(1).startswith(" joined later")
+            text.text = "next frame"
+            screen.update_texts()
+            screen.render()
+            _read_until(client, seen, lambda: seen.text() == terminal.text())
+        assert server.keyframes == 1
+
+
+def test_slow_client_skips_to_a_keyframe(virtual_screen, tmp_path):
+    screen, terminal = virtual_screen(200, 50)
+    rows = [Text("", 0, y) for y in range(49)]
+    screen.add_texts(rows)
+    screen.render()
+    with Screen_server(screen, str(tmp_path / "screen.sock"), max_queued=1 << 16) as server:
+        with Screen_client(server.address) as client:
+            _wait_for(lambda: server.clients == 1)
+            server.sync()
+            # the client doesn't read while the frames get drawn
+            start = time.monotonic()
+            for frame in range(200):
+                for y, row in enumerate(rows):
+                    row.text = chr(ord("a") + (frame + y) % 26) * 199
+                screen.update_texts()
+                screen.render()
+            assert time.monotonic() - start < 30
+            assert server.frames_skipped > 0
+            assert server.keyframes >= 2
+            server.sync()
+            seen = Virtual_terminal(200, 50)
+            _read_until(client, seen, lambda: seen.text() == terminal.text(), 10)
+
+
+def test_close_disconnects_the_clients(virtual_screen, tmp_path):
+    screen, terminal = virtual_screen(30, 6)
+    screen.add_texts(Text("shown", 0, 0))
+    screen.render()
+    path = str(tmp_path / "screen.sock")
+    server = Screen_server(screen, path)
+    client = Screen_client(path)
+    _wait_for(lambda: server.clients == 1)
+    server.close()
+    assert server.clients == 0
+    assert not os.path.exists(path)
+    # the rest of the frames, then the end of the connection
+    while client.read(5):
+        pass
+    client.close()
+    # the screen still draws without the server
+    screen.add_texts(Text("after", 0, 1))
+    screen.render()
+    assert terminal.line(1).startswith("after")
+    server.close()
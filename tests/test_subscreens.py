@@ -0,0 +1,41 @@
+# local imports
+from screen_display import Screen, Text, Text_style, Colors
+
+
+def test_child_over_the_parent(virtual_screen):
+    screen, terminal = virtual_screen()
+    screen.add_texts(Text("parent text under the child", 0, 1))
+    child = Screen(6, 3, Text_style(back_color=Colors.BLUE), offset_x=3, offset_y=0, parent=screen)
+    child.add_texts(Text("ab", 0, 1))
+    screen.render()
+    assert terminal.line(1).startswith("par" + "ab    " + "xt under the child")
+    # the empty cells of the child get its default style, not the parent's
+    assert terminal.cell(8, 1)[1][1] == 44
+    assert terminal.cell(9, 1)[1][1] != 44
+    child.detach()
+    assert terminal.line(1).startswith("parent text under the child")
+    assert terminal.cell(8, 1)[1][1] != 44
+
+
+def test_child_is_clipped_to_the_parent(virtual_screen):
+    screen, terminal = virtual_screen()
+    parent = Screen(10, 4, offset_x=25, offset_y=1, parent=screen)
+    child = Screen(8, 3, offset_x=6, offset_y=1, parent=parent)
+    child.add_texts(Text("0123456789", 0, 0))
+    screen.render()
+    assert child.width == 4
+    assert terminal.line(2) == " " * 31 + "0123" + " " * 5
+
+
+def test_later_and_raised_children_are_drawn_over(virtual_screen):
+    screen, terminal = virtual_screen()
+    first = Screen(8, 2, offset_x=0, offset_y=2, parent=screen)
+    first.add_texts(Text("first", 0, 0))
+    second = Screen(8, 2, offset_x=3, offset_y=2, parent=screen)
+    second.add_texts(Text("second", 0, 0))
+    screen.render()
+    assert terminal.line(2).startswith("firsecond")
+    first.raise_screen()
+    assert terminal.line(2).startswith("first   ")
+    first.detach()
+    assert terminal.line(2).startswith("   second")
@@ -0,0 +1,24 @@
+import pytest
+# local imports
+from screen_display import Virtual_terminal
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_snapshot_round_trip(compress:bool):
+    terminal = Virtual_terminal(20, 5)
+    terminal.feed("\x1b]0;snapshot title\x07")
+    terminal.feed("\x1b[1;1Hplain \x1b[38;5;200;48;5;17mcolored\x1b[0m")
+    terminal.feed("\x1b[2;3H日本語\x1b[1;31m wide")
+    terminal.feed("\x1b[3;1Héä combining\x1b[0m")
+    terminal.feed("\x1b[5;18Hend\x1b[4;7H\x1b[?25l")
+    loaded = Virtual_terminal.from_snapshot(terminal.snapshot(compress))
+    assert (loaded.width, loaded.height) == (20, 5)
+    assert loaded.title == "snapshot title"
+    assert (loaded.cursor_x, loaded.cursor_y, loaded.cursor_visible) == (6, 3, False)
+    assert loaded.chars == terminal.chars
+    for y in range(5):
+        for x in range(20):
+            assert loaded.cell(x, y) == terminal.cell(x, y)
+    assert loaded.styled_text() == terminal.styled_text()
+    assert loaded.line(1).startswith("  日本語 wide")
+    assert loaded.cell(0, 2)[0] == "é"